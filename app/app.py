@@ -1,11 +1,16 @@
 import os
 import chainlit as cl
+from chainlit.server import app as chainlit_app
 import boto3
 import httpx
+import importlib.util
 import re
 import json
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 
+from mcp_client import MCPClient
+
 # Initialize AWS clients
 bedrock_agent_runtime = boto3.client(
     "bedrock-agent-runtime", region_name=os.environ.get("AWS_REGION", "us-east-1")
@@ -19,9 +24,92 @@ KNOWLEDGE_BASE_ID = os.environ.get("KNOWLEDGE_BASE_ID")
 MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
 MCP_SERVER_URL = os.environ.get("MCP_SERVER_URL", "")
 
+# Connection pool shared by all chat sessions for calls to the MCP server
+MCP_MAX_CONNECTIONS = int(os.environ.get("MCP_MAX_CONNECTIONS", "20"))
+MCP_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("MCP_MAX_KEEPALIVE_CONNECTIONS", "10")
+)
+MCP_KEEPALIVE_EXPIRY = float(os.environ.get("MCP_KEEPALIVE_EXPIRY", "60"))
+MCP_HTTP2 = os.environ.get("MCP_HTTP2", "false").lower() in ("1", "true", "yes")
+
 # Cache for MCP tools
 _mcp_tools_cache = None
 
+# HTTP client shared by all MCP calls, created on first use
+_mcp_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_mcp_http_client() -> httpx.AsyncClient:
+    """
+    Return the HTTP client used for every call to the MCP server.
+
+    Connections are kept alive and reused across tool calls and chat
+    sessions, so a call does not pay for a new TCP (and TLS) handshake.
+
+    Returns:
+        The shared httpx.AsyncClient
+    """
+    global _mcp_http_client
+
+    if _mcp_http_client is None or _mcp_http_client.is_closed:
+        http2 = MCP_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            cl.logger.warning(
+                "MCP_HTTP2 is set but the h2 package is not installed; using HTTP/1.1"
+            )
+            http2 = False
+
+        _mcp_http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=MCP_MAX_CONNECTIONS,
+                max_keepalive_connections=MCP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=MCP_KEEPALIVE_EXPIRY,
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+
+    return _mcp_http_client
+
+
+mcp_client = MCPClient(MCP_SERVER_URL, get_mcp_http_client)
+
+
+async def close_mcp_http_client() -> None:
+    """End the MCP session and close the pooled connections to the MCP server."""
+    global _mcp_http_client
+
+    if _mcp_http_client is not None:
+        await mcp_client.close()
+    client, _mcp_http_client = _mcp_http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def close_mcp_on_shutdown(app: Any) -> None:
+    """
+    End the MCP session and close the pool when the Chainlit server stops.
+
+    Chainlit 1.3 has no app shutdown hook, so the lifespan of its FastAPI
+    app is wrapped instead; uvicorn runs it on the server's own event loop
+    after the last request.
+    """
+    lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan_with_mcp(app: Any):
+        async with lifespan(app) as state:
+            try:
+                yield state
+            finally:
+                await close_mcp_http_client()
+
+    app.router.lifespan_context = lifespan_with_mcp
+
+
+close_mcp_on_shutdown(chainlit_app)
+
 
 async def discover_mcp_tools() -> List[Dict[str, Any]]:
     """
@@ -40,36 +128,27 @@ async def discover_mcp_tools() -> List[Dict[str, Any]]:
         return []
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Call MCP tools/list method
-            payload = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
-
-            response = await client.post(
-                MCP_SERVER_URL,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            # Extract tools from response
-            tools = result.get("result", {}).get("tools", [])
-
-            # Convert MCP tool format to Bedrock tool specification
-            bedrock_tools = []
-            for tool in tools:
-                bedrock_tool = {
-                    "toolSpec": {
-                        "name": tool.get("name"),
-                        "description": tool.get("description", ""),
-                        "inputSchema": {"json": tool.get("inputSchema", {})},
-                    }
+        # Call MCP tools/list method
+        result = await mcp_client.request("tools/list", timeout=10.0)
+
+        # Extract tools from response
+        tools = result.get("tools", [])
+
+        # Convert MCP tool format to Bedrock tool specification
+        bedrock_tools = []
+        for tool in tools:
+            bedrock_tool = {
+                "toolSpec": {
+                    "name": tool.get("name"),
+                    "description": tool.get("description", ""),
+                    "inputSchema": {"json": tool.get("inputSchema", {})},
                 }
-                bedrock_tools.append(bedrock_tool)
+            }
+            bedrock_tools.append(bedrock_tool)
 
-            # Cache the tools
-            _mcp_tools_cache = bedrock_tools
-            return bedrock_tools
+        # Cache the tools
+        _mcp_tools_cache = bedrock_tools
+        return bedrock_tools
 
     except Exception as e:
         cl.logger.error(f"Failed to discover MCP tools: {e}")
@@ -91,23 +170,7 @@ async def call_mcp_tool(tool_name: str, tool_input: Dict[str, Any]) -> Dict[str,
         return {"error": "MCP server is not configured"}
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {"name": tool_name, "arguments": tool_input},
-            }
-
-            response = await client.post(
-                MCP_SERVER_URL,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            return result.get("result", {})
+        return await mcp_client.call_tool(tool_name, tool_input)
 
     except Exception as e:
         return {"error": str(e)}
@@ -161,37 +224,17 @@ async def create_recipe_via_mcp(recipe_name: str, recipe_content: str) -> dict:
         return {"error": "MCP server is not configured", "success": False}
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # MCP protocol requires calling tools via JSON-RPC
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {
-                    "name": "create_recipe",
-                    "arguments": {"name": recipe_name, "content": recipe_content},
-                },
-            }
+        result = await mcp_client.call_tool(
+            "create_recipe", {"name": recipe_name, "content": recipe_content}
+        )
 
-            response = await client.post(
-                MCP_SERVER_URL,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            # Normalize response format - extract success from nested result if present
-            if isinstance(result, dict) and "result" in result:
-                nested_result = result["result"]
-                if isinstance(nested_result, dict):
-                    return {
-                        "success": nested_result.get("success", False),
-                        "error": nested_result.get("error"),
-                        "path": nested_result.get("path"),
-                    }
-
-            return result
+        # Normalize response format - the tool's own fields are the structured content
+        tool_result = result.get("structuredContent", result)
+        return {
+            "success": tool_result.get("success", False),
+            "error": tool_result.get("error"),
+            "path": tool_result.get("path"),
+        }
     except Exception as e:
         return {"error": str(e), "success": False}
 
@@ -282,9 +325,14 @@ Brief description
 Always provide COMPLETE recipes with ALL ingredients and ALL steps.
 
 If you have tools available, use them when appropriate:
-- Use list_recipes or search_recipes to find recipes
-- Use create_recipe to save new recipes the user wants to add
-- Use update_recipe to modify existing recipes"""
+- Use search_recipes to find recipes by name; list_recipes returns one page at a time, so only follow next_cursor when you need more
+- Use search_recipe_text for questions about ingredients, techniques or anything else inside the recipe text, such as "what can I make with leeks"
+- Use find_similar_recipes to find recipes close to an existing recipe or to text the user pasted, e.g. to suggest alternatives or spot a recipe that is already in the cookbook
+- Use get_recipes to read several recipes in one call instead of calling get_recipe repeatedly
+- Use get_recipe_structured when you only need times, servings, ingredients or steps
+- Use filter_recipes for questions about cooking time, difficulty, cuisine or ingredients to include or avoid
+- Use create_recipe with check_duplicates=true to save new recipes the user wants to add; if duplicates come back, show them and ask before creating anyway
+- Use update_recipe to modify existing recipes, passing the sha returned by get_recipe; on a conflict, merge your change into current_content and retry with current_sha"""
             }
         ]
 
@@ -0,0 +1,189 @@
+"""
+Client for the recipe MCP server over the streamable HTTP transport.
+
+Kept apart from the Chainlit app so the protocol handling can be tested
+without AWS or Chainlit.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class MCPError(Exception):
+    """A JSON-RPC error returned by the MCP server."""
+
+
+async def iter_sse_messages(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a text/event-stream response into JSON-RPC messages as they arrive.
+
+    Args:
+        response: A streamed response whose body has not been read yet
+
+    Yields:
+        The JSON payload of each "message" event
+    """
+    event, data = "message", []
+    async for line in response.aiter_lines():
+        if not line:
+            # A blank line ends the event
+            if data and event == "message":
+                yield json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+    if data and event == "message":
+        yield json.loads("\n".join(data))
+
+
+class MCPClient:
+    """
+    Client for an MCP server on the streamable HTTP transport.
+
+    The initialize handshake runs once and the Mcp-Session-Id it returns is
+    sent with every later request, sharing one session across all chat
+    sessions. Every request gets its own id, so concurrent calls cannot be
+    mixed up, and streamed (SSE) answers are parsed as they arrive.
+    """
+
+    PROTOCOL_VERSION = "2025-06-18"
+
+    def __init__(self, url: str, get_http_client: Callable[[], httpx.AsyncClient]):
+        self.url = url
+        self._get_http_client = get_http_client
+        self.session_id: Optional[str] = None
+        self.protocol_version: Optional[str] = None
+        self._ids = itertools.count(1)
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
+
+    async def request(
+        self, method: str, params: Optional[Dict[str, Any]] = None, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send a JSON-RPC request, initializing the session first if needed.
+
+        Args:
+            method: JSON-RPC method, e.g. "tools/call"
+            params: Method parameters
+            **kwargs: Passed on to httpx, e.g. timeout
+
+        Returns:
+            The "result" of the response
+
+        Raises:
+            MCPError: If the server answered with a JSON-RPC error
+        """
+        session_id = await self._ensure_session()
+        try:
+            return await self._send(method, params, **kwargs)
+        except httpx.HTTPStatusError as e:
+            # The server forgot the session (e.g. it restarted): start a new one
+            if e.response.status_code != 404 or session_id is None:
+                raise
+            await self._ensure_session(expired=session_id)
+            return await self._send(method, params, **kwargs)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call an MCP tool and return its result."""
+        return await self.request("tools/call", {"name": name, "arguments": arguments})
+
+    async def close(self) -> None:
+        """End the session on the server, if one was started."""
+        session_id, self.session_id = self.session_id, None
+        self._initialized = False
+        if session_id is not None:
+            try:
+                await self._get_http_client().delete(
+                    self.url, headers={"Mcp-Session-Id": session_id}
+                )
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to end MCP session: {e}")
+
+    async def _ensure_session(self, expired: Optional[str] = None) -> Optional[str]:
+        async with self._init_lock:
+            if expired is not None and self.session_id == expired:
+                self._initialized = False
+            if not self._initialized:
+                self.session_id = None
+                self.protocol_version = None
+                result = await self._send(
+                    "initialize",
+                    {
+                        "protocolVersion": self.PROTOCOL_VERSION,
+                        "capabilities": {},
+                        "clientInfo": {"name": "cookbook-chatbot", "version": "1.0"},
+                    },
+                )
+                self.protocol_version = result.get(
+                    "protocolVersion", self.PROTOCOL_VERSION
+                )
+                await self._notify("notifications/initialized")
+                self._initialized = True
+            return self.session_id
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Accept": "application/json, text/event-stream"}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        if self.protocol_version:
+            headers["MCP-Protocol-Version"] = self.protocol_version
+        return headers
+
+    async def _notify(self, method: str) -> None:
+        response = await self._get_http_client().post(
+            self.url,
+            json={"jsonrpc": "2.0", "method": method},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+
+    async def _send(
+        self, method: str, params: Optional[Dict[str, Any]], **kwargs
+    ) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        payload = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            payload["params"] = params
+
+        async with self._get_http_client().stream(
+            "POST", self.url, json=payload, headers=self._headers(), **kwargs
+        ) as response:
+            response.raise_for_status()
+            if "mcp-session-id" in response.headers:
+                self.session_id = response.headers["mcp-session-id"]
+
+            content_type = response.headers.get("content-type", "")
+            if content_type.startswith("text/event-stream"):
+                # Return as soon as our answer arrives; progress and other
+                # notifications on the stream are skipped
+                async for message in iter_sse_messages(response):
+                    if message.get("id") == request_id and (
+                        "result" in message or "error" in message
+                    ):
+                        return self._unwrap(message)
+                raise MCPError(f"Stream ended without a response to {method}")
+
+            await response.aread()
+            return self._unwrap(response.json())
+
+    @staticmethod
+    def _unwrap(message: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in message:
+            error = message["error"]
+            raise MCPError(f"{error.get('message')} (code {error.get('code')})")
+        return message.get("result", {})
@@ -0,0 +1,246 @@
+"""
+Test script for the MCP client used by the chatbot.
+Talks to an in-process fake of the MCP streamable HTTP transport through
+httpx.MockTransport, so neither the MCP server nor AWS is required.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcp_client import MCPClient, MCPError, iter_sse_messages
+
+URL = "http://mcp.test/mcp"
+
+
+class FakeMCPServer:
+    """Answers like FastMCP's streamable HTTP transport, in JSON or SSE"""
+
+    def __init__(self, sse=False):
+        self.sse = sse
+        self.sessions = set()
+        self.created = 0
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        session_id = request.headers.get("mcp-session-id")
+        if request.method == "DELETE":
+            self.sessions.discard(session_id)
+            self.requests.append(("DELETE", request.headers, None))
+            return httpx.Response(200)
+
+        message = json.loads(request.content)
+        self.requests.append((message["method"], request.headers, message))
+        if message["method"] == "initialize":
+            self.created += 1
+            session_id = f"session-{self.created}"
+            self.sessions.add(session_id)
+            result = {"protocolVersion": "2025-03-26", "capabilities": {}}
+            return self.answer(message["id"], result, {"mcp-session-id": session_id})
+        if session_id not in self.sessions:
+            return httpx.Response(404, json={"error": "Session not found"})
+        if "id" not in message:
+            return httpx.Response(202)
+        if message["params"]["name"] == "broken":
+            error = {"code": -32602, "message": "Unknown tool: broken"}
+            return httpx.Response(
+                200, json={"jsonrpc": "2.0", "id": message["id"], "error": error}
+            )
+        return self.answer(message["id"], {"echo": message["params"]["arguments"]})
+
+    def answer(self, request_id, result, headers=None) -> httpx.Response:
+        response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        if not self.sse:
+            return httpx.Response(200, json=response, headers=headers)
+        # A keep-alive comment, an unrelated event and a progress notification
+        # come first; the answer itself is split over several data lines
+        body = (
+            ": keep-alive\n\n"
+            "event: ping\ndata: {}\n\n"
+            'data: {"jsonrpc": "2.0", "method": "notifications/progress"}\n\n'
+            + "".join(
+                f"data: {line}\n" for line in json.dumps(response, indent=1).split("\n")
+            )
+            + "\n"
+        )
+        return httpx.Response(
+            200,
+            content=body.encode("utf-8"),
+            headers={"content-type": "text/event-stream", **(headers or {})},
+        )
+
+    def methods(self):
+        return [method for method, _, _ in self.requests]
+
+
+def make_client(fake):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    return MCPClient(URL, lambda: http_client), http_client
+
+
+def test_handshake_and_session_reuse():
+    """The session is initialized once and its id sent with every later request"""
+    print("Testing MCP handshake...")
+    fake = FakeMCPServer()
+
+    async def scenario():
+        client, http_client = make_client(fake)
+        first = await client.call_tool("search_recipes", {"query": "soup"})
+        second = await client.call_tool("get_recipe", {"path": "soup.md"})
+        await client.close()
+        await http_client.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == {"echo": {"query": "soup"}}, first
+    assert second == {"echo": {"path": "soup.md"}}, second
+    assert fake.methods() == [
+        "initialize",
+        "notifications/initialized",
+        "tools/call",
+        "tools/call",
+        "DELETE",
+    ], fake.methods()
+    print("✓ initialize and notifications/initialized sent once")
+
+    for _, headers, _ in fake.requests[1:]:
+        assert headers["mcp-session-id"] == "session-1", headers
+    for _, headers, _ in fake.requests[2:4]:
+        assert headers["mcp-protocol-version"] == "2025-03-26", headers
+        assert "text/event-stream" in headers["accept"], headers
+    ids = [
+        message["id"] for _, _, message in fake.requests if message and "id" in message
+    ]
+    assert len(ids) == len(set(ids)) == 3, ids
+    assert not fake.sessions, "close() must end the session"
+    print("✓ Session id and negotiated version reused, session ended on close")
+
+
+def test_sse_answers():
+    """Streamed answers are picked out of the event stream"""
+    print("Testing SSE responses...")
+    fake = FakeMCPServer(sse=True)
+
+    async def scenario():
+        client, http_client = make_client(fake)
+        result = await client.call_tool("get_recipe", {"path": "soup.md"})
+        try:
+            await client.call_tool("broken", {})
+            raise AssertionError("JSON-RPC errors must raise MCPError")
+        except MCPError as e:
+            error = str(e)
+        await http_client.aclose()
+        return result, error
+
+    result, error = asyncio.run(scenario())
+    assert result == {"echo": {"path": "soup.md"}}, result
+    assert "Unknown tool: broken" in error, error
+    print("✓ Answer found after comments, other events and notifications")
+    print("✓ JSON-RPC errors raised as MCPError")
+
+    async def stream_without_answer():
+        def handle(request):
+            message = json.loads(request.content)
+            if message["method"] == "initialize":
+                return httpx.Response(
+                    200, json={"jsonrpc": "2.0", "id": 1, "result": {}}
+                )
+            if "id" not in message:
+                return httpx.Response(202)
+            return httpx.Response(
+                200,
+                content=b'data: {"jsonrpc": "2.0", "id": 999, "result": {}}\n\n',
+                headers={"content-type": "text/event-stream"},
+            )
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        client = MCPClient(URL, lambda: http_client)
+        try:
+            await client.request("tools/list")
+            raise AssertionError("a stream without our answer must fail")
+        except MCPError as e:
+            return str(e)
+        finally:
+            await http_client.aclose()
+
+    assert "without a response" in asyncio.run(stream_without_answer())
+    print("✓ Stream ending without a response raises MCPError")
+
+
+def test_sse_parser():
+    """Events are split on blank lines and only message events are yielded"""
+    print("Testing SSE parser...")
+    body = (
+        b": comment\n"
+        b'event: message\ndata: {"a":\ndata:  1}\n\n'
+        b"event: endpoint\ndata: /other\n\n"
+        b'data:{"b": 2}'
+    )
+
+    async def parse():
+        response = httpx.Response(200, content=body)
+        return [message async for message in iter_sse_messages(response)]
+
+    assert asyncio.run(parse()) == [{"a": 1}, {"b": 2}]
+    print("✓ Multi-line data joined, comments and other events skipped")
+
+
+def test_expired_session_is_renewed():
+    """A 404 for a forgotten session starts a new one and retries the call"""
+    print("Testing session expiry...")
+    fake = FakeMCPServer()
+
+    async def scenario():
+        client, http_client = make_client(fake)
+        await client.call_tool("search_recipes", {"query": "soup"})
+        fake.sessions.clear()
+        result = await client.call_tool("search_recipes", {"query": "stew"})
+        await http_client.aclose()
+        return client, result
+
+    client, result = asyncio.run(scenario())
+    assert result == {"echo": {"query": "stew"}}, result
+    assert fake.methods().count("initialize") == 2, fake.methods()
+    assert client.session_id == "session-2"
+    print("✓ Session re-initialized and the call retried")
+
+
+def test_concurrent_calls_get_their_own_answers():
+    """Concurrent calls share one handshake and each gets its own id and result"""
+    print("Testing concurrent calls...")
+    fake = FakeMCPServer(sse=True)
+
+    async def scenario():
+        client, http_client = make_client(fake)
+        results = await asyncio.gather(
+            *(client.call_tool("get_recipe", {"path": f"{i}.md"}) for i in range(10))
+        )
+        await http_client.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results == [{"echo": {"path": f"{i}.md"}} for i in range(10)], results
+    assert fake.methods().count("initialize") == 1, fake.methods()
+    ids = [
+        message["id"] for method, _, message in fake.requests if method == "tools/call"
+    ]
+    assert len(set(ids)) == 10, ids
+    print("✓ One handshake, ten distinct request ids, answers matched")
+
+
+if __name__ == "__main__":
+    try:
+        test_handshake_and_session_reuse()
+        test_sse_answers()
+        test_sse_parser()
+        test_expired_session_is_renewed()
+        test_concurrent_calls_get_their_own_answers()
+        print("\n✅ All MCP client tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
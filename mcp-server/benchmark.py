@@ -0,0 +1,407 @@
+"""
+Benchmark of the MCP tools against synthetic cookbooks.
+
+Generates cookbooks of markdown recipes in nested folders, serves each one
+through the local GitHub API stub with a fixed latency per request, and times
+every tool cold (empty caches and indexes before each call) and warm. Results
+are written as JSON so runs can be compared over time.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --sizes 100 1000 --latency 0.05 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+from server import GitHubScheduler
+
+BENCHMARK_VERSION = 1
+
+CUISINES = ["italian", "polish", "french", "mexican", "indian", "japanese"]
+COURSES = ["breakfast", "soups", "mains", "sides", "desserts"]
+DISHES = [
+    "Soup",
+    "Stew",
+    "Salad",
+    "Pie",
+    "Risotto",
+    "Curry",
+    "Pancakes",
+    "Dumplings",
+    "Tart",
+    "Casserole",
+]
+ADJECTIVES = ["Classic", "Spicy", "Creamy", "Rustic", "Quick", "Smoky", "Herby"]
+INGREDIENTS = [
+    "tomato",
+    "onion",
+    "garlic",
+    "potato",
+    "carrot",
+    "leek",
+    "mushroom",
+    "chicken",
+    "beef",
+    "lentils",
+    "rice",
+    "flour",
+    "butter",
+    "eggs",
+    "milk",
+    "cheese",
+    "spinach",
+    "pepper",
+    "apple",
+    "lemon",
+]
+UNITS = ["g", "ml", "cup", "tbsp", "tsp", ""]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+def generate_recipe(rng: random.Random, index: int) -> Tuple[str, str]:
+    """Generate one recipe and the nested path it is stored under"""
+    cuisine = rng.choice(CUISINES)
+    course = rng.choice(COURSES)
+    main = rng.choice(INGREDIENTS)
+    title = f"{rng.choice(ADJECTIVES)} {main.title()} {rng.choice(DISHES)} {index}"
+    prep, cook = rng.randrange(5, 60, 5), rng.randrange(5, 120, 5)
+    ingredients = [main] + rng.sample(INGREDIENTS, rng.randint(3, 9))
+    lines = [
+        f"# {title}",
+        "",
+        f"A {cuisine.title()} {course} dish built around {main}.",
+        "",
+        "## Information",
+        f"- **Prep Time**: {prep} minutes",
+        f"- **Cook Time**: {cook} minutes",
+        f"- **Total Time**: {prep + cook} minutes",
+        f"- **Servings**: {rng.randint(1, 8)}",
+        f"- **Difficulty**: {rng.choice(DIFFICULTIES)}",
+        f"- **Cuisine**: {cuisine.title()}",
+        "",
+        "## Ingredients",
+    ]
+    for ingredient in dict.fromkeys(ingredients):
+        unit = rng.choice(UNITS)
+        lines.append(f"- {rng.randint(1, 500)} {unit} {ingredient}".replace("  ", " "))
+    lines += ["", "## Instructions", ""]
+    for step in range(1, rng.randint(3, 8) + 1):
+        lines.append(
+            f"{step}. Cook the {rng.choice(ingredients)} with the "
+            f"{rng.choice(ingredients)} for {rng.randint(2, 30)} minutes."
+        )
+    slug = "-".join(title.lower().split())
+    return f"{cuisine}/{course}/{slug}.md", "\n".join(lines) + "\n"
+
+
+def generate_cookbook(count: int, seed: int = 0) -> Dict[str, str]:
+    """Generate count recipes keyed by path; the same seed gives the same cookbook"""
+    rng = random.Random(seed)
+    return dict(generate_recipe(rng, index) for index in range(count))
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(
+    tool: str, run: str, latencies: List[float], errors: int, wall: float, requests: int
+) -> Dict[str, Any]:
+    """Turn call latencies (seconds) into a result row"""
+    return {
+        "tool": tool,
+        "run": run,
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall else None,
+        "github_requests": requests,
+    }
+
+
+def read_calls(rng: random.Random, paths: List[str]) -> Dict[str, Callable]:
+    """Argument generators for the read tools; each returns a ready-to-run call"""
+    return {
+        "list_recipes": lambda: partial(
+            server.list_recipes, limit=100, prefix=rng.choice(CUISINES) + "/"
+        ),
+        "search_recipes": lambda: partial(server.search_recipes, rng.choice(DISHES)),
+        "search_recipe_text": lambda: partial(
+            server.search_recipe_text, rng.choice(INGREDIENTS)
+        ),
+        "filter_recipes": lambda: partial(
+            server.filter_recipes,
+            max_total_minutes=rng.randrange(30, 120, 15),
+            include_ingredients=[rng.choice(INGREDIENTS)],
+        ),
+        "get_recipe": lambda: partial(server.get_recipe, rng.choice(paths)),
+        "get_recipe_structured": lambda: partial(
+            server.get_recipe_structured, rng.choice(paths)
+        ),
+        "get_recipes": lambda: partial(
+            server.get_recipes, rng.sample(paths, min(20, len(paths)))
+        ),
+    }
+
+
+def write_calls(rng: random.Random, paths: List[str], tag: str) -> Dict[str, Callable]:
+    """Argument generators for the write tools"""
+    counter = iter(range(10**9))
+
+    def create():
+        index = next(counter)
+        path, content = generate_recipe(rng, index)
+        return partial(
+            server.create_recipe,
+            f"Benchmark recipe {index}",
+            content,
+            path=f"bench-{tag}/{path}",
+        )
+
+    def update():
+        content = generate_recipe(rng, next(counter))[1]
+        return partial(server.update_recipe, rng.choice(paths), content)
+
+    return {"create_recipe": create, "update_recipe": update}
+
+
+def failed(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("success") is False
+
+
+class Bench:
+    """Runs tool calls against one stub repository and records result rows"""
+
+    def __init__(self, github: FakeGitHub, concurrency: int):
+        self.github = github
+        self.concurrency = concurrency
+        self.repo = github.repo()
+        # Pacing off: the stub's latency alone is what is being measured
+        GitHubScheduler(1e6, 10**6, 0, 0, 60).install(self.repo.requester)
+        self.results: List[Dict[str, Any]] = []
+
+    def reset(self) -> None:
+        """Start from empty caches and indexes, as after a cold start"""
+        server.storage = server.GitHubBackend(self.repo)
+        server.content_cache.clear()
+        server.parsed_recipes.clear()
+        server._tree_listing = None
+        server.reset_recipe_indexes()
+
+    def requests(self) -> int:
+        return sum(self.github.requests.values())
+
+    def cold(self, tool: str, make_call: Callable, iterations: int) -> None:
+        """Time calls that each start from empty caches"""
+        latencies, errors, requests = [], 0, 0
+        for _ in range(iterations):
+            call = make_call()
+            self.reset()
+            before = self.requests()
+            started = time.perf_counter()
+            errors += self._run(call)
+            latencies.append(time.perf_counter() - started)
+            requests += self.requests() - before
+        self.results.append(
+            summarize(tool, "cold", latencies, errors, sum(latencies), requests)
+        )
+
+    def warm(self, tool: str, make_call: Callable, iterations: int) -> None:
+        """Time calls on warm caches, concurrency calls at a time"""
+        self._run(make_call())
+        calls = [make_call() for _ in range(iterations)]
+        latencies: List[float] = []
+        errors = 0
+
+        def timed(call):
+            started = time.perf_counter()
+            error = self._run(call)
+            return time.perf_counter() - started, error
+
+        before = self.requests()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for latency, error in pool.map(timed, calls):
+                latencies.append(latency)
+                errors += error
+        wall = time.perf_counter() - started
+        self.results.append(
+            summarize(tool, "warm", latencies, errors, wall, self.requests() - before)
+        )
+
+    def _run(self, call: Callable[[], Any]) -> int:
+        try:
+            return int(failed(call()))
+        except Exception:
+            return 1
+
+
+def benchmark_cookbook(
+    count: int,
+    latency: float,
+    iterations: int,
+    cold_iterations: int,
+    concurrency: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Benchmark every tool against a generated cookbook of count recipes"""
+    files = generate_cookbook(count, seed)
+    paths = sorted(files)
+    rng = random.Random(seed + 1)
+    original_storage = server.storage
+    with FakeGitHub(files, latency=latency, rate_limit=10**9) as github:
+        bench = Bench(github, concurrency)
+        try:
+            bench.cold(
+                "index_sync", lambda: server.sync_recipe_indexes, cold_iterations
+            )
+            for tool, make_call in read_calls(rng, paths).items():
+                bench.cold(tool, make_call, cold_iterations)
+            bench.reset()
+            server.sync_recipe_indexes()
+            for tool, make_call in read_calls(rng, paths).items():
+                bench.warm(tool, make_call, iterations)
+            # Writes go last since they move the branch under the read tools
+            for tool, make_call in write_calls(rng, paths, str(count)).items():
+                bench.warm(tool, make_call, max(1, iterations // 10))
+        finally:
+            server.storage = original_storage
+            server._tree_listing = None
+            server.reset_recipe_indexes()
+    return {
+        "recipes": count,
+        "bytes": sum(len(content.encode("utf-8")) for content in files.values()),
+        "results": bench.results,
+    }
+
+
+def run_benchmark(
+    sizes: List[int],
+    latency: float,
+    iterations: int,
+    cold_iterations: int,
+    concurrency: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Benchmark every cookbook size and return the JSON-ready report"""
+    report = {
+        "version": BENCHMARK_VERSION,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "latency_s": latency,
+            "iterations": iterations,
+            "cold_iterations": cold_iterations,
+            "concurrency": concurrency,
+            "fetch_max_in_flight": server.FETCH_MAX_IN_FLIGHT,
+            "seed": seed,
+        },
+        "cookbooks": [],
+    }
+    for count in sizes:
+        report["cookbooks"].append(
+            benchmark_cookbook(
+                count, latency, iterations, cold_iterations, concurrency, seed
+            )
+        )
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{'recipes':>8} {'tool':<22} {'run':<5} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'calls/s':>9} {'GitHub':>7} {'errors':>6}"
+    )
+    for cookbook in report["cookbooks"]:
+        for row in cookbook["results"]:
+            print(
+                f"{cookbook['recipes']:>8} {row['tool']:<22} {row['run']:<5} "
+                f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                f"{row['throughput_per_s'] or 0:>9.1f} {row['github_requests']:>7} "
+                f"{row['errors']:>6}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="Cookbook sizes to benchmark (default: 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.01,
+        help="Seconds the stub waits before answering each request (default: 0.01)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Warm calls per tool (default: 200)",
+    )
+    parser.add_argument(
+        "--cold-iterations",
+        type=int,
+        default=3,
+        help="Cold calls per tool, each from empty caches (default: 3)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent callers for warm runs (default: 4)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Cookbook seed")
+    parser.add_argument(
+        "--output",
+        default="benchmark-results.json",
+        help="Where to write the JSON report (default: benchmark-results.json)",
+    )
+    args = parser.parse_args(argv)
+
+    # Per-call log lines would dominate the timings
+    logging.getLogger(server.__name__).setLevel(logging.WARNING)
+
+    report = run_benchmark(
+        args.sizes,
+        args.latency,
+        args.iterations,
+        args.cold_iterations,
+        args.concurrency,
+        args.seed,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\nWrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
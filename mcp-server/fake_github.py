@@ -0,0 +1,453 @@
+"""
+Stub of the GitHub REST API for tests.
+
+Serves an in-memory repository over HTTP with the subset of endpoints the
+MCP server uses (repository, branches, contents, Git trees and blobs, and the
+Git Data API writes behind batch commits), including
+ETag revalidation and X-RateLimit-* headers, so PyGithub can be pointed at it
+with ``base_url``.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from github import Auth, Github
+
+
+def blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(f"blob {len(data)}\0".encode("ascii") + data).hexdigest()
+
+
+class FakeGitHub:
+    """An in-memory repository served over HTTP like api.github.com"""
+
+    def __init__(
+        self,
+        files: Optional[Dict[str, str]] = None,
+        full_name: str = "test/recipes",
+        branch: str = "main",
+        latency: float = 0.0,
+        rate_limit: int = 5000,
+    ):
+        self.files: Dict[str, str] = dict(files or {})
+        self.full_name = full_name
+        self.branch = branch
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.not_modified = 0
+        self.commits = 0
+        # Primary rate limit; 304 answers do not count against it
+        self.rate_limit = rate_limit
+        self.rate_remaining = rate_limit
+        self.rate_reset = int(time.time()) + 3600
+        # Canned (status, headers, payload) answers served before routing
+        self.failures: List[Tuple[int, Dict[str, str], Any]] = []
+        # Trees and commits created through the Git Data API, and the
+        # commit the branch was last moved to with a ref update
+        self._trees: Dict[str, Dict[str, str]] = {}
+        self._commit_objects: Dict[str, Dict[str, Any]] = {}
+        self._head: Optional[Tuple[str, str]] = None
+        self._lock = threading.RLock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # Server lifecycle
+
+    def start(self) -> "FakeGitHub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, Nagle's
+            # algorithm and delayed ACKs add ~40ms to every keep-alive request
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_PUT(self):
+                stub._handle(self, "PUT")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+            def do_PATCH(self):
+                stub._handle(self, "PATCH")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "FakeGitHub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def client(self) -> Github:
+        """A PyGithub client talking to this stub"""
+        return Github(
+            auth=Auth.Token("test-token"),
+            base_url=self.url,
+            retry=None,
+            seconds_between_requests=None,
+            seconds_between_writes=None,
+        )
+
+    def repo(self):
+        return self.client().get_repo(self.full_name)
+
+    # Repository state
+
+    def tree_sha(self, files: Optional[Dict[str, str]] = None) -> str:
+        with self._lock:
+            items = sorted((files if files is not None else self.files).items())
+        listing = "".join(f"{p}\0{blob_sha(c)}\n" for p, c in items)
+        return hashlib.sha1(listing.encode("utf-8")).hexdigest()
+
+    def commit_sha(self) -> str:
+        tree_sha = self.tree_sha()
+        if self._head is not None and self._head[1] == tree_sha:
+            return self._head[0]
+        return hashlib.sha1(f"{tree_sha}:{self.commits}".encode()).hexdigest()
+
+    # Request handling
+
+    def _handle(self, handler: BaseHTTPRequestHandler, verb: str) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urllib.parse.urlsplit(handler.path)
+        path = urllib.parse.unquote(parsed.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        body = None
+        if verb in ("PUT", "POST", "PATCH"):
+            length = int(handler.headers.get("Content-Length", 0))
+            body = json.loads(handler.rfile.read(length) or b"{}")
+
+        extra_headers: Dict[str, str] = {}
+        with self._lock:
+            failure = self.failures.pop(0) if self.failures else None
+            exhausted = self.rate_remaining <= 0
+        if failure is not None:
+            status, extra_headers, payload = failure
+            endpoint = "failure"
+        elif exhausted:
+            endpoint, status = "rate_limited", 403
+            payload = {"message": "API rate limit exceeded for user ID 1."}
+        else:
+            endpoint, status, payload = self._route(verb, path, query, body)
+        self.requests[endpoint] += 1
+
+        data = json.dumps(payload).encode("utf-8")
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if (
+            verb == "GET"
+            and status == 200
+            and handler.headers.get("If-None-Match") == etag
+        ):
+            self.not_modified += 1
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            self._send_rate_limit_headers(handler)
+            handler.end_headers()
+            return
+
+        with self._lock:
+            if not exhausted:
+                self.rate_remaining -= 1
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        if verb == "GET" and status == 200:
+            handler.send_header("ETag", etag)
+        for name, value in extra_headers.items():
+            handler.send_header(name, value)
+        self._send_rate_limit_headers(handler)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _send_rate_limit_headers(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            remaining = max(self.rate_remaining, 0)
+        handler.send_header("X-RateLimit-Limit", str(self.rate_limit))
+        handler.send_header("X-RateLimit-Remaining", str(remaining))
+        handler.send_header("X-RateLimit-Reset", str(self.rate_reset))
+        handler.send_header("X-RateLimit-Used", str(self.rate_limit - remaining))
+        handler.send_header("X-RateLimit-Resource", "core")
+
+    def _route(
+        self, verb: str, path: str, query: Dict[str, str], body: Any
+    ) -> Tuple[str, int, Any]:
+        repo_url = f"{self.url}/repos/{self.full_name}"
+        prefix = f"/repos/{self.full_name}"
+        if not path.startswith(prefix):
+            return "unknown", 404, {"message": "Not Found"}
+        rest = path[len(prefix) :]
+
+        if rest == "":
+            return (
+                "repo",
+                200,
+                {
+                    "url": repo_url,
+                    "full_name": self.full_name,
+                    "name": self.full_name.split("/")[1],
+                    "default_branch": self.branch,
+                },
+            )
+
+        match = re.fullmatch(r"/branches/(.+)", rest)
+        if match and verb == "GET":
+            return (
+                "branch",
+                200,
+                {
+                    "name": match.group(1),
+                    "commit": {
+                        "sha": self.commit_sha(),
+                        "commit": {"tree": {"sha": self.tree_sha()}},
+                    },
+                },
+            )
+
+        match = re.fullmatch(r"/git/trees/([0-9a-f]+)", rest)
+        if match and verb == "GET":
+            return "tree", 200, self._tree(repo_url, match.group(1))
+
+        match = re.fullmatch(r"/git/blobs/([0-9a-f]+)", rest)
+        if match and verb == "GET":
+            with self._lock:
+                contents = [
+                    c for c in self.files.values() if blob_sha(c) == match.group(1)
+                ]
+            if not contents:
+                return "blob", 404, {"message": "Not Found"}
+            encoded = base64.b64encode(contents[0].encode("utf-8")).decode("ascii")
+            return (
+                "blob",
+                200,
+                {
+                    "sha": match.group(1),
+                    "content": encoded,
+                    "encoding": "base64",
+                    "size": len(contents[0].encode("utf-8")),
+                },
+            )
+
+        match = re.fullmatch(r"/git/refs?/heads/(.+)", rest)
+        if match and verb == "GET":
+            return "ref", 200, self._ref(repo_url, match.group(1))
+        if match and verb == "PATCH":
+            return "ref_update", *self._update_ref(repo_url, match.group(1), body)
+
+        match = re.fullmatch(r"/git/commits/([0-9a-f]+)", rest)
+        if match and verb == "GET":
+            commit = self._get_commit(repo_url, match.group(1))
+            if commit is None:
+                return "commit", 404, {"message": "Not Found"}
+            return "commit", 200, commit
+        if rest == "/git/commits" and verb == "POST":
+            return "commit_create", 201, self._create_commit(repo_url, body)
+        if rest == "/git/trees" and verb == "POST":
+            return "tree_create", *self._create_tree(repo_url, body)
+
+        match = re.fullmatch(r"/contents/?(.*)", rest)
+        if match and verb == "GET":
+            return "contents", *self._get_contents(repo_url, match.group(1))
+        if match and verb == "PUT":
+            return "contents_put", *self._put_contents(repo_url, match.group(1), body)
+
+        return "unknown", 404, {"message": "Not Found"}
+
+    def _tree(self, repo_url: str, sha: str) -> Dict[str, Any]:
+        with self._lock:
+            files = sorted(self.files.items())
+        entries, directories = [], set()
+        for path, content in files:
+            parts = path.split("/")
+            for depth in range(1, len(parts)):
+                directories.add("/".join(parts[:depth]))
+            entries.append(
+                {
+                    "path": path,
+                    "mode": "100644",
+                    "type": "blob",
+                    "sha": blob_sha(content),
+                    "size": len(content.encode("utf-8")),
+                    "url": f"{repo_url}/git/blobs/{blob_sha(content)}",
+                }
+            )
+        for directory in directories:
+            entries.append(
+                {"path": directory, "mode": "040000", "type": "tree", "sha": "0" * 40}
+            )
+        entries.sort(key=lambda entry: entry["path"])
+        return {
+            "sha": sha,
+            "url": f"{repo_url}/git/trees/{sha}",
+            "tree": entries,
+            "truncated": False,
+        }
+
+    def _content_entry(self, repo_url: str, path: str, content: str) -> Dict[str, Any]:
+        return {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": blob_sha(content),
+            "size": len(content.encode("utf-8")),
+            "url": f"{repo_url}/contents/{path}",
+        }
+
+    def _get_contents(self, repo_url: str, path: str) -> Tuple[int, Any]:
+        path = path.strip("/")
+        with self._lock:
+            files = dict(self.files)
+        if path in files:
+            entry = self._content_entry(repo_url, path, files[path])
+            entry["content"] = base64.b64encode(files[path].encode("utf-8")).decode(
+                "ascii"
+            )
+            entry["encoding"] = "base64"
+            return 200, entry
+
+        prefix = f"{path}/" if path else ""
+        children: Dict[str, Dict[str, Any]] = {}
+        for file_path, content in files.items():
+            if not file_path.startswith(prefix):
+                continue
+            name, _, remainder = file_path[len(prefix) :].partition("/")
+            if remainder:
+                children[name] = {
+                    "type": "dir",
+                    "name": name,
+                    "path": prefix + name,
+                    "sha": "0" * 40,
+                    "size": 0,
+                    "url": f"{repo_url}/contents/{prefix + name}",
+                }
+            else:
+                children[name] = self._content_entry(repo_url, file_path, content)
+        if not children:
+            return 404, {"message": "Not Found"}
+        return 200, [children[name] for name in sorted(children)]
+
+    def _put_contents(
+        self, repo_url: str, path: str, body: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        content = base64.b64decode(body["content"]).decode("utf-8")
+        with self._lock:
+            current = self.files.get(path)
+            if current is not None and "sha" not in body:
+                return 422, {"message": '"sha" wasn\'t supplied.'}
+            if current is not None and body["sha"] != blob_sha(current):
+                return 409, {"message": f"{path} does not match {body['sha']}"}
+            if current is None and "sha" in body:
+                return 404, {"message": "Not Found"}
+            self.files[path] = content
+            self.commits += 1
+            self._head = None
+        status = 200 if current is not None else 201
+        return status, {
+            "content": self._content_entry(repo_url, path, content),
+            "commit": {"sha": self.commit_sha(), "message": body.get("message")},
+        }
+
+    def _ref(self, repo_url: str, branch: str) -> Dict[str, Any]:
+        return {
+            "ref": f"refs/heads/{branch}",
+            "url": f"{repo_url}/git/refs/heads/{branch}",
+            "object": {"sha": self.commit_sha(), "type": "commit"},
+        }
+
+    def _commit_payload(self, repo_url: str, sha: str, commit: Dict[str, Any]):
+        return {
+            "sha": sha,
+            "url": f"{repo_url}/git/commits/{sha}",
+            "message": commit["message"],
+            "tree": {
+                "sha": commit["tree"],
+                "url": f"{repo_url}/git/trees/{commit['tree']}",
+            },
+            "parents": [{"sha": parent} for parent in commit["parents"]],
+        }
+
+    def _get_commit(self, repo_url: str, sha: str) -> Optional[Dict[str, Any]]:
+        if sha == self.commit_sha() and sha not in self._commit_objects:
+            # Snapshot the head so trees can be built on top of it
+            with self._lock:
+                files = dict(self.files)
+            tree_sha = self.tree_sha(files)
+            self._trees[tree_sha] = files
+            self._commit_objects[sha] = {"tree": tree_sha, "parents": [], "message": ""}
+        commit = self._commit_objects.get(sha)
+        return self._commit_payload(repo_url, sha, commit) if commit else None
+
+    def _create_tree(self, repo_url: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        base = body.get("base_tree")
+        if base is not None and base not in self._trees:
+            return 422, {"message": "base_tree is not a valid tree oid"}
+        files = dict(self._trees.get(base, {}))
+        for element in body["tree"]:
+            if element.get("sha", "") is None:
+                files.pop(element["path"], None)
+            else:
+                files[element["path"]] = element["content"]
+        tree_sha = self.tree_sha(files)
+        self._trees[tree_sha] = files
+        return 201, {
+            "sha": tree_sha,
+            "url": f"{repo_url}/git/trees/{tree_sha}",
+            "tree": [],
+        }
+
+    def _create_commit(self, repo_url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        commit = {
+            "tree": body["tree"],
+            "parents": body["parents"],
+            "message": body["message"],
+        }
+        sha = hashlib.sha1(json.dumps(commit, sort_keys=True).encode()).hexdigest()
+        self._commit_objects[sha] = commit
+        return self._commit_payload(repo_url, sha, commit)
+
+    def _update_ref(
+        self, repo_url: str, branch: str, body: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        commit = self._commit_objects.get(body["sha"])
+        if commit is None:
+            return 422, {"message": "Object does not exist"}
+        with self._lock:
+            head = self.commit_sha()
+            if not body.get("force") and head not in commit["parents"]:
+                return 422, {"message": "Update is not a fast forward"}
+            self.files = dict(self._trees[commit["tree"]])
+            self.commits += 1
+            self._head = (body["sha"], commit["tree"])
+        return 200, self._ref(repo_url, branch)
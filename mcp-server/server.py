@@ -1,17 +1,45 @@
 """
 MCP Server for Recipe Management using FastMCP 2.0
 
-This server provides tools and resources to interact with recipes stored in a GitHub repository.
+This server provides tools and resources to interact with recipes stored in a GitHub repository
+(through the REST API or a local clone).
 It exposes functionality for listing, searching, getting, creating, and updating recipes.
 """
 
 import os
+import bisect
+import contextvars
+import functools
+import gzip
+import hashlib
+import hmac
+import json
 import logging
-from typing import Optional, List, Dict, Any
+import math
+import random
+import sqlite3
+import subprocess
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterable, Hashable
 from fastmcp import FastMCP
-from github import Github, GithubException
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from github import (
+    Github,
+    GithubException,
+    InputGitTreeElement,
+    RateLimitExceededException,
+)
+from github.Repository import Repository
 import base64
 import re
+import urllib.parse
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -23,157 +51,3607 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize MCP server
-mcp = FastMCP(name="Recipe MCP Server")
+# Initialize MCP server
+mcp = FastMCP(name="Recipe MCP Server")
+
+# GitHub configuration
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+GITHUB_REPO = os.getenv("GITHUB_REPO", "malekmaciej/przepisy")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "main")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+RECIPES_PATH = os.getenv("RECIPES_PATH", "")  # Root path in the repo for recipes
+
+# Push webhook: shared secret for X-Hub-Signature-256 and the route it is served on
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+
+# Route serving Prometheus metrics
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+
+# SQLite file shared by the server processes on a host; disabled when empty
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+# Byte budget for the recipe contents and parsed recipes in that file
+SHARED_CACHE_MAX_BYTES = int(
+    os.getenv("SHARED_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# A push reaches a single worker; only through the shared file do its
+# invalidations reach the others, so only then can TTLs be much longer
+_default_ttl_scale = 10 if GITHUB_WEBHOOK_SECRET and SHARED_CACHE_PATH else 1
+
+# Content cache configuration
+CONTENT_CACHE_MAX_BYTES = int(
+    os.getenv("CONTENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+CONTENT_CACHE_PATH_TTL = float(
+    os.getenv("CONTENT_CACHE_PATH_TTL", str(300 * _default_ttl_scale))
+)
+
+# Number and total bytes of GitHub responses kept for ETag / Last-Modified
+# revalidation; file reads hold base64 recipe text, so they count against it
+CONDITIONAL_CACHE_MAX_ENTRIES = int(os.getenv("CONDITIONAL_CACHE_MAX_ENTRIES", "2048"))
+CONDITIONAL_CACHE_MAX_BYTES = int(
+    os.getenv("CONDITIONAL_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+
+# GitHub request scheduling: sustained rate and burst of the token bucket,
+# hourly budget held back from background work, retries of rate-limited or
+# failed requests, and the longest a tool call waits for a rate limit to lift
+GITHUB_REQUESTS_PER_SECOND = float(os.getenv("GITHUB_REQUESTS_PER_SECOND", "10"))
+GITHUB_BURST = int(os.getenv("GITHUB_BURST", "100"))
+GITHUB_BACKGROUND_RESERVE = int(os.getenv("GITHUB_BACKGROUND_RESERVE", "500"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+GITHUB_MAX_WAIT = float(os.getenv("GITHUB_MAX_WAIT", "20"))
+
+# Bulk fetches: concurrent GitHub requests and per-request timeout in seconds
+FETCH_MAX_IN_FLIGHT = int(os.getenv("FETCH_MAX_IN_FLIGHT", "8"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "30"))
+
+# Number of parsed recipes kept for get_recipe_structured
+PARSED_CACHE_MAX_ENTRIES = int(os.getenv("PARSED_CACHE_MAX_ENTRIES", "4096"))
+
+# Seconds a listing is served before the branch head is checked again
+TREE_REFRESH_INTERVAL = float(
+    os.getenv("TREE_REFRESH_INTERVAL", str(30 * _default_ttl_scale))
+)
+
+# Recipes per list_recipes page unless the caller asks for another limit
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+LIST_MAX_PAGE_SIZE = 1000
+# Lines per page of the recipe://list resource
+LIST_RESOURCE_PAGE_SIZE = 500
+
+# Similarity from which create_recipe treats an existing recipe as a duplicate
+DUPLICATE_SIMILARITY = float(os.getenv("DUPLICATE_SIMILARITY", "0.8"))
+
+# Storage backend configuration ("github" or "local")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "github")
+LOCAL_REPO_PATH = os.getenv("LOCAL_REPO_PATH", "")
+LOCAL_REPO_URL = os.getenv("LOCAL_REPO_URL", "")
+LOCAL_FETCH_INTERVAL = float(os.getenv("LOCAL_FETCH_INTERVAL", "60"))
+
+# Times a batch commit is rebuilt when the branch moves underneath it
+BATCH_COMMIT_ATTEMPTS = 3
+
+# Snapshot of the indexes for warm restarts; disabled when SNAPSHOT_PATH is empty
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "")
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "300"))
+
+# Initialize GitHub client
+github_client = None
+repo = None
+
+
+class ConditionalRequestCache:
+    """
+    Validators and payloads of GitHub GET responses, keyed by URL.
+
+    Stored responses are revalidated with If-None-Match / If-Modified-Since.
+    A 304 answer is served from the stored copy and does not count against
+    the primary rate limit. The least recently used responses are dropped
+    once there are more than ``max_entries`` of them or their bodies add up
+    to more than ``max_bytes``.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int = CONDITIONAL_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[str], Optional[str], Dict[str, Any], Any, int]]" = (OrderedDict())
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get_json(
+        self, requester, url: str, parameters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Any]:
+        """GET a JSON resource, revalidating a stored copy when there is one"""
+        key = url
+        if parameters:
+            key += "?" + urllib.parse.urlencode(sorted(parameters.items()))
+
+        request_headers = {}
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            etag, last_modified, _, _, _ = entry
+            if etag:
+                request_headers["If-None-Match"] = etag
+            if last_modified:
+                request_headers["If-Modified-Since"] = last_modified
+
+        status, response_headers, output = requester.requestJson(
+            "GET", url, parameters, request_headers, follow_302_redirect=True
+        )
+        with self._lock:
+            self.requests += 1
+            if status == 304 and entry is not None:
+                self.not_modified += 1
+                self._entries.move_to_end(key)
+                return entry[2], entry[3]
+
+        data = json.loads(output) if output else None
+        if status >= 400:
+            raise requester.createException(status, response_headers, data)
+
+        etag = response_headers.get("etag")
+        last_modified = response_headers.get("last-modified")
+        size = len(output.encode("utf-8")) if output else 0
+        if (etag or last_modified) and size <= self.max_bytes:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self.current_bytes -= previous[4]
+                self._entries[key] = (etag, last_modified, response_headers, data, size)
+                self.current_bytes += size
+                while (
+                    len(self._entries) > self.max_entries
+                    or self.current_bytes > self.max_bytes
+                ):
+                    _, evicted = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted[4]
+                    self.evictions += 1
+        return response_headers, data
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of stored responses and revalidation counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+
+conditional_cache = ConditionalRequestCache(CONDITIONAL_CACHE_MAX_ENTRIES)
+
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metrics:
+    """
+    In-process counters, gauges and latency histograms.
+
+    Metrics are declared once with their type and help text, and samples are
+    keyed by label values. ``render`` writes them in the Prometheus text
+    exposition format, followed by any samples collected from other
+    components at scrape time.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._samples: Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]] = {}
+
+    def declare(self, name: str, kind: str, help_text: str) -> None:
+        """Register a counter, gauge or histogram"""
+        with self._lock:
+            self._meta[name] = (kind, help_text)
+            self._samples.setdefault(name, {})
+
+    def inc(
+        self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1
+    ) -> None:
+        """Add value (which may be negative for gauges) to a sample"""
+        key = _label_key(labels)
+        with self._lock:
+            samples = self._samples[name]
+            samples[key] = samples.get(key, 0) + value
+
+    def set(
+        self, name: str, value: float, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Set a gauge"""
+        key = _label_key(labels)
+        with self._lock:
+            self._samples[name][key] = value
+
+    def observe(
+        self, name: str, seconds: float, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Record one duration in a histogram"""
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            samples = self._samples[name]
+            histogram = samples.get(key)
+            if histogram is None:
+                histogram = samples[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def get(self, name: str, labels: Optional[Dict[str, str]] = None) -> Any:
+        """Return a counter or gauge value, or a histogram's (sum, count)"""
+        with self._lock:
+            sample = self._samples[name].get(_label_key(labels))
+            if isinstance(sample, list):
+                return sample[1], sample[2]
+            return sample or 0
+
+    def render(
+        self,
+        collected: Iterable[
+            Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+        ] = (),
+    ) -> str:
+        """
+        Render every metric in the Prometheus text format.
+
+        Args:
+            collected: Extra (name, type, help, [(labels, value), ...]) metrics
+                       sampled from other components
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, sample in sorted(self._samples[name].items()):
+                    if kind != "histogram":
+                        lines.append(f"{name}{_format_labels(key)} {sample:g}")
+                        continue
+                    counts, total, count = sample
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        labels = _format_labels(key + (("le", f"{bound:g}"),))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(key + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{labels} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+        for name, kind, help_text, samples in collected:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(
+                    f"{name}{_format_labels(sorted(labels.items()))} {value:g}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.declare("recipe_mcp_tool_calls_total", "counter", "Tool calls, by tool")
+metrics.declare(
+    "recipe_mcp_tool_errors_total",
+    "counter",
+    "Tool calls that raised or returned success false, by tool",
+)
+metrics.declare(
+    "recipe_mcp_tool_duration_seconds", "histogram", "Tool call latency, by tool"
+)
+metrics.declare(
+    "recipe_mcp_tools_in_flight", "gauge", "Tool calls currently running, by tool"
+)
+metrics.declare(
+    "recipe_mcp_github_requests_total",
+    "counter",
+    "GitHub API requests, by endpoint, method and response status",
+)
+metrics.declare(
+    "recipe_mcp_github_request_duration_seconds",
+    "histogram",
+    "GitHub API request latency, by endpoint",
+)
+metrics.declare(
+    "recipe_mcp_github_in_flight", "gauge", "GitHub API requests currently being sent"
+)
+metrics.declare(
+    "recipe_mcp_startup_seconds",
+    "gauge",
+    "Seconds spent in each startup phase, and in total until ready",
+)
+metrics.declare("recipe_mcp_ready", "gauge", "1 once startup warmup has finished")
+metrics.set("recipe_mcp_ready", 0)
+
+
+def instrumented(fn: Callable) -> Callable:
+    """Count calls, errors and latency of a tool"""
+    labels = {"tool": fn.__name__}
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        metrics.inc("recipe_mcp_tools_in_flight", labels)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            # Write tools report failures in their result rather than raising
+            failed = isinstance(result, dict) and result.get("success") is False
+            return result
+        finally:
+            metrics.inc("recipe_mcp_tools_in_flight", labels, -1)
+            metrics.inc("recipe_mcp_tool_calls_total", labels)
+            if failed:
+                metrics.inc("recipe_mcp_tool_errors_total", labels)
+            metrics.observe(
+                "recipe_mcp_tool_duration_seconds",
+                time.perf_counter() - started,
+                labels,
+            )
+
+    return wrapper
+
+
+def github_endpoint(url: str) -> str:
+    """Name the GitHub API endpoint a request URL belongs to, e.g. contents or git/trees"""
+    parts = urllib.parse.urlparse(url).path.strip("/").split("/")
+    if "repos" not in parts:
+        return parts[0] or "root"
+    rest = parts[parts.index("repos") + 3 :]
+    if not rest:
+        return "repo"
+    return "/".join(rest[:2]) if rest[0] == "git" else rest[0]
+
+
+# Priority of the GitHub requests made by the current task or thread
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+_github_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "github_priority", default=INTERACTIVE
+)
+
+
+@contextmanager
+def background_priority():
+    """Mark the GitHub requests made inside the block as background work"""
+    token = _github_priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _github_priority.reset(token)
+
+
+class GitHubScheduler:
+    """
+    Gatekeeper for every request sent to the GitHub API.
+
+    Requests draw from a token bucket that caps the short-term request rate
+    below GitHub's secondary limits. The X-RateLimit-* headers of every
+    response track the primary hourly budget: background work (warmup,
+    webhook refreshes) stops while the budget is below ``background_reserve``
+    or while interactive requests are waiting, so tool calls keep working.
+    Rate-limited responses block all requests until ``Retry-After`` or the
+    reset time; rate limits and transient 5xx errors are retried with
+    jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        burst: int,
+        background_reserve: int,
+        max_retries: int,
+        max_wait: float,
+    ):
+        self.rate = requests_per_second
+        self.burst = burst
+        self.background_reserve = background_reserve
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting_interactive = 0
+        self._condition = threading.Condition()
+        # Budget reported by GitHub; unknown until the first response
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def install(self, requester) -> None:
+        """Route every request a PyGithub Requester sends through the scheduler"""
+        request_json = requester.requestJson
+
+        def scheduled_request_json(verb, url, *args, **kwargs):
+            endpoint = github_endpoint(url)
+
+            def send():
+                metrics.inc("recipe_mcp_github_in_flight")
+                started = time.perf_counter()
+                status = "error"
+                try:
+                    response = request_json(verb, url, *args, **kwargs)
+                    status = str(response[0])
+                    return response
+                finally:
+                    metrics.inc("recipe_mcp_github_in_flight", None, -1)
+                    metrics.inc(
+                        "recipe_mcp_github_requests_total",
+                        {"endpoint": endpoint, "method": verb, "status": status},
+                    )
+                    metrics.observe(
+                        "recipe_mcp_github_request_duration_seconds",
+                        time.perf_counter() - started,
+                        {"endpoint": endpoint},
+                    )
+
+            return self.call(verb, send)
+
+        requester.requestJson = scheduled_request_json
+
+    def call(
+        self, verb: str, send: Callable[[], Tuple[int, Dict[str, Any], Any]]
+    ) -> Tuple[int, Dict[str, Any], Any]:
+        """
+        Send a request once the scheduler allows it, retrying when GitHub
+        asks to slow down or fails transiently.
+
+        Returns:
+            The (status, headers, body) of the last attempt.
+        """
+        priority = _github_priority.get()
+        for attempt in range(1, self.max_retries + 2):
+            self._acquire(priority)
+            status, headers, output = send()
+            delay = self._observe(verb, status, headers, output, attempt)
+            if delay is None or attempt > self.max_retries:
+                return status, headers, output
+            if priority == INTERACTIVE and delay > self.max_wait:
+                # Fail the tool call now rather than hang it until the reset
+                return status, headers, output
+            with self._condition:
+                self.retries += 1
+            logger.warning(
+                f"GitHub answered {status} to {verb}, retrying in {delay:.1f}s "
+                f"(attempt {attempt}/{self.max_retries})"
+            )
+            time.sleep(delay)
+        return status, headers, output
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the remaining GitHub budget and scheduler counters"""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "resets_in": (
+                    max(0.0, round(self.reset_at - time.time(), 1))
+                    if self.reset_at
+                    else None
+                ),
+                "blocked_for": round(max(0.0, self._blocked_until - now), 1),
+                "tokens": round(self._tokens, 1),
+                "waiting_interactive": self._waiting_interactive,
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+            }
+
+    def _acquire(self, priority: str) -> None:
+        with self._condition:
+            if priority == INTERACTIVE:
+                self._waiting_interactive += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._blocked_until > now:
+                        wait_for = self._blocked_until - now
+                        if priority == INTERACTIVE and wait_for > self.max_wait:
+                            raise RateLimitExceededException(
+                                403,
+                                {
+                                    "message": "GitHub rate limit reached, requests "
+                                    f"resume in {wait_for:.0f}s"
+                                },
+                                None,
+                            )
+                    elif priority == BACKGROUND and self._yield_to_interactive():
+                        wait_for = 1.0
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        self.requests += 1
+                        return
+                    else:
+                        wait_for = (1 - self._tokens) / self.rate
+                    self._condition.wait(min(wait_for, 1.0))
+            finally:
+                if priority == INTERACTIVE:
+                    self._waiting_interactive -= 1
+                    self._condition.notify_all()
+
+    def _yield_to_interactive(self) -> bool:
+        if self._waiting_interactive:
+            return True
+        if self.remaining is not None and self.remaining <= self.background_reserve:
+            # Leave what is left of the hourly budget to tool calls
+            return self.reset_at is None or self.reset_at > time.time()
+        return False
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._refilled_at = now
+
+    def _observe(
+        self, verb: str, status: int, headers: Dict[str, Any], output: Any, attempt: int
+    ) -> Optional[float]:
+        """Record the budget from a response and decide whether to retry it"""
+        with self._condition:
+            if "x-ratelimit-remaining" in headers:
+                self.limit = int(headers.get("x-ratelimit-limit", 0)) or self.limit
+                self.remaining = int(headers["x-ratelimit-remaining"])
+                if "x-ratelimit-reset" in headers:
+                    self.reset_at = float(headers["x-ratelimit-reset"])
+
+            delay = None
+            if status in (403, 429):
+                if "retry-after" in headers:
+                    delay = float(headers["retry-after"])
+                elif self.remaining == 0 and self.reset_at:
+                    delay = max(self.reset_at - time.time(), 0.0) + 1
+                elif "rate limit" in str(output).lower():
+                    # Secondary limit without a hint; GitHub asks for at least a minute
+                    delay = 60.0 * 2 ** (attempt - 1)
+                if delay is not None:
+                    self.rate_limited += 1
+                    # A little jitter so workers do not all come back at once
+                    delay *= 1 + random.uniform(0, 0.1)
+                    self._blocked_until = max(
+                        self._blocked_until, time.monotonic() + delay
+                    )
+            elif status in (500, 502, 503, 504) and verb == "GET":
+                # Full jitter: anywhere between no wait and the exponential cap
+                delay = random.uniform(0, min(30.0, 0.5 * 2**attempt))
+            return delay
+
+
+github_scheduler = GitHubScheduler(
+    GITHUB_REQUESTS_PER_SECOND,
+    GITHUB_BURST,
+    GITHUB_BACKGROUND_RESERVE,
+    GITHUB_MAX_RETRIES,
+    GITHUB_MAX_WAIT,
+)
+
+
+def initialize_github():
+    """
+    Initialize GitHub client and repository.
+
+    No request is sent: the repository is a lazy handle, and the first
+    request (the branch head read during warmup) verifies the token and
+    repository name.
+    """
+    global github_client, repo
+
+    if not GITHUB_TOKEN:
+        logger.error("GITHUB_TOKEN environment variable not set")
+        raise ValueError("GITHUB_TOKEN is required")
+
+    try:
+        from github import Auth
+
+        auth = Auth.Token(GITHUB_TOKEN)
+        # Concurrency is bounded by the fetch engine and pacing, retries and
+        # rate limits are handled by the scheduler rather than by PyGithub
+        github_client = Github(
+            auth=auth,
+            base_url=GITHUB_API_URL,
+            timeout=int(FETCH_TIMEOUT),
+            seconds_between_requests=None,
+            retry=None,
+        )
+        github_scheduler.install(github_client.requester)
+        repo = Repository(
+            github_client.requester,
+            {},
+            {"url": f"/repos/{GITHUB_REPO}", "full_name": GITHUB_REPO},
+            completed=False,
+        )
+        logger.info(f"GitHub client ready for repo: {GITHUB_REPO}")
+    except Exception as e:
+        logger.error(f"Failed to initialize GitHub client: {e}")
+        raise
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Compute the SHA git (and GitHub) assigns to a blob with this content"""
+    header = f"blob {len(data)}\0".encode("ascii")
+    return hashlib.sha1(header + data).hexdigest()
+
+
+URL_CREDENTIALS = re.compile(r"(\w+://)[^/@\s]+@")
+
+
+def redact_credentials(text: str) -> str:
+    """Mask credentials in URLs and the GitHub token in text bound for logs or errors"""
+    text = URL_CREDENTIALS.sub(r"\1***@", text)
+    if GITHUB_TOKEN:
+        text = text.replace(GITHUB_TOKEN, "***")
+    return text
+
+
+# GitHub answers a stale SHA with 409, or with 422 and one of these messages;
+# other 422s are validation errors
+SHA_MISMATCH_MESSAGE = re.compile(r"does not match|is at \w+ but expected", re.I)
+
+
+def is_sha_mismatch(e: GithubException) -> bool:
+    """Tell a rejected write against a stale blob SHA from other GitHub errors"""
+    if e.status == 409:
+        return True
+    message = e.data.get("message", "") if isinstance(e.data, dict) else str(e.data)
+    return e.status == 422 and bool(SHA_MISMATCH_MESSAGE.search(message or ""))
+
+
+class WriteConflictError(Exception):
+    """A file was changed since the blob SHA a write was based on"""
+
+
+class StorageBackend:
+    """
+    Where recipe files are read from and written to.
+
+    Every implementation identifies files by git blob SHA, so caches and
+    indexes behave the same regardless of the backend behind them.
+    """
+
+    def get_head_tree_sha(self) -> str:
+        """Get an identifier of the current root tree"""
+        raise NotImplementedError
+
+    def list_files(self, tree_sha: str) -> List[Dict[str, Any]]:
+        """List every recipe file in the tree as {name, path, size, sha} dicts"""
+        raise NotImplementedError
+
+    def get_file(self, path: str) -> Tuple[str, str]:
+        """Get the blob SHA and decoded content of a file"""
+        raise NotImplementedError
+
+    def get_blob(self, sha: str) -> str:
+        """Get the decoded content of a blob by SHA"""
+        raise NotImplementedError
+
+    def refresh(self) -> None:
+        """Pick up changes made to the repository outside this server"""
+
+    def create_file(self, path: str, content: str, message: str) -> Dict[str, Any]:
+        """Create a file and return its new blob SHA and commit SHA"""
+        raise NotImplementedError
+
+    def update_file(
+        self, path: str, content: str, message: str, sha: str
+    ) -> Dict[str, Any]:
+        """
+        Replace the blob with the given SHA and return the new blob SHA and commit SHA.
+
+        Raises WriteConflictError when the file is no longer at that SHA.
+        """
+        raise NotImplementedError
+
+    def write_files(self, files: Dict[str, str], message: str) -> Dict[str, Any]:
+        """
+        Create or replace several files in a single commit.
+
+        Returns the commit SHA and a {path: blob_sha} map of the written files.
+        """
+        raise NotImplementedError
+
+
+class GitHubBackend(StorageBackend):
+    """
+    Recipes read and written through the GitHub REST API.
+
+    Branch and contents reads are conditional requests, so re-reading an
+    unchanged branch head, file or directory costs a 304 instead of a full
+    payload. Trees and blobs are fetched by SHA and never change.
+    """
+
+    def __init__(
+        self,
+        repository,
+        branch: str = GITHUB_BRANCH,
+        conditional_cache: Optional[ConditionalRequestCache] = None,
+    ):
+        self.repo = repository
+        self.branch = branch
+        self.conditional_cache = conditional_cache or ConditionalRequestCache(
+            CONDITIONAL_CACHE_MAX_ENTRIES
+        )
+
+    def get_head_tree_sha(self) -> str:
+        branch = self._get_json(f"/branches/{urllib.parse.quote(self.branch)}")
+        return branch["commit"]["commit"]["tree"]["sha"]
+
+    def list_files(self, tree_sha: str) -> List[Dict[str, Any]]:
+        tree = self.repo.get_git_tree(tree_sha, recursive=True)
+        if tree.raw_data.get("truncated"):
+            # GitHub caps recursive trees; fall back to walking directories
+            logger.warning(
+                f"Git tree {tree_sha} is truncated, walking directories instead"
+            )
+            return self._walk("")
+
+        return [
+            {
+                "name": os.path.basename(element.path),
+                "path": element.path,
+                "size": element.size,
+                "sha": element.sha,
+            }
+            for element in tree.tree
+            if element.type == "blob" and element.path.endswith(".md")
+        ]
+
+    def get_file(self, path: str) -> Tuple[str, str]:
+        content_file = self._get_contents(path)
+        if isinstance(content_file, list):
+            raise ValueError(f"Path {path} is a directory, not a file")
+        content = base64.b64decode(content_file["content"]).decode("utf-8")
+        return content_file["sha"], content
+
+    def get_blob(self, sha: str) -> str:
+        blob = self.repo.get_git_blob(sha)
+        return base64.b64decode(blob.content).decode("utf-8")
+
+    def create_file(self, path: str, content: str, message: str) -> Dict[str, Any]:
+        result = self.repo.create_file(
+            path=path, message=message, content=content, branch=self.branch
+        )
+        return {"sha": result["content"].sha, "commit_sha": result["commit"].sha}
+
+    def update_file(
+        self, path: str, content: str, message: str, sha: str
+    ) -> Dict[str, Any]:
+        try:
+            result = self.repo.update_file(
+                path=path, message=message, content=content, sha=sha, branch=self.branch
+            )
+        except GithubException as e:
+            if is_sha_mismatch(e):
+                raise WriteConflictError(f"{path} is no longer at blob {sha}") from e
+            raise
+        return {"sha": result["content"].sha, "commit_sha": result["commit"].sha}
+
+    def write_files(self, files: Dict[str, str], message: str) -> Dict[str, Any]:
+        # Contents go inline in the tree, so a batch costs five requests
+        # (ref, head commit, tree, commit, ref update) however many files it has
+        elements = [
+            InputGitTreeElement(path, "100644", "blob", content=content)
+            for path, content in files.items()
+        ]
+        for attempt in range(1, BATCH_COMMIT_ATTEMPTS + 1):
+            ref = self.repo.get_git_ref(f"heads/{self.branch}")
+            head = self.repo.get_git_commit(ref.object.sha)
+            tree = self.repo.create_git_tree(elements, base_tree=head.tree)
+            commit = self.repo.create_git_commit(message, tree, [head])
+            try:
+                ref.edit(commit.sha)
+                break
+            except GithubException as e:
+                # 422 means the branch moved since it was read; rebuild on the new head
+                if e.status != 422 or attempt == BATCH_COMMIT_ATTEMPTS:
+                    raise
+                logger.info(f"Branch {self.branch} moved, retrying batch commit")
+
+        return {
+            "commit_sha": commit.sha,
+            "files": {
+                path: git_blob_sha(content.encode("utf-8"))
+                for path, content in files.items()
+            },
+        }
+
+    def _walk(self, path: str) -> List[Dict[str, Any]]:
+        """List recipe files by walking the contents API directory by directory"""
+        recipes = []
+        for content in self._get_contents(path):
+            if content["type"] == "file" and content["name"].endswith(".md"):
+                recipes.append(
+                    {
+                        "name": content["name"],
+                        "path": content["path"],
+                        "size": content["size"],
+                        "sha": content["sha"],
+                    }
+                )
+            elif content["type"] == "dir":
+                # Recursively list recipes in subdirectories
+                recipes.extend(self._walk(content["path"]))
+        return recipes
+
+    def _get_contents(self, path: str) -> Any:
+        """Get the raw contents API payload for a file (dict) or directory (list)"""
+        return self._get_json(
+            f"/contents/{urllib.parse.quote(path.strip('/'))}", {"ref": self.branch}
+        )
+
+    def _get_json(
+        self, endpoint: str, parameters: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        _, data = self.conditional_cache.get_json(
+            self.repo.requester, f"{self.repo.url}{endpoint}", parameters
+        )
+        return data
+
+
+class LocalGitBackend(StorageBackend):
+    """
+    Recipes read straight from a local directory.
+
+    When the directory is a git clone with a remote, a background thread
+    fetches and resets it to the remote branch every ``fetch_interval``
+    seconds, and writes are committed and pushed. A plain directory such as
+    ``sample-recipes/`` is served as-is and written to directly. Every write,
+    including a batch of files, is a single commit.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        branch: str = GITHUB_BRANCH,
+        fetch_interval: float = LOCAL_FETCH_INTERVAL,
+        remote_url: Optional[str] = None,
+        token: Optional[str] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.branch = branch
+        self.fetch_interval = fetch_interval
+        # The token reaches git as an HTTP header scoped to the remote's host,
+        # never through the URL, so it is not written to .git/config
+        self._auth_scope = None
+        self._token = token
+        if token and remote_url:
+            parts = urllib.parse.urlsplit(remote_url)
+            if parts.scheme in ("http", "https"):
+                self._auth_scope = f"{parts.scheme}://{parts.hostname}/"
+        if not os.path.exists(self.root) and remote_url:
+            logger.info(f"Cloning recipes into {self.root}")
+            self._run_git(
+                ["clone", "--quiet", "--branch", branch, remote_url, self.root]
+            )
+        if not os.path.isdir(self.root):
+            raise ValueError(f"Local recipe directory {self.root} does not exist")
+
+        self.is_git = os.path.isdir(os.path.join(self.root, ".git"))
+        self.has_remote = self.is_git and "origin" in self._git("remote").split()
+        if self.has_remote and self._auth_scope:
+            origin = self._git("remote", "get-url", "origin").strip()
+            if URL_CREDENTIALS.search(origin):
+                # Clones made by earlier versions kept the token in the remote URL
+                self._git(
+                    "remote", "set-url", "origin", URL_CREDENTIALS.sub(r"\1", origin)
+                )
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Plain directories: path -> (mtime_ns, size, sha) so unchanged files are not rehashed
+        self._file_hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._blob_paths: Dict[str, str] = {}
+
+    def start(self) -> None:
+        """Start the periodic fetch thread when there is a remote to fetch from"""
+        if not self.has_remote or self.fetch_interval <= 0 or self._thread:
+            return
+        self._thread = threading.Thread(
+            target=self._fetch_loop, name="local-git-fetch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the periodic fetch thread"""
+        self._stop.set()
+
+    def refresh(self) -> None:
+        """Fetch the remote branch and reset the working tree to it"""
+        if not self.has_remote:
+            return
+        with self._lock:
+            self._git("fetch", "--quiet", "origin", self.branch)
+            self._git("reset", "--hard", "--quiet", f"origin/{self.branch}")
+
+    def get_head_tree_sha(self) -> str:
+        with self._lock:
+            if self.is_git:
+                return self._git("rev-parse", "HEAD^{tree}").strip()
+            # Plain directories get a fingerprint of file names, sizes and mtimes
+            fingerprint = hashlib.sha1()
+            for path, full_path in self._walk():
+                stat = os.stat(full_path)
+                fingerprint.update(
+                    f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8")
+                )
+            return fingerprint.hexdigest()
+
+    def list_files(self, tree_sha: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            recipes = []
+            if self.is_git:
+                output = self._git("ls-tree", "-r", "-l", "-z", "HEAD")
+                for record in output.split("\0"):
+                    if not record:
+                        continue
+                    info, path = record.split("\t", 1)
+                    _, object_type, sha, size = info.split()
+                    if object_type == "blob" and path.endswith(".md"):
+                        recipes.append(self._metadata(path, int(size), sha))
+            else:
+                for path, full_path in self._walk():
+                    stat = os.stat(full_path)
+                    cached = self._file_hashes.get(path)
+                    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                        sha = cached[2]
+                    else:
+                        with open(full_path, "rb") as f:
+                            sha = git_blob_sha(f.read())
+                        self._file_hashes[path] = (stat.st_mtime_ns, stat.st_size, sha)
+                    recipes.append(self._metadata(path, stat.st_size, sha))
+            self._blob_paths = {recipe["sha"]: recipe["path"] for recipe in recipes}
+            return recipes
+
+    def get_file(self, path: str) -> Tuple[str, str]:
+        full_path = self._resolve(path)
+        if os.path.isdir(full_path):
+            raise ValueError(f"Path {path} is a directory, not a file")
+        with open(full_path, "rb") as f:
+            data = f.read()
+        return git_blob_sha(data), data.decode("utf-8")
+
+    def get_blob(self, sha: str) -> str:
+        path = self._blob_paths.get(sha)
+        if path:
+            try:
+                blob_sha, content = self.get_file(path)
+                if blob_sha == sha:
+                    return content
+            except OSError:
+                pass
+        if self.is_git:
+            return self._git("cat-file", "blob", sha)
+        raise FileNotFoundError(f"Blob {sha} not found in {self.root}")
+
+    def create_file(self, path: str, content: str, message: str) -> Dict[str, Any]:
+        with self._lock:
+            if os.path.exists(self._resolve(path)):
+                raise FileExistsError(f"Path {path} already exists")
+            return self._write_one(path, content, message)
+
+    def update_file(
+        self, path: str, content: str, message: str, sha: str
+    ) -> Dict[str, Any]:
+        with self._lock:
+            current_sha, _ = self.get_file(path)
+            if current_sha != sha:
+                raise WriteConflictError(
+                    f"Path {path} is at blob {current_sha}, not {sha}; "
+                    "it was changed concurrently"
+                )
+            return self._write_one(path, content, message)
+
+    def write_files(self, files: Dict[str, str], message: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._write(files, message)
+
+    def _write_one(self, path: str, content: str, message: str) -> Dict[str, Any]:
+        result = self._write({path: content}, message)
+        return {"sha": result["files"][path], "commit_sha": result["commit_sha"]}
+
+    def _write(self, files: Dict[str, str], message: str) -> Dict[str, Any]:
+        # Resolve every path first so a bad one fails before anything is written
+        full_paths = {path: self._resolve(path) for path in files}
+        written = {}
+        for path, content in files.items():
+            data = content.encode("utf-8")
+            os.makedirs(os.path.dirname(full_paths[path]), exist_ok=True)
+            with open(full_paths[path], "wb") as f:
+                f.write(data)
+            written[path] = git_blob_sha(data)
+
+        commit_sha = None
+        if self.is_git:
+            self._git("add", "--", *full_paths.values())
+            self._git("commit", "--quiet", "-m", message)
+            if self.has_remote:
+                try:
+                    self._git("push", "--quiet", "origin", f"HEAD:{self.branch}")
+                except subprocess.CalledProcessError:
+                    # Keep the mirror identical to the remote branch
+                    self._git("reset", "--hard", "--quiet", "HEAD~1")
+                    raise
+            commit_sha = self._git("rev-parse", "HEAD").strip()
+        return {"commit_sha": commit_sha, "files": written}
+
+    def _resolve(self, path: str) -> str:
+        """Map a repository path onto the directory, refusing paths that escape it"""
+        full_path = os.path.normpath(os.path.join(self.root, path.lstrip("/")))
+        if not full_path.startswith(self.root + os.sep):
+            raise ValueError(f"Path {path} is outside the recipe directory")
+        return full_path
+
+    def _walk(self) -> List[Tuple[str, str]]:
+        """List (path, full_path) for every markdown file, in path order"""
+        found = []
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for filename in filenames:
+                if filename.endswith(".md"):
+                    full_path = os.path.join(directory, filename)
+                    path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                    found.append((path, full_path))
+        return sorted(found)
+
+    @staticmethod
+    def _metadata(path: str, size: int, sha: str) -> Dict[str, Any]:
+        return {"name": os.path.basename(path), "path": path, "size": size, "sha": sha}
+
+    def _fetch_loop(self) -> None:
+        while not self._stop.wait(self.fetch_interval):
+            try:
+                self.refresh()
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Could not refresh local recipe mirror: {e.stderr}")
+
+    def _git(self, *args: str) -> str:
+        return self._run_git(["-C", self.root, *args])
+
+    def _git_env(self) -> Dict[str, str]:
+        # Containers usually have no git identity configured
+        env = dict(os.environ)
+        for variable in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+            env.setdefault(variable, "Recipe MCP Server")
+        for variable in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+            env.setdefault(variable, "recipe-mcp-server@localhost")
+        env["GIT_TERMINAL_PROMPT"] = "0"
+        if self._auth_scope:
+            credentials = base64.b64encode(f"x-access-token:{self._token}".encode())
+            count = int(env.get("GIT_CONFIG_COUNT", "0"))
+            env["GIT_CONFIG_COUNT"] = str(count + 1)
+            env[f"GIT_CONFIG_KEY_{count}"] = f"http.{self._auth_scope}.extraHeader"
+            env[f"GIT_CONFIG_VALUE_{count}"] = (
+                f"Authorization: Basic {credentials.decode('ascii')}"
+            )
+        return env
+
+    def _run_git(self, args: List[str]) -> str:
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                check=True,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                env=self._git_env(),
+            )
+        except subprocess.CalledProcessError as e:
+            # Remote URLs in the command or output may carry credentials
+            raise subprocess.CalledProcessError(
+                e.returncode,
+                [redact_credentials(arg) for arg in e.cmd],
+                redact_credentials(e.stdout or ""),
+                redact_credentials(e.stderr or ""),
+            ) from None
+        return result.stdout
+
+
+# Active storage backend
+storage: Optional[StorageBackend] = None
+
+
+_storage_lock = threading.Lock()
+
+
+def check_storage_config() -> None:
+    """Fail fast on settings the storage backend cannot start without"""
+    if STORAGE_BACKEND == "local":
+        if not LOCAL_REPO_PATH:
+            logger.error("LOCAL_REPO_PATH environment variable not set")
+            raise ValueError("LOCAL_REPO_PATH is required for the local backend")
+    elif STORAGE_BACKEND == "github":
+        if not GITHUB_TOKEN:
+            logger.error("GITHUB_TOKEN environment variable not set")
+            raise ValueError("GITHUB_TOKEN is required")
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+
+def initialize_storage():
+    """Initialize the storage backend selected by STORAGE_BACKEND"""
+    global storage
+
+    check_storage_config()
+    if STORAGE_BACKEND == "local":
+        remote_url, token = LOCAL_REPO_URL, None
+        if not remote_url and GITHUB_TOKEN:
+            remote_url, token = f"https://github.com/{GITHUB_REPO}.git", GITHUB_TOKEN
+        backend = LocalGitBackend(
+            LOCAL_REPO_PATH, remote_url=remote_url or None, token=token
+        )
+        backend.start()
+        storage = backend
+        logger.info(f"Serving recipes from local directory: {backend.root}")
+    else:
+        initialize_github()
+        storage = GitHubBackend(repo, conditional_cache=conditional_cache)
+
+
+def initialize_shared_cache() -> None:
+    """Attach the SQLite cache tier at SHARED_CACHE_PATH, if configured"""
+    global shared_cache, _listing_shared_seq
+
+    if not SHARED_CACHE_PATH:
+        return
+    shared_cache = SharedCache(SHARED_CACHE_PATH, snapshot_source())
+    content_cache.attach_shared(shared_cache)
+    parsed_recipes.shared = shared_cache
+    _listing_shared_seq = shared_cache.last_seq()
+    logger.info(f"Sharing caches with other workers through {SHARED_CACHE_PATH}")
+
+
+def get_storage() -> StorageBackend:
+    """
+    Return the storage backend, initializing it on first use.
+
+    Startup initializes it from the warmup thread; a tool call that arrives
+    first does it instead, and concurrent callers wait for a single attempt.
+    """
+    if storage is None:
+        with _storage_lock:
+            if storage is None:
+                initialize_storage()
+    return storage
+
+
+class SharedCache:
+    """
+    Cache tier in a SQLite file shared by every server process on a host.
+
+    Blob contents, parsed recipes and tree listings are keyed by SHA and
+    never change, so whatever one worker fetched every other worker can
+    reuse. Path mappings and the branch head keep their wall-clock age so
+    the usual TTLs apply. Invalidations are appended to a log that every
+    process replays, so a write or webhook handled by one worker reaches
+    all of them. Path and head keys are scoped to ``namespace`` so
+    deployments of different repositories can share a file safely.
+
+    Blobs and parsed recipes are bounded by ``max_bytes`` and the least
+    recently used are pruned first; only the latest listings are kept.
+    Freed pages are reused, so the file stops growing at about the budget.
+    """
+
+    SCHEMA_VERSION = 2
+    # Invalidation log entries kept for processes that are catching up
+    LOG_RETENTION = 10000
+    # Tree listings kept; older trees are only needed by lagging workers
+    LISTING_RETENTION = 8
+    # Seconds between access time updates of an entry, so reads rarely write
+    TOUCH_INTERVAL = 60.0
+    # Writes by this process between checks of the byte budget
+    PRUNE_EVERY = 100
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        max_bytes: int = SHARED_CACHE_MAX_BYTES,
+        busy_timeout: float = 5.0,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._writes_since_prune = 0
+
+        db = self._db()
+        if db.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            db.executescript(f"""
+                BEGIN;
+                DROP TABLE IF EXISTS blobs;
+                DROP TABLE IF EXISTS parsed;
+                DROP TABLE IF EXISTS listings;
+                DROP TABLE IF EXISTS paths;
+                DROP TABLE IF EXISTS heads;
+                DROP TABLE IF EXISTS invalidations;
+                CREATE TABLE blobs (
+                    sha TEXT PRIMARY KEY, content TEXT NOT NULL,
+                    size INTEGER NOT NULL, accessed_at REAL NOT NULL
+                );
+                CREATE TABLE parsed (
+                    sha TEXT PRIMARY KEY, data TEXT NOT NULL,
+                    size INTEGER NOT NULL, accessed_at REAL NOT NULL
+                );
+                CREATE INDEX blobs_accessed ON blobs (accessed_at);
+                CREATE INDEX parsed_accessed ON parsed (accessed_at);
+                CREATE TABLE listings (
+                    tree_sha TEXT PRIMARY KEY, data TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                );
+                CREATE TABLE paths (
+                    path TEXT PRIMARY KEY, sha TEXT NOT NULL, stored_at REAL NOT NULL
+                );
+                CREATE TABLE heads (
+                    name TEXT PRIMARY KEY, tree_sha TEXT NOT NULL, checked_at REAL NOT NULL
+                );
+                CREATE TABLE invalidations (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT
+                );
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+                COMMIT;
+                """)
+
+    def _db(self) -> sqlite3.Connection:
+        """Return this thread's connection; connections cannot be shared across threads"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            # WAL lets readers in every process proceed while one writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}\0{key}"
+
+    def _count(self, found: bool) -> None:
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _write(self, sql: str, parameters: Tuple = ()) -> None:
+        self._db().execute(sql, parameters)
+        with self._lock:
+            self.writes += 1
+
+    def _get_sized(self, table: str, column: str, sha: str) -> Optional[str]:
+        db = self._db()
+        row = db.execute(
+            f"SELECT {column}, accessed_at FROM {table} WHERE sha = ?", (sha,)
+        ).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] >= self.TOUCH_INTERVAL:
+            db.execute(f"UPDATE {table} SET accessed_at = ? WHERE sha = ?", (now, sha))
+        return row[0]
+
+    def _put_sized(self, table: str, column: str, sha: str, value: str) -> None:
+        self._write(
+            f"INSERT OR IGNORE INTO {table} (sha, {column}, size, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (sha, value, len(value.encode("utf-8")), time.time()),
+        )
+        with self._lock:
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= self.PRUNE_EVERY
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def get_blob(self, sha: str) -> Optional[str]:
+        return self._get_sized("blobs", "content", sha)
+
+    def put_blob(self, sha: str, content: str) -> None:
+        self._put_sized("blobs", "content", sha, content)
+
+    def get_parsed(self, sha: str) -> Optional[Dict[str, Any]]:
+        data = self._get_sized("parsed", "data", sha)
+        return json.loads(data) if data is not None else None
+
+    def put_parsed(self, sha: str, parsed: Dict[str, Any]) -> None:
+        self._put_sized("parsed", "data", sha, json.dumps(parsed))
+
+    def size(self) -> int:
+        """Return the bytes of blobs and parsed recipes held in the file"""
+        row = (
+            self._db()
+            .execute(
+                "SELECT (SELECT COALESCE(SUM(size), 0) FROM blobs)"
+                " + (SELECT COALESCE(SUM(size), 0) FROM parsed)"
+            )
+            .fetchone()
+        )
+        return row[0]
+
+    def prune(self) -> int:
+        """
+        Drop least recently used blobs and parsed recipes until the file is
+        back under 90% of its byte budget.
+
+        Returns:
+            The number of entries dropped.
+        """
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            excess = self.size() - self.max_bytes
+            dropped = []
+            if excess > 0:
+                excess += self.max_bytes // 10
+                rows = db.execute(
+                    "SELECT 'blobs', sha, size, accessed_at FROM blobs"
+                    " UNION ALL SELECT 'parsed', sha, size, accessed_at FROM parsed"
+                    " ORDER BY accessed_at"
+                )
+                for table, sha, size, _ in rows:
+                    if excess <= 0:
+                        break
+                    dropped.append((table, sha))
+                    excess -= size
+                for table, sha in dropped:
+                    db.execute(f"DELETE FROM {table} WHERE sha = ?", (sha,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.evictions += len(dropped)
+        return len(dropped)
+
+    def get_listing(self, tree_sha: str) -> Optional[List[Dict[str, Any]]]:
+        row = (
+            self._db()
+            .execute("SELECT data FROM listings WHERE tree_sha = ?", (tree_sha,))
+            .fetchone()
+        )
+        self._count(row is not None)
+        return json.loads(row[0]) if row else None
+
+    def put_listing(self, tree_sha: str, recipes: List[Dict[str, Any]]) -> None:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR IGNORE INTO listings (tree_sha, data, stored_at) "
+                "VALUES (?, ?, ?)",
+                (tree_sha, json.dumps(recipes), time.time()),
+            )
+            db.execute(
+                "DELETE FROM listings WHERE tree_sha NOT IN "
+                "(SELECT tree_sha FROM listings ORDER BY stored_at DESC LIMIT ?)",
+                (self.LISTING_RETENTION,),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.writes += 1
+
+    def get_path(self, path: str) -> Optional[Tuple[str, float]]:
+        """Return the blob SHA a path points to and when that was recorded (epoch)"""
+        row = (
+            self._db()
+            .execute(
+                "SELECT sha, stored_at FROM paths WHERE path = ?", (self._key(path),)
+            )
+            .fetchone()
+        )
+        return (row[0], row[1]) if row else None
+
+    def set_paths(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Record (path, sha) pairs in one transaction"""
+        now = time.time()
+        rows = [(self._key(path), sha, now) for path, sha in items]
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO paths (path, sha, stored_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.writes += len(rows)
+
+    def get_head(self, max_age: float) -> Optional[str]:
+        """Return the branch head tree SHA if some process checked it recently"""
+        row = (
+            self._db()
+            .execute(
+                "SELECT tree_sha, checked_at FROM heads WHERE name = ?",
+                (self._key("head"),),
+            )
+            .fetchone()
+        )
+        if row is None or time.time() - row[1] >= max_age:
+            return None
+        return row[0]
+
+    def set_head(self, tree_sha: str) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO heads (name, tree_sha, checked_at) VALUES (?, ?, ?)",
+            (self._key("head"), tree_sha, time.time()),
+        )
+
+    def invalidate(self, kind: str, key: Optional[str] = None) -> None:
+        """
+        Drop shared state and log the invalidation for the other processes.
+
+        Kinds: "path" (one path mapping), "all_paths" and "listing" (the
+        branch head, so the next listing re-checks it).
+        """
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if kind == "path":
+                db.execute("DELETE FROM paths WHERE path = ?", (self._key(key),))
+            elif kind == "all_paths":
+                db.execute(
+                    "DELETE FROM paths WHERE path >= ? AND path < ?",
+                    (self._key(""), f"{self.namespace}\1"),
+                )
+            elif kind == "listing":
+                db.execute("DELETE FROM heads WHERE name = ?", (self._key("head"),))
+            seq = db.execute(
+                "INSERT INTO invalidations (kind, key) VALUES (?, ?)",
+                (kind, self._key(key or "")),
+            ).lastrowid
+            if seq % 1000 == 0:
+                db.execute(
+                    "DELETE FROM invalidations WHERE seq <= ?",
+                    (seq - self.LOG_RETENTION,),
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def last_seq(self) -> int:
+        """Position in the invalidation log to replay from"""
+        row = self._db().execute("SELECT MAX(seq) FROM invalidations").fetchone()
+        return row[0] or 0
+
+    def invalidations_since(self, seq: int) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        Return the log position and the (kind, key) invalidations after seq.
+
+        A process that fell behind the retained log gets "all_paths" and
+        "listing" so it drops everything it may have missed.
+        """
+        db = self._db()
+        rows = db.execute(
+            "SELECT seq, kind, key FROM invalidations WHERE seq > ? ORDER BY seq",
+            (seq,),
+        ).fetchall()
+        if not rows:
+            return seq, []
+        if rows[0][0] > seq + 1:
+            return rows[-1][0], [("all_paths", ""), ("listing", "")]
+        prefix = self._key("")
+        events = [
+            (kind, key[len(prefix) :])
+            for _, kind, key in rows
+            if key.startswith(prefix)
+        ]
+        return rows[-1][0], events
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup and write counters"""
+        with self._lock:
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+
+shared_cache: Optional[SharedCache] = None
+
+
+class ContentCache:
+    """
+    In-process LRU cache of decoded file contents.
+
+    Contents are stored once per blob SHA and bounded by a byte budget. A
+    separate path -> SHA map lets repeat reads of a path be answered without
+    asking GitHub which blob it currently points to; those mappings expire
+    after ``path_ttl`` seconds and are refreshed by listings and writes.
+
+    With a shared tier attached, misses fall through to it, writes and
+    invalidations go through to it, and invalidations made by other
+    processes are replayed before every path lookup.
+    """
+
+    def __init__(self, max_bytes: int, path_ttl: float):
+        self.max_bytes = max_bytes
+        self.path_ttl = path_ttl
+        self._blobs: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._paths: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.shared: Optional[SharedCache] = None
+        self._shared_seq = 0
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+
+    def attach_shared(self, shared: SharedCache) -> None:
+        """Back this cache with a tier shared by other processes"""
+        with self._lock:
+            self.shared = shared
+            self._shared_seq = shared.last_seq()
+
+    def get_by_path(self, path: str) -> Optional[str]:
+        """Return cached content for a path, counting a hit or a miss"""
+        sha = self.get_path_sha(path)
+        content = self.get_blob(sha) if sha is not None else None
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def get_blob(self, sha: str) -> Optional[str]:
+        """Return cached content for a blob SHA without touching the counters"""
+        with self._lock:
+            content = self._get_blob_locked(sha)
+        if content is None and self.shared is not None:
+            content = self.shared.get_blob(sha)
+            if content is not None:
+                self._store_blob(sha, content)
+                with self._lock:
+                    self.shared_hits += 1
+        return content
+
+    def get_path_sha(self, path: str) -> Optional[str]:
+        """Return the blob SHA a path is known to point to, if still fresh"""
+        self._replay_shared_invalidations()
+        with self._lock:
+            entry = self._paths.get(path)
+            if entry is not None:
+                if time.monotonic() - entry[1] <= self.path_ttl:
+                    return entry[0]
+                del self._paths[path]
+        if self.shared is None:
+            return None
+
+        entry = self.shared.get_path(path)
+        if entry is None:
+            return None
+        sha, age = entry[0], time.time() - entry[1]
+        if age > self.path_ttl:
+            return None
+        with self._lock:
+            self._paths[path] = (sha, time.monotonic() - max(age, 0.0))
+        return sha
+
+    def set_path_sha(self, path: str, sha: str) -> None:
+        """Record which blob a path points to (e.g. from a directory listing)"""
+        self.set_path_shas([(path, sha)])
+
+    def set_path_shas(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Record which blob each of many paths points to"""
+        items = list(items)
+        now = time.monotonic()
+        with self._lock:
+            for path, sha in items:
+                self._paths[path] = (sha, now)
+        if self.shared is not None:
+            self.shared.set_paths(items)
+
+    def put(self, path: str, sha: str, content: str) -> None:
+        """Store content for a blob SHA and point the path at it"""
+        self.set_path_sha(path, sha)
+        self.put_blob(sha, content)
+
+    def put_blob(self, sha: str, content: str) -> None:
+        """Store content for a blob SHA without vouching for any path"""
+        if self._store_blob(sha, content) and self.shared is not None:
+            self.shared.put_blob(sha, content)
+
+    def invalidate_path(self, path: str) -> None:
+        """Forget which blob a path points to"""
+        with self._lock:
+            self._paths.pop(path, None)
+        if self.shared is not None:
+            self.shared.invalidate("path", path)
+
+    def invalidate_all_paths(self) -> None:
+        """Forget every path mapping but keep contents, which are keyed by SHA"""
+        with self._lock:
+            self._paths.clear()
+        if self.shared is not None:
+            self.shared.invalidate("all_paths")
+
+    def clear(self) -> None:
+        """Drop all cached contents and path mappings held by this process"""
+        with self._lock:
+            self._blobs.clear()
+            self._paths.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._blobs),
+                "paths": len(self._paths),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store_blob(self, sha: str, content: str) -> bool:
+        """Store content in this process; return False if it was already there"""
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            if size > self.max_bytes:
+                return False
+            if sha in self._blobs:
+                self._blobs.move_to_end(sha)
+                return False
+            self._blobs[sha] = (content, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._blobs.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def _replay_shared_invalidations(self) -> None:
+        if self.shared is None:
+            return
+        seq, events = self.shared.invalidations_since(self._shared_seq)
+        with self._lock:
+            self._shared_seq = max(self._shared_seq, seq)
+            for kind, key in events:
+                if kind == "path":
+                    self._paths.pop(key, None)
+                elif kind == "all_paths":
+                    self._paths.clear()
+
+    def _get_blob_locked(self, sha: str) -> Optional[str]:
+        entry = self._blobs.get(sha)
+        if entry is None:
+            return None
+        self._blobs.move_to_end(sha)
+        return entry[0]
+
+
+content_cache = ContentCache(CONTENT_CACHE_MAX_BYTES, CONTENT_CACHE_PATH_TTL)
+
+
+class FetchEngine:
+    """
+    Shared thread pool for fetching many files concurrently.
+
+    At most ``max_in_flight`` fetches run at once across all callers, and a
+    fetch that has been running for longer than ``timeout`` seconds is
+    reported as timed out instead of holding up the whole batch.
+    """
+
+    def __init__(self, max_in_flight: int, timeout: float):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="fetch"
+        )
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def fetch_many(
+        self, keys: Iterable[Hashable], fetch: Callable[[Any], Any]
+    ) -> Tuple[Dict[Any, Any], Dict[Any, Exception]]:
+        """
+        Call fetch(key) for every key concurrently.
+
+        Returns:
+            A dict of results and a dict of exceptions, both keyed by key.
+        """
+        results: Dict[Any, Any] = {}
+        errors: Dict[Any, Exception] = {}
+        started: Dict[Any, float] = {}
+
+        def run(key):
+            started[key] = time.monotonic()
+            with self._lock:
+                self.in_flight += 1
+            try:
+                return fetch(key)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+        # Workers inherit the caller's context, e.g. its GitHub request priority
+        futures = {
+            self._executor.submit(contextvars.copy_context().run, run, key): key
+            for key in dict.fromkeys(keys)
+        }
+        pending = set(futures)
+        while pending:
+            deadlines = [
+                started[futures[future]] + self.timeout
+                for future in pending
+                if futures[future] in started
+            ]
+            wait_for = min(deadlines) - time.monotonic() if deadlines else self.timeout
+            done, pending = wait(
+                pending, timeout=max(wait_for, 0.0), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                if key in started and now - started[key] >= self.timeout:
+                    pending.discard(future)
+                    errors[key] = TimeoutError(
+                        f"Fetching {key} took longer than {self.timeout}s"
+                    )
+
+        with self._lock:
+            self.completed += len(results)
+            self.failed += len(errors)
+            self.timed_out += sum(isinstance(e, TimeoutError) for e in errors.values())
+        return results, errors
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the concurrency cap and fetch counters"""
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+            }
+
+
+fetch_engine = FetchEngine(FETCH_MAX_IN_FLIGHT, FETCH_TIMEOUT)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single call.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result or exception. Keys are
+    (kind, identifier) tuples such as ("path", "soup.md") and coalesced
+    calls are counted per kind.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced: Dict[str, int] = {}
+
+    def do(self, key: Tuple[str, Hashable], fn: Callable[[], Any]) -> Any:
+        """Run fn() for key, or wait for the run already in flight"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced[key[0]] = self.coalesced.get(key[0], 0) + 1
+                leader = False
+            else:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+                leader = True
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+        return future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of calls made and coalesced, by key kind"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "in_flight": len(self._in_flight),
+                "coalesced": dict(self.coalesced),
+            }
+
+
+single_flight = SingleFlight()
+
+
+def get_file_content(file_path: str) -> str:
+    """Get content of a file from the repository, served from the cache when possible"""
+    cached = content_cache.get_by_path(file_path)
+    if cached is not None:
+        return cached
+    return fetch_file_content(file_path)
+
+
+def fetch_file_content(file_path: str) -> str:
+    """Fetch content of a file from the storage backend and cache it"""
+    try:
+        sha, content = single_flight.do(
+            ("path", file_path), lambda: get_storage().get_file(file_path)
+        )
+        content_cache.put(file_path, sha, content)
+        return content
+    except GithubException as e:
+        logger.error(f"GitHub error fetching {file_path}: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Error reading content from {file_path}: {e}")
+        raise
+
+
+def extract_recipe_name_from_content(content: str) -> Optional[str]:
+    """
+    Extract recipe name from the first line of the file content.
+    Recipe name is expected to be on the first line starting with '#'.
+
+    Args:
+        content: The full content of the recipe file
+
+    Returns:
+        The recipe name without the '#' prefix, or None if not found
+    """
+    lines = content.split("\n")
+    if lines and lines[0].startswith("#"):
+        # Remove the '#' and any leading/trailing whitespace
+        return lines[0].lstrip("#").strip()
+    return None
+
+
+# Section headings recognised by the structured parser, lowercased (English and Polish)
+INFO_HEADINGS = {"information", "info", "details", "informacje", "informacje ogólne"}
+INGREDIENT_HEADINGS = {"ingredients", "składniki"}
+STEP_HEADINGS = {
+    "instructions",
+    "directions",
+    "method",
+    "steps",
+    "preparation",
+    "przygotowanie",
+    "sposób przygotowania",
+    "wykonanie",
+    "instrukcje",
+}
+
+# Information labels mapped to the structured field they fill
+INFO_LABELS = {
+    "prep time": "prep_time_minutes",
+    "preparation time": "prep_time_minutes",
+    "czas przygotowania": "prep_time_minutes",
+    "cook time": "cook_time_minutes",
+    "cooking time": "cook_time_minutes",
+    "bake time": "cook_time_minutes",
+    "baking time": "cook_time_minutes",
+    "czas gotowania": "cook_time_minutes",
+    "czas pieczenia": "cook_time_minutes",
+    "total time": "total_time_minutes",
+    "czas całkowity": "total_time_minutes",
+    "łączny czas": "total_time_minutes",
+    "czas": "total_time_minutes",
+    "servings": "servings",
+    "serves": "servings",
+    "yield": "servings",
+    "porcje": "servings",
+    "liczba porcji": "servings",
+    "ilość porcji": "servings",
+    "wydajność": "servings",
+    "difficulty": "difficulty",
+    "trudność": "difficulty",
+    "poziom trudności": "difficulty",
+    "cuisine": "cuisine",
+    "kuchnia": "cuisine",
+}
+
+# Ingredient units and their canonical spelling
+UNITS = {
+    "cup": "cup",
+    "cups": "cup",
+    "tbsp": "tbsp",
+    "tablespoon": "tbsp",
+    "tablespoons": "tbsp",
+    "tsp": "tsp",
+    "teaspoon": "tsp",
+    "teaspoons": "tsp",
+    "g": "g",
+    "gram": "g",
+    "grams": "g",
+    "dag": "dag",
+    "kg": "kg",
+    "mg": "mg",
+    "ml": "ml",
+    "l": "l",
+    "oz": "oz",
+    "ounce": "oz",
+    "ounces": "oz",
+    "lb": "lb",
+    "lbs": "lb",
+    "pound": "lb",
+    "pounds": "lb",
+    "pinch": "pinch",
+    "clove": "clove",
+    "cloves": "clove",
+    "can": "can",
+    "cans": "can",
+    "stick": "stick",
+    "sticks": "stick",
+    "slice": "slice",
+    "slices": "slice",
+    "szklanka": "szklanka",
+    "szklanki": "szklanka",
+    "szklanek": "szklanka",
+    "łyżka": "łyżka",
+    "łyżki": "łyżka",
+    "łyżek": "łyżka",
+    "łyżeczka": "łyżeczka",
+    "łyżeczki": "łyżeczka",
+    "łyżeczek": "łyżeczka",
+    "szczypta": "szczypta",
+    "szczypty": "szczypta",
+    "ząbek": "ząbek",
+    "ząbki": "ząbek",
+    "ząbków": "ząbek",
+    "puszka": "puszka",
+    "puszki": "puszka",
+    "opakowanie": "opakowanie",
+    "opakowania": "opakowanie",
+}
+
+UNICODE_FRACTIONS = {"¼": 0.25, "½": 0.5, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+NUMBER_PATTERN = r"\d+(?:[.,]\d+)?(?:\s+\d+/\d+|/\d+)?|\d*[¼½¾⅓⅔]"
+QUANTITY_PATTERN = re.compile(
+    rf"^(?P<quantity>{NUMBER_PATTERN})(?:\s*[-–]\s*(?:{NUMBER_PATTERN}))?\s*(?P<rest>.*)$"
+)
+DURATION_PATTERN = re.compile(
+    r"(\d+(?:[.,]\d+)?)(?:\s*[-–]\s*(\d+(?:[.,]\d+)?))?\s*"
+    r"(hours?|hrs?|h|godz\w*|minutes?|mins?|m|minut\w*)\b",
+    re.IGNORECASE,
+)
+INFO_ITEM_PATTERN = re.compile(r"^\*\*(?P<label>[^*]+?):?\*\*:?\s*(?P<value>.*)$")
+STEP_PATTERN = re.compile(r"^(?:\d+[.)]|[-*+])\s+(?P<text>.*)$")
+
+# Fields get_recipe_structured can return
+STRUCTURED_FIELDS = (
+    "title",
+    "description",
+    "prep_time_minutes",
+    "cook_time_minutes",
+    "total_time_minutes",
+    "servings",
+    "difficulty",
+    "cuisine",
+    "info",
+    "ingredients",
+    "steps",
+)
+
+
+def parse_number(text: str) -> Optional[float]:
+    """
+    Parse "2", "0,5", "1/2", "2 1/4", "½" or "1½" into a number.
+
+    Returns None for a fraction with a zero denominator such as "1/0".
+    """
+    text = text.strip().replace(",", ".")
+    if text and text[-1] in UNICODE_FRACTIONS:
+        return float(text[:-1] or 0) + UNICODE_FRACTIONS[text[-1]]
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            if int(denominator) == 0:
+                return None
+            total += int(numerator) / int(denominator)
+        else:
+            total += float(part)
+    return total
+
+
+def parse_duration_minutes(text: str) -> Optional[int]:
+    """
+    Parse a duration such as "15 minutes", "1 hour 20 min" or "10-12 minut".
+
+    Ranges count as their upper bound. Returns None when no duration is found.
+    """
+    minutes, found = 0.0, False
+    for match in DURATION_PATTERN.finditer(text):
+        value = parse_number(match.group(2) or match.group(1))
+        unit = match.group(3).lower()
+        minutes += value * 60 if unit.startswith(("h", "godz")) else value
+        found = True
+    return round(minutes) if found else None
+
+
+def parse_ingredient(line: str, section: Optional[str] = None) -> Dict[str, Any]:
+    """Split an ingredient line into quantity, unit and item"""
+    text = line.strip()
+    ingredient = {
+        "section": section,
+        "text": text,
+        "quantity": None,
+        "unit": None,
+        "item": text,
+    }
+    match = QUANTITY_PATTERN.match(text)
+    if not match:
+        return ingredient
+
+    quantity = parse_number(match.group("quantity"))
+    if quantity is None:
+        return ingredient
+    ingredient["quantity"] = quantity
+    rest = match.group("rest")
+    word, _, remainder = rest.partition(" ")
+    unit = UNITS.get(word.lower().rstrip("."))
+    if unit:
+        ingredient["unit"] = unit
+        rest = remainder
+    # Drop a leading metric conversion such as "(280g)"
+    ingredient["item"] = re.sub(r"^\([^)]*\)\s*", "", rest).strip()
+    return ingredient
+
+
+def parse_recipe(content: str) -> Dict[str, Any]:
+    """
+    Parse a markdown recipe into structured fields.
+
+    Recipes are expected to look like the ones in sample-recipes/: a "#"
+    title, an Information list of "**Label**: value" items, Ingredients
+    (optionally split into "###" subsections) and numbered Instructions.
+    English and Polish headings and labels are recognised; anything the
+    parser does not understand is left out rather than guessed.
+
+    Returns:
+        A dict with every field in STRUCTURED_FIELDS. Times are in minutes.
+    """
+    recipe: Dict[str, Any] = {field: None for field in STRUCTURED_FIELDS}
+    recipe.update(
+        title=extract_recipe_name_from_content(content),
+        info={},
+        ingredients=[],
+        steps=[],
+    )
+
+    section, subsection = None, None
+    description: List[str] = []
+    for line in content.split("\n")[1:]:
+        stripped = line.strip()
+        heading = re.match(r"^(#{2,6})\s+(.*?)\s*#*$", stripped)
+        if heading:
+            title = heading.group(2).strip("*: ").lower()
+            if len(heading.group(1)) == 2:
+                section, subsection = title, None
+            else:
+                subsection = heading.group(2).strip("*: ")
+            continue
+        if not stripped:
+            continue
+
+        if section is None:
+            # Text between the title and the first section
+            description.append(stripped)
+            continue
+
+        item = re.sub(r"^[-*+]\s+", "", stripped)
+        if section in INFO_HEADINGS:
+            match = INFO_ITEM_PATTERN.match(item) or re.match(
+                r"^(?P<label>[^:]+):\s*(?P<value>.+)$", item
+            )
+            if match:
+                _add_info(recipe, match.group("label"), match.group("value"))
+        elif section in INGREDIENT_HEADINGS and item != stripped:
+            recipe["ingredients"].append(parse_ingredient(item, subsection))
+        elif section in STEP_HEADINGS:
+            step = STEP_PATTERN.match(stripped)
+            if step:
+                recipe["steps"].append(step.group("text").replace("**", ""))
+            elif recipe["steps"]:
+                # Continuation of the previous step
+                recipe["steps"][-1] += " " + stripped.replace("**", "")
+
+    if description:
+        recipe["description"] = " ".join(description)
+    return recipe
+
+
+def _add_info(recipe: Dict[str, Any], label: str, value: str) -> None:
+    label, value = label.strip().rstrip(":"), value.strip()
+    recipe["info"][label] = value
+    field = INFO_LABELS.get(label.lower())
+    if field is None or recipe[field] is not None:
+        return
+    if field.endswith("_minutes"):
+        recipe[field] = parse_duration_minutes(value)
+    elif field == "servings":
+        number = re.search(r"\d+", value)
+        recipe[field] = int(number.group()) if number else None
+    else:
+        recipe[field] = value
+
+
+class ParsedRecipeCache:
+    """
+    Structured recipes memoized by blob SHA.
+
+    A blob never changes, so a recipe is parsed once per version no matter
+    how many paths, tools or indexes ask for it, and, with a shared tier
+    attached, no matter which process parsed it first.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.shared: Optional[SharedCache] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sha: str, content: str) -> Dict[str, Any]:
+        """Return the parsed recipe for a blob, parsing it on first use"""
+        with self._lock:
+            parsed = self._entries.get(sha)
+            if parsed is not None:
+                self._entries.move_to_end(sha)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        parsed = self.shared.get_parsed(sha) if self.shared is not None else None
+        if parsed is not None:
+            self._store(sha, parsed)
+            return parsed
+        parsed = parse_recipe(content)
+        self.put(sha, parsed)
+        return parsed
+
+    def peek(self, sha: str) -> Optional[Dict[str, Any]]:
+        """Return the parsed recipe for a blob if it was already parsed"""
+        with self._lock:
+            return self._entries.get(sha)
+
+    def put(self, sha: str, parsed: Dict[str, Any]) -> None:
+        """Store an already parsed recipe, e.g. one loaded from a snapshot"""
+        self._store(sha, parsed)
+        if self.shared is not None:
+            self.shared.put_parsed(sha, parsed)
+
+    def _store(self, sha: str, parsed: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[sha] = parsed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every parsed recipe"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+parsed_recipes = ParsedRecipeCache(PARSED_CACHE_MAX_ENTRIES)
+
+
+def _recipe_path(recipe: Dict[str, Any]) -> str:
+    return recipe["path"]
+
+
+# Recipe listing of the whole repository, memoized by root tree SHA
+_tree_listing: Optional[Tuple[str, List[Dict[str, Any]]]] = None
+_tree_listing_checked_at = 0.0
+_tree_listing_lock = threading.Lock()
+
+
+def get_tree_listing() -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Get metadata for every recipe file in the repository.
+
+    The listing comes from a single recursive tree fetch and is reused
+    for as long as the branch head points at the same root tree. The head
+    itself is checked at most once every TREE_REFRESH_INTERVAL seconds, and
+    concurrent callers share a single check.
+
+    Returns:
+        The root tree SHA and the list of recipe metadata.
+    """
+    replay_shared_listing_invalidations()
+    with _tree_listing_lock:
+        if (
+            _tree_listing is not None
+            and time.monotonic() - _tree_listing_checked_at < TREE_REFRESH_INTERVAL
+        ):
+            return _tree_listing
+
+    return single_flight.do(("listing", None), refresh_tree_listing)
+
+
+def refresh_tree_listing() -> Tuple[str, List[Dict[str, Any]]]:
+    """Check the branch head and refetch the listing if the root tree moved"""
+    global _tree_listing, _tree_listing_checked_at
+
+    # Another worker may have checked the head (and fetched its tree) recently
+    tree_sha = shared_cache.get_head(TREE_REFRESH_INTERVAL) if shared_cache else None
+    if tree_sha is None:
+        tree_sha = get_storage().get_head_tree_sha()
+        if shared_cache:
+            shared_cache.set_head(tree_sha)
+    with _tree_listing_lock:
+        if _tree_listing is not None and _tree_listing[0] == tree_sha:
+            _tree_listing_checked_at = time.monotonic()
+            return _tree_listing
+
+    recipes = shared_cache.get_listing(tree_sha) if shared_cache else None
+    if recipes is None:
+        # Path order gives pagination a stable order to walk
+        recipes = sorted(get_storage().list_files(tree_sha), key=_recipe_path)
+        if shared_cache:
+            shared_cache.put_listing(tree_sha, recipes)
+    content_cache.set_path_shas((recipe["path"], recipe["sha"]) for recipe in recipes)
+
+    with _tree_listing_lock:
+        _tree_listing = (tree_sha, recipes)
+        _tree_listing_checked_at = time.monotonic()
+    logger.info(f"Fetched tree {tree_sha} with {len(recipes)} recipes")
+    return _tree_listing
+
+
+def invalidate_tree_listing() -> None:
+    """Force the next listing, in every worker, to re-check the branch head"""
+    global _tree_listing_checked_at
+
+    with _tree_listing_lock:
+        _tree_listing_checked_at = 0.0
+    if shared_cache:
+        shared_cache.invalidate("listing")
+
+
+_listing_shared_seq = 0
+
+
+def replay_shared_listing_invalidations() -> None:
+    """Mark the listing stale if another worker invalidated it"""
+    global _listing_shared_seq, _tree_listing_checked_at
+
+    if not shared_cache:
+        return
+    seq, events = shared_cache.invalidations_since(_listing_shared_seq)
+    with _tree_listing_lock:
+        _listing_shared_seq = max(_listing_shared_seq, seq)
+        if any(kind == "listing" for kind, _ in events):
+            _tree_listing_checked_at = 0.0
+
+
+def list_recipes_in_path(path: str = "") -> List[Dict[str, Any]]:
+    """List all recipe files in a given path, including subdirectories"""
+    try:
+        _, recipes = get_tree_listing()
+    except Exception as e:
+        logger.error(f"Error listing recipes in {path}: {e}")
+        return []
+
+    return filter_recipes_by_path(recipes, path)
+
+
+def encode_cursor(path: str) -> str:
+    """Turn the last path of a page into an opaque cursor"""
+    return base64.urlsafe_b64encode(path.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Recover the path a cursor was made from"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def page_recipes(
+    limit: int, cursor: Optional[str] = None, prefix: str = ""
+) -> Dict[str, Any]:
+    """
+    Get one page of the recipes under RECIPES_PATH, in path order.
+
+    The cursor names the last path of the previous page rather than an
+    offset, so paging stays consistent when recipes are added or removed
+    between calls. Only the returned page is copied out of the listing.
+
+    Returns:
+        {"recipes": [...], "next_cursor": str or None, "total": int}
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    limit = min(limit, LIST_MAX_PAGE_SIZE)
+
+    _, recipes = get_tree_listing()
+    root = RECIPES_PATH.strip("/")
+    root = f"{root}/" if root else ""
+    prefix = (prefix or "").lstrip("/")
+    if prefix.startswith(root) or root.startswith(prefix):
+        prefix = max(root, prefix, key=len)
+        low = bisect.bisect_left(recipes, prefix, key=_recipe_path)
+        high = bisect.bisect_left(recipes, prefix + "\U0010ffff", key=_recipe_path)
+    else:
+        low = high = 0
+
+    start = low
+    if cursor:
+        after = decode_cursor(cursor)
+        start = max(low, bisect.bisect_right(recipes, after, key=_recipe_path))
+    end = min(start + limit, high)
+
+    page = [recipe.copy() for recipe in recipes[start:end]]
+    return {
+        "recipes": page,
+        "next_cursor": encode_cursor(page[-1]["path"]) if end < high else None,
+        "total": high - low,
+    }
+
+
+def build_recipe(path: str, content: str) -> Dict[str, Any]:
+    """Build the recipe payload returned by get_recipe and get_recipes"""
+    # Extract recipe name from the first line of the file
+    recipe_name = extract_recipe_name_from_content(content)
+
+    # Fallback to filename if name extraction fails
+    if not recipe_name:
+        recipe_name = (
+            os.path.basename(path).replace(".md", "").replace("-", " ").title()
+        )
+
+    return {
+        "name": recipe_name,
+        "path": path,
+        "content": content,
+        "sha": git_blob_sha(content.encode("utf-8")),
+    }
+
+
+def filter_recipes_by_path(
+    recipes: List[Dict[str, Any]], path: str
+) -> List[Dict[str, Any]]:
+    """Copy the recipes that live under a path"""
+    prefix = path.strip("/")
+    if prefix:
+        prefix += "/"
+    return [recipe.copy() for recipe in recipes if recipe["path"].startswith(prefix)]
+
+
+def get_blob_content(path: str, sha: str) -> str:
+    """Get content of a known blob, fetching it by SHA only when it is not cached"""
+    content = content_cache.get_blob(sha)
+    if content is None:
+        content = single_flight.do(("blob", sha), lambda: get_storage().get_blob(sha))
+    content_cache.put(path, sha, content)
+    return content
+
+
+class RecipeNameIndex:
+    """
+    Recipe names extracted from the first line of each file, keyed by path,
+    so results can be labelled without downloading files. Searching by name
+    is done by the trigram index.
+    """
+
+    def __init__(self):
+        self._names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, path: str, sha: str, content: str) -> None:
+        """Index (or re-index) the recipe stored at path"""
+        recipe_name = extract_recipe_name_from_content(content)
+        with self._lock:
+            if recipe_name:
+                self._names[path] = recipe_name
+            else:
+                self._names.pop(path, None)
+
+    def remove(self, path: str) -> None:
+        """Drop the recipe stored at path from the index"""
+        with self._lock:
+            self._names.pop(path, None)
+
+    def clear(self) -> None:
+        """Drop every recipe from the index"""
+        with self._lock:
+            self._names.clear()
+
+    def get_name(self, path: str) -> Optional[str]:
+        """Return the indexed recipe name for a path"""
+        return self._names.get(path)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+name_index = RecipeNameIndex()
+
+
+# Letters that Unicode decomposition does not reduce to ASCII
+FOLDED_LETTERS = str.maketrans(
+    {"ł": "l", "Ł": "L", "đ": "d", "Đ": "D", "ø": "o", "Ø": "O", "ß": "ss", "æ": "ae"}
+)
+
+
+def fold_text(text: str) -> str:
+    """Lowercase text and strip diacritics, so "Żurek Śląski" becomes "zurek slaski" """
+    decomposed = unicodedata.normalize("NFKD", text.translate(FOLDED_LETTERS))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of every word, padded like pg_trgm so word starts weigh more"""
+    grams = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramNameIndex:
+    """
+    Trigram index over diacritic-folded recipe names.
+
+    A query is scored against each name by the share of its trigrams the
+    name contains (pg_trgm's word similarity), so "pirogi" still finds
+    "Pierogi ruskie" and "zurek" finds "Żurek". Only names sharing at least
+    one trigram with the query are scored.
+    """
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self._names: Dict[str, str] = {}
+        self._postings: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, path: str, sha: str, content: str) -> None:
+        """Index (or re-index) the name of the recipe stored at path"""
+        recipe_name = extract_recipe_name_from_content(content)
+        with self._lock:
+            self._remove_locked(path)
+            if recipe_name:
+                folded = fold_text(recipe_name)
+                self._names[path] = folded
+                for gram in trigrams(folded):
+                    self._postings.setdefault(gram, set()).add(path)
+
+    def remove(self, path: str) -> None:
+        """Drop the recipe stored at path from the index"""
+        with self._lock:
+            self._remove_locked(path)
+
+    def clear(self) -> None:
+        """Drop every recipe from the index"""
+        with self._lock:
+            self._names.clear()
+            self._postings.clear()
+
+    def search(self, query: str) -> Dict[str, float]:
+        """
+        Return {path: similarity} for names resembling the query.
+
+        Names containing the folded query verbatim score 1.0; the rest score
+        the fraction of query trigrams they contain and are kept when that
+        reaches the threshold.
+        """
+        folded = fold_text(query).strip()
+        if not folded:
+            return {}
+        query_grams = trigrams(folded)
+        with self._lock:
+            if len(folded) < 3 or not query_grams:
+                # Too short to have a meaningful trigram; substring match only
+                return {p: 1.0 for p, name in self._names.items() if folded in name}
+
+            shared: Dict[str, int] = {}
+            for gram in query_grams:
+                for path in self._postings.get(gram, ()):
+                    shared[path] = shared.get(path, 0) + 1
+
+            scores = {}
+            for path, count in shared.items():
+                if folded in self._names[path]:
+                    scores[path] = 1.0
+                elif count / len(query_grams) >= self.threshold:
+                    scores[path] = count / len(query_grams)
+            return scores
+
+    def _remove_locked(self, path: str) -> None:
+        folded = self._names.pop(path, None)
+        if folded is None:
+            return
+        for gram in trigrams(folded):
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._postings[gram]
+
+
+trigram_index = TrigramNameIndex()
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class FullTextIndex:
+    """
+    Inverted index over the whole markdown body of each recipe.
+
+    Results are ranked with Okapi BM25 and come with a snippet taken from
+    the line that matches the most query terms. The index only remembers
+    which lines each term occurs on; the text of the snippet line is read
+    from the content cache (or fetched by blob SHA) for the results
+    returned, so recipe bodies are not held twice in memory.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        load_content: Optional[Callable[[str, str], str]] = None,
+    ):
+        self.k1 = k1
+        self.b = b
+        self._load_content = load_content or get_blob_content
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_shas: Dict[str, str] = {}
+        self._term_lines: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, path: str, sha: str, content: str) -> None:
+        """Index (or re-index) the recipe stored at path"""
+        terms: Dict[str, int] = {}
+        term_lines: Dict[str, List[int]] = {}
+        length = 0
+        for line_number, line in enumerate(content.split("\n")):
+            tokens = tokenize(line)
+            length += len(tokens)
+            for token in tokens:
+                terms[token] = terms.get(token, 0) + 1
+            for token in set(tokens):
+                term_lines.setdefault(token, []).append(line_number)
+        with self._lock:
+            self._remove_locked(path)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[path] = frequency
+            self._doc_terms[path] = terms
+            self._doc_lengths[path] = length
+            self._doc_shas[path] = sha
+            self._term_lines[path] = {
+                term: tuple(lines) for term, lines in term_lines.items()
+            }
+            self._total_length += length
+
+    def remove(self, path: str) -> None:
+        """Drop the recipe stored at path from the index"""
+        with self._lock:
+            self._remove_locked(path)
+
+    def clear(self) -> None:
+        """Drop every recipe from the index"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._doc_shas.clear()
+            self._term_lines.clear()
+            self._total_length = 0
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the best matching recipes as {path, score, snippet} dicts"""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count or not query_terms:
+                return []
+            avg_length = self._total_length / doc_count
+
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for path, frequency in postings.items():
+                    length_norm = (
+                        1 - self.b + self.b * self._doc_lengths[path] / avg_length
+                    )
+                    scores[path] = scores.get(path, 0.0) + idf * (
+                        frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                    )
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            top = [
+                (
+                    path,
+                    score,
+                    self._doc_shas[path],
+                    self._best_line(self._term_lines[path], query_terms),
+                )
+                for path, score in ranked[:limit]
+            ]
+
+        # Snippet text is read outside the lock, as it may need a fetch
+        return [
+            {
+                "path": path,
+                "score": round(score, 4),
+                "snippet": self._snippet(path, sha, line_number),
+            }
+            for path, score, sha, line_number in top
+        ]
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def _remove_locked(self, path: str) -> None:
+        terms = self._doc_terms.pop(path, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[path]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(path)
+        del self._doc_shas[path]
+        del self._term_lines[path]
+
+    @staticmethod
+    def _best_line(term_lines: Dict[str, Tuple[int, ...]], query_terms: set) -> int:
+        """Return the first line holding the most query terms"""
+        hits: Dict[int, int] = {}
+        for term in query_terms:
+            for line_number in term_lines.get(term, ()):
+                hits[line_number] = hits.get(line_number, 0) + 1
+        return min(hits, key=lambda line_number: (-hits[line_number], line_number))
+
+    def _snippet(
+        self, path: str, sha: str, line_number: int, max_length: int = 160
+    ) -> str:
+        try:
+            lines = self._load_content(path, sha).split("\n")
+        except Exception as e:
+            logger.warning(f"Could not load snippet for {path}: {e}")
+            return ""
+        best_line = lines[line_number].strip() if line_number < len(lines) else ""
+        if len(best_line) > max_length:
+            best_line = best_line[: max_length - 3].rstrip() + "..."
+        return best_line
+
+
+fulltext_index = FullTextIndex()
+
+
+def ingredient_terms(text: str) -> List[str]:
+    """Tokenize ingredient text, folding simple English plurals ("nuts" -> "nut")"""
+    return [
+        token[:-1] if len(token) > 3 and token.endswith("s") else token
+        for token in tokenize(text)
+    ]
+
+
+def bits_to_ids(bits: int) -> Iterable[int]:
+    """Yield the positions of the set bits of an int bitset, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class SortedColumn:
+    """Numeric attribute of every recipe kept as a sorted (value, id) array"""
+
+    def __init__(self):
+        self._values: List[Tuple[float, int]] = []
+
+    def add(self, value: float, doc_id: int) -> None:
+        bisect.insort(self._values, (value, doc_id))
+
+    def remove(self, value: float, doc_id: int) -> None:
+        position = bisect.bisect_left(self._values, (value, doc_id))
+        if position < len(self._values) and self._values[position] == (value, doc_id):
+            del self._values[position]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def range(self, low: Optional[float], high: Optional[float]) -> int:
+        """Return the bitset of recipes whose value lies within [low, high]"""
+        start = 0 if low is None else bisect.bisect_left(self._values, (low, -1))
+        end = (
+            len(self._values)
+            if high is None
+            else bisect.bisect_right(self._values, (high, math.inf))
+        )
+        bits = 0
+        for _, doc_id in self._values[start:end]:
+            bits |= 1 << doc_id
+        return bits
+
+
+class FacetIndex:
+    """
+    Structured recipe attributes laid out for filtering.
+
+    Every recipe gets a small integer id. Numeric attributes (times,
+    servings) are sorted columns that answer range queries by bisection;
+    categorical attributes (difficulty, cuisine) and ingredient words are
+    int bitsets over the ids. A filter is a handful of bitwise ANDs.
+    """
+
+    NUMERIC_FACETS = (
+        "total_time_minutes",
+        "prep_time_minutes",
+        "cook_time_minutes",
+        "servings",
+    )
+    CATEGORICAL_FACETS = ("difficulty", "cuisine")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def upsert(self, path: str, sha: str, content: str) -> None:
+        """Index (or re-index) the attributes of the recipe stored at path"""
+        attributes = self._attributes(parsed_recipes.get(sha, content))
+        with self._lock:
+            self._remove_locked(path)
+            doc_id = self._free_ids.pop() if self._free_ids else len(self._paths)
+            if doc_id == len(self._paths):
+                self._paths.append(path)
+            else:
+                self._paths[doc_id] = path
+            self._ids[path] = doc_id
+            self._attributes_by_id[doc_id] = attributes
+            self._all |= 1 << doc_id
+            self._apply(doc_id, attributes, add=True)
+
+    def remove(self, path: str) -> None:
+        """Drop the recipe stored at path from the index"""
+        with self._lock:
+            self._remove_locked(path)
+
+    def clear(self) -> None:
+        """Drop every recipe from the index"""
+        with self._lock:
+            self._ids: Dict[str, int] = {}
+            self._paths: List[Optional[str]] = []
+            self._free_ids: List[int] = []
+            self._attributes_by_id: Dict[int, Dict[str, Any]] = {}
+            self._all = 0
+            self._columns = {facet: SortedColumn() for facet in self.NUMERIC_FACETS}
+            self._categories: Dict[str, Dict[str, int]] = {
+                facet: {} for facet in self.CATEGORICAL_FACETS
+            }
+            self._ingredients: Dict[str, int] = {}
+
+    def filter(
+        self,
+        ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+        categories: Dict[str, List[str]],
+        include_ingredients: List[str],
+        exclude_ingredients: List[str],
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, int]]]:
+        """
+        Intersect the facets and return the matching recipes in path order.
+
+        Returns:
+            The matches as {path, ...attributes} dicts, and per-facet value
+            counts within the matches.
+        """
+        with self._lock:
+            bits = self._all
+            for facet, (low, high) in ranges.items():
+                if low is not None or high is not None:
+                    bits &= self._columns[facet].range(low, high)
+            for facet, values in categories.items():
+                if values:
+                    allowed = 0
+                    for value in values:
+                        allowed |= self._categories[facet].get(value.strip().lower(), 0)
+                    bits &= allowed
+            for ingredient in include_ingredients:
+                for term in ingredient_terms(ingredient):
+                    bits &= self._ingredients.get(term, 0)
+            for ingredient in exclude_ingredients:
+                terms = ingredient_terms(ingredient)
+                if terms:
+                    # Excluding "pine nuts" excludes recipes with both words
+                    excluded = self._all
+                    for term in terms:
+                        excluded &= self._ingredients.get(term, 0)
+                    bits &= ~excluded
+
+            counts = {
+                facet: {
+                    value: (bits & value_bits).bit_count()
+                    for value, value_bits in self._categories[facet].items()
+                    if bits & value_bits
+                }
+                for facet in self.CATEGORICAL_FACETS
+            }
+            matches = []
+            for doc_id in bits_to_ids(bits):
+                match = dict(self._attributes_by_id[doc_id], path=self._paths[doc_id])
+                del match["ingredient_terms"]
+                matches.append(match)
+        matches.sort(key=_recipe_path)
+        return matches, counts
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _attributes(parsed: Dict[str, Any]) -> Dict[str, Any]:
+        total = parsed["total_time_minutes"]
+        if total is None and parsed["prep_time_minutes"] is not None:
+            total = parsed["prep_time_minutes"] + (parsed["cook_time_minutes"] or 0)
+        terms = set()
+        for ingredient in parsed["ingredients"]:
+            terms.update(ingredient_terms(ingredient["item"]))
+        return {
+            "total_time_minutes": total,
+            "prep_time_minutes": parsed["prep_time_minutes"],
+            "cook_time_minutes": parsed["cook_time_minutes"],
+            "servings": parsed["servings"],
+            "difficulty": parsed["difficulty"],
+            "cuisine": parsed["cuisine"],
+            "ingredient_terms": terms,
+        }
+
+    def _apply(self, doc_id: int, attributes: Dict[str, Any], add: bool) -> None:
+        bit = 1 << doc_id
+        for facet in self.NUMERIC_FACETS:
+            value = attributes[facet]
+            if value is None:
+                continue
+            if add:
+                self._columns[facet].add(value, doc_id)
+            else:
+                self._columns[facet].remove(value, doc_id)
+        groups = [
+            (self._categories[facet], [attributes[facet].lower()])
+            for facet in self.CATEGORICAL_FACETS
+            if attributes[facet]
+        ]
+        groups.append((self._ingredients, attributes["ingredient_terms"]))
+        for bitsets, keys in groups:
+            for key in keys:
+                if add:
+                    bitsets[key] = bitsets.get(key, 0) | bit
+                else:
+                    bitsets[key] &= ~bit
+                    if not bitsets[key]:
+                        del bitsets[key]
+
+    def _remove_locked(self, path: str) -> None:
+        doc_id = self._ids.pop(path, None)
+        if doc_id is None:
+            return
+        self._apply(doc_id, self._attributes_by_id.pop(doc_id), add=False)
+        self._all &= ~(1 << doc_id)
+        self._paths[doc_id] = None
+        self._free_ids.append(doc_id)
+
+
+facet_index = FacetIndex()
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Return the overlapping word n-grams of text, folded like names are"""
+    words = tokenize(fold_text(text))
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(features: set, num_hashes: int = 128) -> Tuple[int, ...]:
+    """
+    MinHash signature of a set, using one-permutation hashing.
+
+    Each feature is hashed once; the hash picks one of num_hashes bins and
+    every bin keeps the smallest value it sees. Empty bins borrow the value
+    of the next filled bin (shifted, so borrowed values rarely collide with
+    real ones). Two signatures agree at a position with probability close to
+    the Jaccard similarity of their sets.
+    """
+    bins = [None] * num_hashes
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        position, value = value % num_hashes, value // num_hashes
+        if bins[position] is None or value < bins[position]:
+            bins[position] = value
+    if all(value is None for value in bins):
+        return tuple([0] * num_hashes)
+
+    signature = list(bins)
+    for position in range(num_hashes):
+        offset = 1
+        while signature[position] is None:
+            borrowed = bins[(position + offset) % num_hashes]
+            if borrowed is not None:
+                signature[position] = borrowed + (offset << 64)
+            offset += 1
+    return tuple(signature)
+
+
+class SimilarityIndex:
+    """
+    MinHash signatures of every recipe, bucketed for locality-sensitive lookups.
+
+    Signatures are split into bands; recipes whose signatures agree on a
+    whole band share a bucket, so a lookup only scores the recipes found in
+    the query's buckets instead of the whole cookbook. With 32 bands of 4
+    rows, pairs above ~0.5 similarity are almost always candidates and
+    pairs below ~0.2 rarely are. Signatures are kept per blob SHA, so a
+    recipe is only hashed again when its content changes.
+    """
+
+    NUM_HASHES = 128
+    BANDS = 32
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def upsert(self, path: str, sha: str, content: str) -> None:
+        """Index (or re-index) the recipe stored at path"""
+        with self._lock:
+            if self._blobs.get(path) == sha:
+                return
+            signature = self._signatures.get(sha)
+        if signature is None:
+            signature = self.signature(content)
+        with self._lock:
+            self._remove_locked(path)
+            self._blobs[path] = sha
+            self._signatures[sha] = signature
+            self._sha_refs[sha] = self._sha_refs.get(sha, 0) + 1
+            for band in self._bands(signature):
+                self._buckets.setdefault(band, set()).add(path)
+
+    def remove(self, path: str) -> None:
+        """Drop the recipe stored at path from the index"""
+        with self._lock:
+            self._remove_locked(path)
+
+    def clear(self) -> None:
+        """Drop every recipe from the index"""
+        with self._lock:
+            self._blobs: Dict[str, str] = {}
+            self._signatures: Dict[str, Tuple[int, ...]] = {}
+            self._sha_refs: Dict[str, int] = {}
+            self._buckets: Dict[Tuple[int, Tuple[int, ...]], set] = {}
+
+    def signature(self, content: str) -> Tuple[int, ...]:
+        """Compute the MinHash signature of a recipe's content"""
+        return minhash_signature(shingles(content), self.NUM_HASHES)
+
+    def signature_for(self, path: str) -> Optional[Tuple[int, ...]]:
+        """Return the signature of an indexed recipe, or None if it is not indexed"""
+        with self._lock:
+            sha = self._blobs.get(path)
+            return self._signatures.get(sha) if sha else None
+
+    def similar(
+        self,
+        signature: Tuple[int, ...],
+        limit: int = 5,
+        min_similarity: float = 0.5,
+        exclude: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the indexed recipes most similar to a signature.
+
+        Returns:
+            {path, similarity} dicts, most similar first, where similarity
+            estimates the Jaccard similarity of the recipes' word shingles.
+        """
+        with self._lock:
+            candidates = set()
+            for band in self._bands(signature):
+                candidates.update(self._buckets.get(band, ()))
+            candidates.discard(exclude)
+            scored = []
+            for path in candidates:
+                other = self._signatures[self._blobs[path]]
+                agreeing = sum(1 for a, b in zip(signature, other) if a == b)
+                score = agreeing / len(signature)
+                if score >= min_similarity:
+                    scored.append({"path": path, "similarity": round(score, 3)})
+        scored.sort(key=lambda match: (-match["similarity"], _recipe_path(match)))
+        return scored[: max(limit, 0)]
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def _bands(
+        self, signature: Tuple[int, ...]
+    ) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        rows = len(signature) // self.BANDS
+        for band in range(self.BANDS):
+            yield band, signature[band * rows : (band + 1) * rows]
+
+    def _remove_locked(self, path: str) -> None:
+        sha = self._blobs.pop(path, None)
+        if sha is None:
+            return
+        for band in self._bands(self._signatures[sha]):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(path)
+                if not bucket:
+                    del self._buckets[band]
+        self._sha_refs[sha] -= 1
+        if not self._sha_refs[sha]:
+            del self._sha_refs[sha]
+            del self._signatures[sha]
+
+
+similarity_index = SimilarityIndex()
+
+# Indexes kept in step with the repository; each provides upsert(), remove() and clear()
+recipe_indexes = [
+    name_index,
+    trigram_index,
+    fulltext_index,
+    facet_index,
+    similarity_index,
+]
+
+# Blob SHA each indexed path was built from, and the tree those blobs came from
+_indexed_blobs: Dict[str, str] = {}
+_indexed_tree_sha: Optional[str] = None
+_index_sync_lock = threading.Lock()
+
+
+def _index_recipe_locked(path: str, sha: str, content: str) -> bool:
+    """
+    Feed one recipe into every index; the caller holds _index_sync_lock.
+
+    A recipe the indexes cannot handle is logged and dropped from all of
+    them, so it cannot break searches over the others. Its blob SHA is
+    still recorded, so it is not retried until the recipe changes.
+
+    Returns:
+        True if the recipe was indexed.
+    """
+    try:
+        for index in recipe_indexes:
+            index.upsert(path, sha, content)
+        indexed = True
+    except Exception as e:
+        logger.error(f"Could not index recipe at {path}: {e}")
+        for index in recipe_indexes:
+            index.remove(path)
+        indexed = False
+    _indexed_blobs[path] = sha
+    return indexed
+
+
+def index_recipe(path: str, sha: str, content: str) -> bool:
+    """Feed a single recipe into every index, e.g. right after it was written"""
+    with _index_sync_lock:
+        return _index_recipe_locked(path, sha, content)
+
+
+def reset_recipe_indexes() -> None:
+    """Empty every index so the next sync rebuilds them from scratch"""
+    global _indexed_tree_sha
+
+    with _index_sync_lock:
+        for index in recipe_indexes:
+            index.clear()
+        _indexed_blobs.clear()
+        _indexed_tree_sha = None
+
+
+def sync_recipe_indexes() -> List[Dict[str, Any]]:
+    """
+    Bring the recipe indexes up to date with the head of the branch.
+
+    The current tree listing is diffed against the blob SHAs the indexes
+    were built from, so only added or changed recipes are fetched.
+
+    Returns:
+        The current listing of recipes under RECIPES_PATH.
+    """
+    global _indexed_tree_sha
+
+    tree_sha, all_recipes = get_tree_listing()
+    recipes = filter_recipes_by_path(all_recipes, RECIPES_PATH)
+
+    with _index_sync_lock:
+        if tree_sha == _indexed_tree_sha:
+            return recipes
+
+        current = {recipe["path"]: recipe["sha"] for recipe in recipes}
+        removed = [path for path in _indexed_blobs if path not in current]
+        for path in removed:
+            for index in recipe_indexes:
+                index.remove(path)
+            del _indexed_blobs[path]
+
+        changed = [p for p, sha in current.items() if _indexed_blobs.get(p) != sha]
+        indexed_before = {path: _indexed_blobs.get(path) for path in changed}
+
+    # Fetch without the lock, so webhooks and writes are not held up by network I/O
+    contents, errors = fetch_engine.fetch_many(
+        changed, lambda path: get_blob_content(path, current[path])
+    )
+    for path, error in errors.items():
+        logger.warning(f"Could not index recipe at {path}: {error}")
+
+    with _index_sync_lock:
+        superseded = unindexable = 0
+        for path in changed:
+            if path not in contents:
+                continue
+            # A write, push or concurrent sync that re-indexed the path meanwhile wins
+            if _indexed_blobs.get(path) != indexed_before[path]:
+                superseded += 1
+                continue
+            if not _index_recipe_locked(path, current[path], contents[path]):
+                unindexable += 1
+
+        # Leave the tree unmarked on fetch failures so the next sync retries them
+        _indexed_tree_sha = tree_sha if not errors and not superseded else None
+        logger.info(
+            f"Synced recipe indexes to tree {tree_sha}: {len(contents)} updated, "
+            f"{len(removed)} removed, {len(errors)} failed, "
+            f"{unindexable} unindexable"
+        )
+
+    return recipes
+
+
+SNAPSHOT_VERSION = 1
+
+# Tree SHA the last snapshot written or loaded corresponds to
+_snapshot_tree_sha: Optional[str] = None
+_snapshot_stop = threading.Event()
+
+
+def snapshot_source() -> str:
+    """Identify the recipes a snapshot was taken from, so another repo's is never loaded"""
+    if STORAGE_BACKEND == "local":
+        location = os.path.abspath(LOCAL_REPO_PATH)
+    else:
+        location = f"{GITHUB_API_URL}/{GITHUB_REPO}"
+    return f"{STORAGE_BACKEND}:{location}:{GITHUB_BRANCH}:{RECIPES_PATH}"
+
+
+def save_snapshot(path: str) -> bool:
+    """
+    Write the indexed recipes to a gzipped JSON snapshot.
+
+    The snapshot holds the tree listing, the content and parsed form of
+    every indexed recipe still in the content cache, and the tree SHA they
+    correspond to. Evicted recipes are left out and fetched again after a
+    restart. It is written to a temporary file and renamed into
+    place, so readers never see a partial snapshot.
+
+    Returns:
+        True if a snapshot was written, False if the indexes are not in sync.
+    """
+    global _snapshot_tree_sha
+
+    with _tree_listing_lock:
+        listing = _tree_listing
+    with _index_sync_lock:
+        tree_sha = _indexed_tree_sha
+        indexed = dict(_indexed_blobs)
+    if tree_sha is None or listing is None or listing[0] != tree_sha:
+        return False
+
+    recipes, parsed = {}, {}
+    for recipe_path, sha in indexed.items():
+        content = content_cache.get_blob(sha)
+        if content is None:
+            continue
+        recipes[recipe_path] = {"sha": sha, "content": content}
+        parsed_recipe = parsed_recipes.peek(sha)
+        if parsed_recipe is not None:
+            parsed[sha] = parsed_recipe
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "source": snapshot_source(),
+        "tree_sha": tree_sha,
+        "listing": listing[1],
+        "recipes": recipes,
+        "parsed": parsed,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temporary_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary_path, path)
+
+    _snapshot_tree_sha = tree_sha
+    logger.info(f"Saved snapshot of {len(recipes)} recipes at tree {tree_sha}")
+    return True
+
+
+def load_snapshot(path: str) -> bool:
+    """
+    Restore the listing, content cache and indexes from a snapshot.
+
+    Indexes are rebuilt in memory from the saved contents and parsed
+    recipes, which costs no GitHub requests. The restored listing is
+    marked for a head check, so the next sync fetches only what changed
+    since the snapshot's tree.
+
+    Returns:
+        True if the snapshot was loaded, False if it is missing or unusable.
+    """
+    global _tree_listing, _tree_listing_checked_at, _indexed_tree_sha
+    global _snapshot_tree_sha
+
+    started = time.monotonic()
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return False
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(
+            f"Ignoring snapshot {path} with version {snapshot.get('version')}"
+        )
+        return False
+    if snapshot.get("source") != snapshot_source():
+        logger.warning(f"Ignoring snapshot {path} taken from {snapshot.get('source')}")
+        return False
+
+    for sha, parsed in snapshot["parsed"].items():
+        parsed_recipes.put(sha, parsed)
+    for recipe in snapshot["recipes"].values():
+        content_cache.put_blob(recipe["sha"], recipe["content"])
+
+    reset_recipe_indexes()
+    with _index_sync_lock:
+        for recipe_path, recipe in snapshot["recipes"].items():
+            _index_recipe_locked(recipe_path, recipe["sha"], recipe["content"])
+        # Recipes evicted from the cache when the snapshot was taken are not in
+        # it; leave the tree unmarked so the next sync fetches just those
+        listed = filter_recipes_by_path(snapshot["listing"], RECIPES_PATH)
+        complete = all(recipe["path"] in snapshot["recipes"] for recipe in listed)
+        _indexed_tree_sha = snapshot["tree_sha"] if complete else None
+    with _tree_listing_lock:
+        _tree_listing = (snapshot["tree_sha"], snapshot["listing"])
+        _tree_listing_checked_at = 0.0
+
+    _snapshot_tree_sha = snapshot["tree_sha"]
+    logger.info(
+        f"Loaded snapshot of {len(snapshot['recipes'])} recipes at tree "
+        f"{snapshot['tree_sha']} in {time.monotonic() - started:.2f}s"
+    )
+    return True
+
+
+def save_snapshot_if_changed(path: str) -> None:
+    """Save a snapshot unless the last one already covers the indexed tree"""
+    try:
+        if _indexed_tree_sha is not None and _indexed_tree_sha != _snapshot_tree_sha:
+            save_snapshot(path)
+    except Exception as e:
+        logger.warning(f"Could not save snapshot to {path}: {e}")
+
 
-# GitHub configuration
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_REPO = os.getenv("GITHUB_REPO", "malekmaciej/przepisy")
-RECIPES_PATH = os.getenv("RECIPES_PATH", "")  # Root path in the repo for recipes
+def start_snapshot_thread(path: str, interval: float) -> threading.Thread:
+    """Periodically save a snapshot whenever the indexes moved to a new tree"""
 
-# Initialize GitHub client
-github_client = None
-repo = None
+    def snapshot_loop() -> None:
+        while not _snapshot_stop.wait(interval):
+            save_snapshot_if_changed(path)
 
+    thread = threading.Thread(target=snapshot_loop, name="snapshot", daemon=True)
+    thread.start()
+    return thread
 
-def initialize_github():
-    """Initialize GitHub client and repository"""
-    global github_client, repo
 
-    if not GITHUB_TOKEN:
-        logger.error("GITHUB_TOKEN environment variable not set")
-        raise ValueError("GITHUB_TOKEN is required")
+@mcp.tool()
+@instrumented
+def list_recipes(
+    limit: int = LIST_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    prefix: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    List available recipes from the GitHub repository, one page at a time.
 
-    try:
-        from github import Auth
+    Recipes are ordered by path. Pass next_cursor back to get the next page;
+    it is null on the last page.
 
-        auth = Auth.Token(GITHUB_TOKEN)
-        github_client = Github(auth=auth)
-        repo = github_client.get_repo(GITHUB_REPO)
-        logger.info(f"Successfully connected to GitHub repo: {GITHUB_REPO}")
+    Args:
+        limit: Maximum number of recipes to return (at most 1000)
+        cursor: next_cursor from a previous call, to continue after its last recipe
+        prefix: Only list recipes whose path starts with this, e.g. "desserts/"
+
+    Returns:
+        {"recipes": [...], "next_cursor": str or None, "total": int}, where each
+        recipe has name, path, size and SHA, and total counts every matching recipe.
+    """
+    try:
+        page = page_recipes(limit, cursor, prefix or "")
+        logger.info(f"Listed {len(page['recipes'])} of {page['total']} recipes")
+        return page
     except Exception as e:
-        logger.error(f"Failed to initialize GitHub client: {e}")
+        logger.error(f"Error listing recipes: {e}")
         raise
 
 
-def get_file_content(file_path: str) -> str:
-    """Get content of a file from the repository"""
+@mcp.tool()
+@instrumented
+def search_recipes(query: str) -> List[Dict[str, Any]]:
+    """
+    Search for recipes by name found inside the file (first line starting with '#').
+    Files without a '#' header on the first line will be skipped.
+
+    Matching ignores case and Polish or other diacritics ("zurek" finds
+    "Żurek") and tolerates typos ("carbonra" finds "Carbonara").
+
+    Args:
+        query: Search term to find in recipe names (from first line of files)
+
+    Returns:
+        A list of matching recipes with their metadata, extracted names and a
+        similarity score, best matches first. Names containing the query
+        score 1.0.
+    """
     try:
-        content_file = repo.get_contents(file_path)
-        if isinstance(content_file, list):
-            raise ValueError(f"Path {file_path} is a directory, not a file")
+        recipes = sync_recipe_indexes()
+        scores = trigram_index.search(query)
 
-        content = base64.b64decode(content_file.content).decode("utf-8")
-        return content
-    except GithubException as e:
-        logger.error(f"GitHub error fetching {file_path}: {e}")
-        raise
+        matching_recipes = []
+        for recipe in recipes:
+            score = scores.get(recipe["path"])
+            recipe_name = name_index.get_name(recipe["path"])
+            if score and recipe_name:
+                # Add the extracted name to the recipe metadata
+                recipe["recipe_name"] = recipe_name
+                recipe["score"] = round(score, 3)
+                matching_recipes.append(recipe)
+        # Stable sort keeps equally good matches in path order
+        matching_recipes.sort(key=lambda recipe: -recipe["score"])
+
+        logger.info(f"Found {len(matching_recipes)} recipes matching '{query}'")
+        return matching_recipes
     except Exception as e:
-        logger.error(f"Error decoding content from {file_path}: {e}")
+        logger.error(f"Error searching recipes: {e}")
         raise
 
 
-def extract_recipe_name_from_content(content: str) -> Optional[str]:
+@mcp.tool()
+@instrumented
+def search_recipe_text(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
-    Extract recipe name from the first line of the file content.
-    Recipe name is expected to be on the first line starting with '#'.
+    Full-text search over whole recipes, including ingredients, steps and headings.
+    Use this for questions like "what can I make with leeks".
 
     Args:
-        content: The full content of the recipe file
+        query: Words to look for anywhere in the recipe text
+        limit: Maximum number of results to return (default 10)
 
     Returns:
-        The recipe name without the '#' prefix, or None if not found
+        Recipes ranked by relevance (BM25), each with path, recipe name, score and a matching snippet.
     """
-    lines = content.split("\n")
-    if lines and lines[0].startswith("#"):
-        # Remove the '#' and any leading/trailing whitespace
-        return lines[0].lstrip("#").strip()
-    return None
-
-
-def list_recipes_in_path(path: str = "") -> List[Dict[str, Any]]:
-    """List all recipe files in a given path"""
-    recipes = []
     try:
-        contents = repo.get_contents(path)
-
-        for content in contents:
-            if content.type == "file" and content.name.endswith(".md"):
-                recipes.append(
-                    {
-                        "name": content.name,
-                        "path": content.path,
-                        "size": content.size,
-                        "sha": content.sha,
-                    }
-                )
-            elif content.type == "dir":
-                # Recursively list recipes in subdirectories
-                recipes.extend(list_recipes_in_path(content.path))
+        sync_recipe_indexes()
+        results = fulltext_index.search(query, limit=limit)
+        for result in results:
+            result["recipe_name"] = name_index.get_name(result["path"])
 
-        return recipes
-    except GithubException as e:
-        logger.error(f"Error listing recipes in {path}: {e}")
-        return []
+        logger.info(f"Found {len(results)} recipes with text matching '{query}'")
+        return results
+    except Exception as e:
+        logger.error(f"Error searching recipe text: {e}")
+        raise
 
 
 @mcp.tool()
-def list_recipes() -> List[Dict[str, Any]]:
+@instrumented
+def filter_recipes(
+    max_total_minutes: Optional[int] = None,
+    min_total_minutes: Optional[int] = None,
+    max_prep_minutes: Optional[int] = None,
+    max_cook_minutes: Optional[int] = None,
+    min_servings: Optional[int] = None,
+    max_servings: Optional[int] = None,
+    difficulty: Optional[List[str]] = None,
+    cuisine: Optional[List[str]] = None,
+    include_ingredients: Optional[List[str]] = None,
+    exclude_ingredients: Optional[List[str]] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
     """
-    List all available recipes from the GitHub repository.
+    Find recipes by time, servings, difficulty, cuisine and ingredients.
+    Use this for questions like "under 30 minutes, easy, with chocolate, no nuts".
+
+    Args:
+        max_total_minutes: Only recipes ready within this many minutes in total
+        min_total_minutes: Only recipes taking at least this many minutes in total
+        max_prep_minutes: Only recipes with at most this much preparation time
+        max_cook_minutes: Only recipes with at most this much cooking time
+        min_servings: Only recipes making at least this many servings
+        max_servings: Only recipes making at most this many servings
+        difficulty: Allowed difficulty levels, e.g. ["Easy", "Medium"]
+        cuisine: Allowed cuisines, e.g. ["Italian"]
+        include_ingredients: Ingredients every recipe must contain, e.g. ["chocolate"]
+        exclude_ingredients: Ingredients no recipe may contain, e.g. ["nuts"]
+        limit: Maximum number of recipes to return (default 50)
 
     Returns:
-        A list of recipe metadata including name, path, size, and SHA.
+        {"recipes": [...], "total": int, "facets": {...}}. Recipes are in path
+        order with their name, times, servings, difficulty and cuisine; total
+        counts every match; facets counts the difficulty and cuisine values
+        among the matches. Recipes that do not state a filtered attribute
+        are left out.
     """
     try:
-        recipes = list_recipes_in_path(RECIPES_PATH)
-        logger.info(f"Listed {len(recipes)} recipes")
-        return recipes
+        sync_recipe_indexes()
+        matches, counts = facet_index.filter(
+            ranges={
+                "total_time_minutes": (min_total_minutes, max_total_minutes),
+                "prep_time_minutes": (None, max_prep_minutes),
+                "cook_time_minutes": (None, max_cook_minutes),
+                "servings": (min_servings, max_servings),
+            },
+            categories={"difficulty": difficulty or [], "cuisine": cuisine or []},
+            include_ingredients=include_ingredients or [],
+            exclude_ingredients=exclude_ingredients or [],
+        )
+
+        recipes = []
+        for match in matches[: max(limit, 0)]:
+            match["recipe_name"] = name_index.get_name(match["path"])
+            recipes.append(match)
+
+        logger.info(f"Filtered recipes down to {len(matches)} matches")
+        return {"recipes": recipes, "total": len(matches), "facets": counts}
     except Exception as e:
-        logger.error(f"Error listing recipes: {e}")
+        logger.error(f"Error filtering recipes: {e}")
         raise
 
 
 @mcp.tool()
-def search_recipes(query: str) -> List[Dict[str, Any]]:
+@instrumented
+def find_similar_recipes(
+    content: Optional[str] = None,
+    path: Optional[str] = None,
+    limit: int = 5,
+    min_similarity: float = 0.5,
+) -> List[Dict[str, Any]]:
     """
-    Search for recipes by name found inside the file (first line starting with '#').
-    Files without a '#' header on the first line will be skipped.
+    Find recipes that are near-duplicates of some recipe text or of an existing recipe.
+    Use this before creating a recipe to check whether the cookbook already has it.
 
     Args:
-        query: Search term to find in recipe names (from first line of files)
+        content: Recipe text to compare against the cookbook
+        path: Path of an existing recipe to compare instead (it is left out of the results)
+        limit: Maximum number of results to return (default 5)
+        min_similarity: Smallest similarity to report, from 0 to 1 (default 0.5)
 
     Returns:
-        A list of matching recipes with their metadata and extracted names.
+        Similar recipes, most similar first, each with path, recipe name and an
+        estimated similarity (1.0 means the same wording).
     """
     try:
-        matching_recipes = []
-        recipes = list_recipes_in_path(RECIPES_PATH)
-
-        query_lower = query.lower()
-
-        # Search by extracting the name from each file's first line
-        for recipe in recipes:
-            try:
-                content = get_file_content(recipe["path"])
-                recipe_name = extract_recipe_name_from_content(content)
+        if content is None and path is None:
+            raise ValueError("Either content or path is required")
+        sync_recipe_indexes()
+        signature = similarity_index.signature_for(path) if content is None else None
+        if signature is None:
+            if content is None:
+                content = get_file_content(path)
+            signature = similarity_index.signature(content)
 
-                if recipe_name and query_lower in recipe_name.lower():
-                    # Add the extracted name to the recipe metadata
-                    recipe_with_name = recipe.copy()
-                    recipe_with_name["recipe_name"] = recipe_name
-                    matching_recipes.append(recipe_with_name)
-            except Exception as e:
-                logger.warning(f"Could not search recipe at {recipe['path']}: {e}")
+        results = similarity_index.similar(
+            signature, limit, min_similarity, exclude=path
+        )
+        for result in results:
+            result["recipe_name"] = name_index.get_name(result["path"])
 
-        logger.info(f"Found {len(matching_recipes)} recipes matching '{query}'")
-        return matching_recipes
+        logger.info(
+            f"Found {len(results)} recipes similar to {path or 'given content'}"
+        )
+        return results
     except Exception as e:
-        logger.error(f"Error searching recipes: {e}")
+        logger.error(f"Error finding similar recipes: {e}")
         raise
 
 
 @mcp.tool()
+@instrumented
 def get_recipe(path: str) -> Dict[str, Any]:
     """
     Get the full content and metadata of a specific recipe.
@@ -182,29 +3660,108 @@ def get_recipe(path: str) -> Dict[str, Any]:
         path: Path to the recipe file in the repository
 
     Returns:
-        Recipe content and metadata including name (extracted from first line), content, and path.
+        Recipe content and metadata including name (extracted from first line), content, path,
+        and the blob SHA of this version (pass it to update_recipe to guard against lost updates).
     """
     try:
         content = get_file_content(path)
+        return build_recipe(path, content)
+    except Exception as e:
+        logger.error(f"Error getting recipe from {path}: {e}")
+        raise
 
-        # Extract recipe name from the first line of the file
-        recipe_name = extract_recipe_name_from_content(content)
 
-        # Fallback to filename if name extraction fails
-        if not recipe_name:
-            recipe_name = (
-                os.path.basename(path).replace(".md", "").replace("-", " ").title()
-            )
+@mcp.tool()
+@instrumented
+def get_recipe_structured(
+    path: str, fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get a recipe parsed into structured fields instead of raw markdown.
+
+    Args:
+        path: Path to the recipe file in the repository
+        fields: Optional subset of fields to return: title, description,
+                prep_time_minutes, cook_time_minutes, total_time_minutes,
+                servings, difficulty, cuisine, info, ingredients, steps.
+                All fields are returned when omitted.
 
-        return {"name": recipe_name, "path": path, "content": content}
+    Returns:
+        The requested fields plus the path. Times are in minutes; each
+        ingredient has section, text, quantity, unit and item. Fields the
+        recipe does not state are null.
+    """
+    try:
+        unknown = [field for field in fields or [] if field not in STRUCTURED_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        content = get_file_content(path)
+        # Hash what was read: the path may already map to a newer blob
+        sha = git_blob_sha(content.encode("utf-8"))
+        parsed = parsed_recipes.get(sha, content)
+
+        result = {"path": path}
+        for field in fields or STRUCTURED_FIELDS:
+            result[field] = parsed[field]
+        return result
     except Exception as e:
-        logger.error(f"Error getting recipe from {path}: {e}")
+        logger.error(f"Error getting structured recipe from {path}: {e}")
         raise
 
 
 @mcp.tool()
+@instrumented
+def get_recipes(paths: List[str]) -> Dict[str, Any]:
+    """
+    Get the full content and metadata of several recipes in one call.
+    Prefer this over calling get_recipe repeatedly.
+
+    Args:
+        paths: Paths to the recipe files in the repository
+
+    Returns:
+        "recipes": recipe content and metadata (name, path, content, sha) in the requested order,
+        "errors": a mapping of path to error message for paths that could not be read.
+    """
+    unique_paths = list(dict.fromkeys(paths))
+    recipes: Dict[str, Dict[str, Any]] = {}
+    misses = []
+    for path in unique_paths:
+        content = content_cache.get_by_path(path)
+        if content is None:
+            misses.append(path)
+        else:
+            recipes[path] = build_recipe(path, content)
+
+    contents, errors = fetch_engine.fetch_many(misses, fetch_file_content)
+    for path, content in contents.items():
+        recipes[path] = build_recipe(path, content)
+
+    logger.info(
+        f"Got {len(recipes)} of {len(unique_paths)} recipes "
+        f"({len(unique_paths) - len(misses)} from cache, {len(errors)} errors)"
+    )
+    return {
+        "recipes": [recipes[path] for path in unique_paths if path in recipes],
+        "errors": {path: str(error) for path, error in errors.items()},
+    }
+
+
+def recipe_path_for_name(name: str) -> str:
+    """Build the default file path for a recipe from its name"""
+    sanitized_name = re.sub(r"[^a-z0-9\s-]", "", name.lower())
+    sanitized_name = re.sub(r"\s+", "-", sanitized_name)
+    return os.path.join(RECIPES_PATH, f"{sanitized_name}.md")
+
+
+@mcp.tool()
+@instrumented
 def create_recipe(
-    name: str, content: str, path: Optional[str] = None
+    name: str,
+    content: str,
+    path: Optional[str] = None,
+    check_duplicates: bool = False,
 ) -> Dict[str, Any]:
     """
     Create a new recipe in the GitHub repository.
@@ -213,32 +3770,47 @@ def create_recipe(
         name: Name of the recipe (will be used for filename if path not provided)
         content: Full content of the recipe in Markdown format
         path: Optional custom path. If not provided, will use sanitized name in root recipes path
+        check_duplicates: If true, nothing is written when the cookbook already has a
+                          near-identical recipe; the duplicates are returned instead. Call
+                          again without the check to create the recipe anyway.
 
     Returns:
-        Information about the created recipe including its path and commit SHA.
+        Information about the created recipe including its path and commit SHA, or,
+        when duplicates were found, "duplicates" with their paths and similarity.
     """
     try:
-        # Sanitize filename if path not provided
-        if not path:
-            sanitized_name = re.sub(r"[^a-z0-9\s-]", "", name.lower())
-            sanitized_name = re.sub(r"\s+", "-", sanitized_name)
-            file_path = os.path.join(RECIPES_PATH, f"{sanitized_name}.md")
-        else:
-            file_path = path
+        file_path = path or recipe_path_for_name(name)
+
+        if check_duplicates:
+            sync_recipe_indexes()
+            duplicates = similarity_index.similar(
+                similarity_index.signature(content),
+                min_similarity=DUPLICATE_SIMILARITY,
+            )
+            if duplicates:
+                for duplicate in duplicates:
+                    duplicate["recipe_name"] = name_index.get_name(duplicate["path"])
+                logger.info(
+                    f"Not creating {file_path}: {len(duplicates)} near-duplicates"
+                )
+                return {
+                    "success": False,
+                    "duplicates": duplicates,
+                    "error": f"Found {len(duplicates)} near-identical recipes; "
+                    "nothing was written",
+                }
 
         # Create the file in the repository
-        result = repo.create_file(
-            path=file_path,
-            message=f"Add recipe: {name}",
-            content=content,
-            branch="main",
-        )
+        result = get_storage().create_file(file_path, content, f"Add recipe: {name}")
+        content_cache.put(file_path, result["sha"], content)
+        index_recipe(file_path, result["sha"], content)
+        invalidate_tree_listing()
 
         logger.info(f"Created recipe at {file_path}")
         return {
             "success": True,
             "path": file_path,
-            "sha": result["commit"].sha,
+            "sha": result["commit_sha"],
             "message": f"Recipe '{name}' created successfully",
         }
     except GithubException as e:
@@ -249,9 +3821,18 @@ def create_recipe(
         return {"error": str(e), "success": False}
 
 
+def known_blob_sha(path: str) -> Optional[str]:
+    """Return the blob SHA a path was last seen at, without asking the storage backend"""
+    sha = content_cache.get_path_sha(path)
+    if sha is None:
+        sha = _indexed_blobs.get(path)
+    return sha
+
+
 @mcp.tool()
+@instrumented
 def update_recipe(
-    path: str, content: str, message: Optional[str] = None
+    path: str, content: str, message: Optional[str] = None, sha: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Update an existing recipe in the GitHub repository.
@@ -260,35 +3841,59 @@ def update_recipe(
         path: Path to the recipe file to update
         content: New content for the recipe
         message: Optional commit message (defaults to "Update recipe: {filename}")
+        sha: Optional blob SHA of the version the new content is based on, as returned
+             by get_recipe. If the recipe changed since, nothing is written and a
+             conflict with the current content is returned instead. Without it the
+             last writer wins: a concurrent edit is overwritten.
 
     Returns:
-        Information about the updated recipe including its new SHA.
+        Information about the updated recipe including its commit SHA and new blob SHA,
+        or, on a conflict, "conflict": true with current_sha and current_content.
     """
     try:
-        # Get the current file to retrieve its SHA
-        file = repo.get_contents(path)
-
-        if isinstance(file, list):
-            return {
-                "error": f"Path {path} is a directory, not a file",
-                "success": False,
-            }
-
         # Set default commit message
         if not message:
             filename = os.path.basename(path)
             message = f"Update recipe: {filename}"
 
-        # Update the file
-        result = repo.update_file(
-            path=path, message=message, content=content, sha=file.sha, branch="main"
-        )
+        # Write against the SHA we already know; the backend rejects it if stale
+        backend = get_storage()
+        expected_sha = sha or known_blob_sha(path)
+        if expected_sha is None:
+            expected_sha, _ = backend.get_file(path)
+
+        try:
+            result = backend.update_file(path, content, message, expected_sha)
+        except WriteConflictError:
+            content_cache.invalidate_path(path)
+            current_sha, current_content = backend.get_file(path)
+            content_cache.put(path, current_sha, current_content)
+            if sha:
+                logger.info(f"Update of {path} conflicts with blob {current_sha}")
+                return {
+                    "success": False,
+                    "conflict": True,
+                    "path": path,
+                    "expected_sha": sha,
+                    "current_sha": current_sha,
+                    "current_content": current_content,
+                    "error": f"Recipe {path} changed since blob {sha}; "
+                    "merge with current_content and retry with sha=current_sha",
+                }
+            # No base version was given, so the last writer wins: retry once
+            # against the current blob
+            result = backend.update_file(path, content, message, current_sha)
+
+        content_cache.put(path, result["sha"], content)
+        index_recipe(path, result["sha"], content)
+        invalidate_tree_listing()
 
         logger.info(f"Updated recipe at {path}")
         return {
             "success": True,
             "path": path,
-            "sha": result["commit"].sha,
+            "sha": result["commit_sha"],
+            "blob_sha": result["sha"],
             "message": f"Recipe updated successfully",
         }
     except GithubException as e:
@@ -299,25 +3904,120 @@ def update_recipe(
         return {"error": str(e), "success": False}
 
 
+@mcp.tool()
+@instrumented
+def save_recipes(
+    recipes: List[Dict[str, str]], message: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create or update several recipes in a single commit.
+
+    All recipes are written together or not at all, which makes this the
+    tool to use for bulk imports and edits that span multiple recipes.
+
+    Args:
+        recipes: List of recipes, each with "content" and either "path" or "name"
+                 (a name is turned into a path the same way create_recipe does)
+        message: Optional commit message (defaults to "Save N recipes")
+
+    Returns:
+        The commit SHA and the paths that were written.
+    """
+    try:
+        files: Dict[str, str] = {}
+        for recipe in recipes:
+            if "content" not in recipe or not (
+                recipe.get("path") or recipe.get("name")
+            ):
+                raise ValueError("Each recipe needs content and a path or name")
+            file_path = recipe.get("path") or recipe_path_for_name(recipe["name"])
+            if file_path in files:
+                raise ValueError(f"Path {file_path} appears more than once")
+            files[file_path] = recipe["content"]
+        if not files:
+            raise ValueError("No recipes to save")
+
+        result = get_storage().write_files(
+            files, message or f"Save {len(files)} recipes"
+        )
+        for file_path, sha in result["files"].items():
+            content_cache.put(file_path, sha, files[file_path])
+            index_recipe(file_path, sha, files[file_path])
+        invalidate_tree_listing()
+
+        logger.info(f"Saved {len(files)} recipes in commit {result['commit_sha']}")
+        return {
+            "success": True,
+            "paths": list(files),
+            "sha": result["commit_sha"],
+            "message": f"Saved {len(files)} recipes",
+        }
+    except GithubException as e:
+        logger.error(f"GitHub error saving recipes: {e}")
+        return {"error": str(e), "success": False}
+    except Exception as e:
+        logger.error(f"Error saving recipes: {e}")
+        return {"error": str(e), "success": False}
+
+
+@mcp.tool()
+@instrumented
+def get_github_budget() -> Dict[str, Any]:
+    """
+    Report how much of the GitHub API budget is left.
+    Check this before bulk operations such as importing many recipes.
+
+    Returns:
+        limit, remaining and resets_in (seconds) as last reported by GitHub,
+        blocked_for (seconds requests are paused after hitting a rate limit),
+        and request, retry and rate-limit counters. Budget fields are null
+        until the first GitHub response, and stay null for local storage.
+    """
+    return github_scheduler.stats()
+
+
 @mcp.resource("recipe://list")
 def get_recipe_list() -> str:
     """
-    Resource endpoint to get a formatted list of all recipes.
+    Resource endpoint to get a formatted list of recipes.
+
+    Returns:
+        The first page of the recipe list, ending with the URI of the next page
+        when there is one.
+    """
+    return render_recipe_list()
+
+
+@mcp.resource("recipe://list/{cursor}")
+def get_recipe_list_page(cursor: str) -> str:
+    """
+    Resource endpoint to get a further page of the recipe list.
+
+    Args:
+        cursor: Cursor from the end of the previous page
 
     Returns:
-        A formatted text list of all available recipes.
+        A formatted text list of the recipes on that page.
     """
+    return render_recipe_list(cursor)
+
+
+def render_recipe_list(cursor: Optional[str] = None) -> str:
+    """Format one page of the recipe list as markdown"""
     try:
-        recipes = list_recipes_in_path(RECIPES_PATH)
+        page = page_recipes(LIST_RESOURCE_PAGE_SIZE, cursor)
 
-        if not recipes:
+        if not page["total"]:
             return "No recipes found in the repository."
 
-        output = f"# Available Recipes ({len(recipes)} total)\n\n"
-        for recipe in recipes:
-            output += f"- **{recipe['name']}** (`{recipe['path']}`)\n"
-
-        return output
+        chunks = [f"# Available Recipes ({page['total']} total)\n\n"]
+        chunks.extend(
+            f"- **{recipe['name']}** (`{recipe['path']}`)\n"
+            for recipe in page["recipes"]
+        )
+        if page["next_cursor"]:
+            chunks.append(f"\nMore recipes: recipe://list/{page['next_cursor']}\n")
+        return "".join(chunks)
     except Exception as e:
         logger.error(f"Error getting recipe list: {e}")
         return f"Error: {str(e)}"
@@ -342,26 +4042,411 @@ def get_recipe_resource(path: str) -> str:
         return f"Error: {str(e)}"
 
 
+def verify_webhook_signature(
+    secret: str, body: bytes, signature: Optional[str]
+) -> bool:
+    """Check a GitHub X-Hub-Signature-256 header against the raw request body"""
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+
+def apply_push_event(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Invalidate the cached state touched by a GitHub push event.
+
+    Path mappings of added and modified files are dropped so the next read
+    asks for the new blob, removed recipes leave the indexes right away, and
+    the tree listing is marked stale. Force pushes and branch deletions
+    rewrite history the file lists cannot describe, so every path mapping
+    is dropped instead. Nothing is fetched here; see refresh_after_push().
+
+    Returns:
+        A summary of what was invalidated, or why the event was ignored.
+    """
+    ref = payload.get("ref")
+    if ref != f"refs/heads/{GITHUB_BRANCH}":
+        return {"applied": False, "reason": f"Ignoring push to {ref}"}
+
+    # Replay the commits in order so a file removed and re-added ends up changed
+    state: Dict[str, str] = {}
+    for commit in payload.get("commits") or []:
+        for path in commit.get("added", []) + commit.get("modified", []):
+            state[path] = "changed"
+        for path in commit.get("removed", []):
+            state[path] = "removed"
+    changed = sorted(path for path, s in state.items() if s == "changed")
+    removed = sorted(path for path, s in state.items() if s == "removed")
+
+    full_refresh = bool(payload.get("forced") or payload.get("deleted"))
+    if full_refresh:
+        content_cache.invalidate_all_paths()
+    for path in changed + removed:
+        content_cache.invalidate_path(path)
+
+    with _index_sync_lock:
+        for path in removed:
+            if path in _indexed_blobs:
+                for index in recipe_indexes:
+                    index.remove(path)
+                del _indexed_blobs[path]
+    invalidate_tree_listing()
+
+    logger.info(
+        f"Push to {ref}: {len(changed)} changed, {len(removed)} removed"
+        + (", full refresh" if full_refresh else "")
+    )
+    return {
+        "applied": True,
+        "changed": changed,
+        "removed": removed,
+        "full_refresh": full_refresh,
+    }
+
+
+def refresh_after_push() -> None:
+    """Re-read the branch and re-index only the recipes whose blobs changed"""
+    try:
+        with background_priority():
+            get_storage().refresh()
+            sync_recipe_indexes()
+    except Exception as e:
+        logger.warning(f"Could not refresh recipes after push: {e}")
+
+
+@mcp.custom_route(WEBHOOK_PATH, methods=["POST"])
+async def github_webhook(request: Request) -> JSONResponse:
+    """
+    Receive GitHub push webhooks.
+
+    Requests must be signed with GITHUB_WEBHOOK_SECRET. Cached state is
+    invalidated before responding and the re-index runs in the background,
+    so GitHub gets its answer well within the delivery timeout.
+    """
+    if not GITHUB_WEBHOOK_SECRET:
+        return JSONResponse({"error": "Webhook secret not configured"}, status_code=403)
+
+    body = await request.body()
+    signature = request.headers.get("X-Hub-Signature-256")
+    if not verify_webhook_signature(GITHUB_WEBHOOK_SECRET, body, signature):
+        logger.warning("Rejected webhook with an invalid signature")
+        return JSONResponse({"error": "Invalid signature"}, status_code=401)
+
+    event = request.headers.get("X-GitHub-Event", "")
+    if event == "ping":
+        return JSONResponse({"ok": True})
+    if event != "push":
+        return JSONResponse({"applied": False, "reason": f"Ignoring {event} event"})
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JSONResponse({"error": "Invalid JSON payload"}, status_code=400)
+
+    # Invalidation takes the index lock and writes to the shared cache
+    result = await run_in_threadpool(apply_push_event, payload)
+    if result["applied"]:
+        threading.Thread(
+            target=refresh_after_push, name="push-refresh", daemon=True
+        ).start()
+    return JSONResponse(result, status_code=202 if result["applied"] else 200)
+
+
+def collect_component_metrics() -> (
+    List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]
+):
+    """Sample cache, concurrency and GitHub budget stats for /metrics"""
+    content = content_cache.stats()
+    parsed = parsed_recipes.stats()
+    conditional = conditional_cache.stats()
+    flights = single_flight.stats()
+    fetches = fetch_engine.stats()
+    budget = github_scheduler.stats()
+
+    # Revalidated GitHub responses count as hits of the conditional cache
+    lookups = {
+        "content": (content["hits"], content["misses"]),
+        "parsed": (parsed["hits"], parsed["misses"]),
+        "conditional": (
+            conditional["not_modified"],
+            conditional["requests"] - conditional["not_modified"],
+        ),
+    }
+    if shared_cache:
+        shared = shared_cache.stats()
+        lookups["shared"] = (shared["hits"], shared["misses"])
+    collected = [
+        (
+            "recipe_mcp_cache_hits_total",
+            "counter",
+            "Cache lookups answered from the cache, by cache",
+            [({"cache": name}, hits) for name, (hits, _) in lookups.items()],
+        ),
+        (
+            "recipe_mcp_cache_misses_total",
+            "counter",
+            "Cache lookups that had to fetch or parse, by cache",
+            [({"cache": name}, misses) for name, (_, misses) in lookups.items()],
+        ),
+        (
+            "recipe_mcp_cache_hit_ratio",
+            "gauge",
+            "Share of cache lookups answered from the cache, by cache",
+            [
+                ({"cache": name}, hits / (hits + misses) if hits + misses else 0.0)
+                for name, (hits, misses) in lookups.items()
+            ],
+        ),
+        (
+            "recipe_mcp_cache_entries",
+            "gauge",
+            "Entries held, by cache",
+            [
+                ({"cache": "content"}, content["entries"]),
+                ({"cache": "parsed"}, parsed["entries"]),
+                ({"cache": "conditional"}, conditional["entries"]),
+            ],
+        ),
+        (
+            "recipe_mcp_content_cache_bytes",
+            "gauge",
+            "Bytes of recipe content held in memory",
+            [({}, content["bytes"])],
+        ),
+        (
+            "recipe_mcp_content_cache_evictions_total",
+            "counter",
+            "Recipe contents evicted to stay within the memory budget",
+            [({}, content["evictions"])],
+        ),
+        (
+            "recipe_mcp_conditional_cache_bytes",
+            "gauge",
+            "Bytes of GitHub response bodies kept for revalidation",
+            [({}, conditional["bytes"])],
+        ),
+        (
+            "recipe_mcp_conditional_cache_evictions_total",
+            "counter",
+            "GitHub responses dropped to stay within the entry and byte limits",
+            [({}, conditional["evictions"])],
+        ),
+        (
+            "recipe_mcp_coalesced_requests_total",
+            "counter",
+            "Fetches that waited for an identical fetch already in flight, by kind",
+            [({"kind": kind}, count) for kind, count in flights["coalesced"].items()],
+        ),
+        (
+            "recipe_mcp_single_flight_in_flight",
+            "gauge",
+            "Distinct fetches currently in flight",
+            [({}, flights["in_flight"])],
+        ),
+        (
+            "recipe_mcp_fetch_in_flight",
+            "gauge",
+            "Bulk fetches currently running in the fetch engine",
+            [({}, fetches["in_flight"])],
+        ),
+        (
+            "recipe_mcp_fetch_max_in_flight",
+            "gauge",
+            "Concurrency cap of the fetch engine",
+            [({}, fetches["max_in_flight"])],
+        ),
+        (
+            "recipe_mcp_github_waiting_interactive",
+            "gauge",
+            "Tool-call GitHub requests waiting for the scheduler",
+            [({}, budget["waiting_interactive"])],
+        ),
+        (
+            "recipe_mcp_github_retries_total",
+            "counter",
+            "GitHub requests retried after a rate limit or server error",
+            [({}, budget["retries"])],
+        ),
+        (
+            "recipe_mcp_github_rate_limited_total",
+            "counter",
+            "GitHub responses that were rate limits",
+            [({}, budget["rate_limited"])],
+        ),
+        (
+            "recipe_mcp_indexed_recipes",
+            "gauge",
+            "Recipes in the search indexes",
+            [({}, len(name_index))],
+        ),
+    ]
+    if budget["remaining"] is not None:
+        collected.append(
+            (
+                "recipe_mcp_github_rate_limit_remaining",
+                "gauge",
+                "GitHub API requests left in the current rate limit window",
+                [({}, budget["remaining"])],
+            )
+        )
+    return collected
+
+
+@mcp.custom_route(METRICS_PATH, methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Serve tool, GitHub, cache and concurrency metrics for Prometheus to scrape"""
+    return PlainTextResponse(
+        metrics.render(collect_component_metrics()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+# Seconds spent in each startup phase, the phase warmup is in and its last error
+startup_timings: Dict[str, float] = {}
+startup_status: Dict[str, Optional[str]] = {"phase": "starting", "error": None}
+_ready = threading.Event()
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Time a startup phase for the logs, /ready and /metrics"""
+    startup_status["phase"] = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        startup_timings[name] = round(elapsed, 3)
+        metrics.set("recipe_mcp_startup_seconds", elapsed, {"phase": name})
+
+
+def retry_startup_phase(
+    name: str, action: Callable[[], Any], retry_delay: float
+) -> None:
+    """Run a startup phase until it succeeds, backing off up to a minute between tries"""
+    while True:
+        try:
+            with startup_phase(name):
+                action()
+            break
+        except Exception as e:
+            # /ready is unauthenticated: it only gets the error class, the log the details
+            startup_status["error"] = type(e).__name__
+            logger.error(
+                f"Startup phase {name} failed, retrying in {retry_delay}s: "
+                f"{redact_credentials(str(e))}"
+            )
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 60.0)
+    startup_status["error"] = None
+
+
+def warm_up(started_at: float, retry_delay: float = 5.0) -> None:
+    """
+    Connect to storage and build the listing and indexes, then mark the
+    server ready.
+
+    Runs in the background so the server accepts connections immediately.
+    Connecting and the first listing are retried with backoff until they
+    succeed, since the GitHub backend connects lazily and a bad token or
+    repository only shows up on the first read. A failed index build only
+    delays indexing until the first search syncs again.
+    """
+    retry_startup_phase("storage", get_storage, retry_delay)
+
+    # Start from the last snapshot, if any, so only the diff since then is fetched
+    if SNAPSHOT_PATH:
+        with startup_phase("snapshot_load"):
+            load_snapshot(SNAPSHOT_PATH)
+
+    with background_priority():
+        retry_startup_phase("listing", get_tree_listing, retry_delay)
+    try:
+        with background_priority():
+            with startup_phase("indexes"):
+                sync_recipe_indexes()
+        logger.info(f"Indexed {len(name_index)} recipe names")
+    except Exception as e:
+        startup_status["error"] = type(e).__name__
+        logger.warning(
+            f"Could not build recipe indexes at startup: {redact_credentials(str(e))}"
+        )
+
+    if SNAPSHOT_PATH:
+        with startup_phase("snapshot_save"):
+            save_snapshot_if_changed(SNAPSHOT_PATH)
+        start_snapshot_thread(SNAPSHOT_PATH, SNAPSHOT_INTERVAL)
+
+    total = time.monotonic() - started_at
+    startup_timings["total"] = round(total, 3)
+    metrics.set("recipe_mcp_startup_seconds", total, {"phase": "total"})
+    metrics.set("recipe_mcp_ready", 1)
+    startup_status["phase"] = "ready"
+    _ready.set()
+    breakdown = ", ".join(f"{k} {v:.2f}s" for k, v in startup_timings.items())
+    logger.info(f"Ready after {total:.2f}s ({breakdown})")
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    """Liveness: the process is up and serving requests"""
+    return JSONResponse({"status": "ok"})
+
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def ready(request: Request) -> JSONResponse:
+    """Readiness: storage is connected and the listing and indexes are warm"""
+    body = {
+        "ready": _ready.is_set(),
+        "phase": startup_status["phase"],
+        "startup": dict(startup_timings),
+    }
+    if startup_status["error"]:
+        body["error"] = startup_status["error"]
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
 def main():
     """Main entry point for the MCP server"""
-    # Initialize GitHub connection
-    initialize_github()
+    started_at = time.monotonic()
+
+    # Only configuration is checked up front; connecting to storage, loading
+    # the snapshot and building indexes happen in the background so the
+    # server listens right away and reports readiness on /ready
+    check_storage_config()
+    initialize_shared_cache()
+    threading.Thread(
+        target=warm_up, args=(started_at,), name="warmup", daemon=True
+    ).start()
 
     # Get configuration from environment
     host = os.getenv("MCP_HOST", "0.0.0.0")
     port = int(os.getenv("MCP_PORT", "8000"))
     path = os.getenv("MCP_PATH", "/mcp")
 
-    logger.info(f"Starting MCP server on {host}:{port}{path}")
-    logger.info(f"Connected to GitHub repository: {GITHUB_REPO}")
+    logger.info(
+        f"Starting MCP server on {host}:{port}{path} "
+        f"({time.monotonic() - started_at:.3f}s after launch)"
+    )
+    if STORAGE_BACKEND == "github":
+        logger.info(f"Serving recipes from GitHub repository: {GITHUB_REPO}")
+    if GITHUB_WEBHOOK_SECRET:
+        logger.info(f"Accepting GitHub push webhooks on {WEBHOOK_PATH}")
+    logger.info(f"Serving Prometheus metrics on {METRICS_PATH}")
 
     # Run the server with streamable HTTP transport
-    mcp.run(
-        transport="streamable-http",
-        host=host,
-        port=port,
-        path=path,
-    )
+    try:
+        mcp.run(
+            transport="streamable-http",
+            host=host,
+            port=port,
+            path=path,
+        )
+    finally:
+        if SNAPSHOT_PATH and _ready.is_set():
+            _snapshot_stop.set()
+            save_snapshot_if_changed(SNAPSHOT_PATH)
 
 
 if __name__ == "__main__":
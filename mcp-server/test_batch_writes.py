@@ -0,0 +1,122 @@
+"""
+Test script for batch recipe writes through the Git Data API.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from test_indexes import SAMPLE_FILES, use_fake_github
+
+
+def write_requests(github):
+    """Count the requests made by a write, excluding the initial reads"""
+    return sum(
+        count
+        for endpoint, count in github.requests.items()
+        if endpoint in ("ref", "commit", "tree_create", "commit_create", "ref_update")
+    )
+
+
+def test_save_recipes_is_one_commit():
+    """Saving many recipes costs one commit and a constant number of requests"""
+    print("Testing batch save...")
+    for count in (3, 30):
+        with use_fake_github(SAMPLE_FILES) as github:
+            recipes = [
+                {"name": f"Soup {i}", "content": f"# Soup {i}\n\n- water\n"}
+                for i in range(count)
+            ]
+            recipes.append(
+                {"path": "pasta/carbonara.md", "content": "# Lighter Carbonara\n"}
+            )
+            result = server.save_recipes(recipes, "Import soups")
+            assert result["success"], result
+            assert github.commits == 1, github.commits
+            assert write_requests(github) == 5, github.requests
+            assert result["sha"] == github.commit_sha()
+            assert github.files["soup-0.md"] == "# Soup 0\n\n- water\n"
+            assert github.files["pasta/carbonara.md"] == "# Lighter Carbonara\n"
+            assert (
+                github.files["desserts/cookies.md"]
+                == SAMPLE_FILES["desserts/cookies.md"]
+            )
+            print(f"✓ {count + 1} recipes saved in one commit with 5 requests")
+
+
+def test_save_recipes_updates_indexes():
+    """Saved recipes are searchable and listed without waiting for a refresh"""
+    print("Testing indexes after batch save...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        server.search_recipes("classic")
+        result = server.save_recipes(
+            [
+                {"name": "Leek Quiche", "content": "# Leek Quiche\n\n- 1 leek\n"},
+                {"path": "pasta/carbonara.md", "content": "# Creamy Carbonara\n"},
+            ]
+        )
+        assert result["success"], result
+        assert result["paths"] == ["leek-quiche.md", "pasta/carbonara.md"], result
+
+        names = [r["recipe_name"] for r in server.search_recipes("carbonara")]
+        assert names == ["Creamy Carbonara"], names
+        assert server.search_recipe_text("leek")[0]["path"] == "leek-quiche.md"
+        paths = [r["path"] for r in server.list_recipes()["recipes"]]
+        assert "leek-quiche.md" in paths, paths
+        print("✓ Name and full-text indexes reflect the batch")
+
+
+def test_save_recipes_retries_when_branch_moves():
+    """A batch is rebuilt on the new head when the branch moves mid-write"""
+    print("Testing batch save against a moving branch...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        original = github._update_ref
+        moves = []
+
+        def update_ref(repo_url, branch, body):
+            if not moves:
+                # Another writer commits between our read and our ref update
+                moves.append(True)
+                github.files["notes.md"] = "Changed elsewhere\n"
+                github.commits += 1
+                github._head = None
+            return original(repo_url, branch, body)
+
+        github._update_ref = update_ref
+        result = server.save_recipes([{"name": "Leek Quiche", "content": "# Quiche\n"}])
+        assert result["success"], result
+        assert github.requests["ref_update"] == 2, github.requests
+        assert github.files["notes.md"] == "Changed elsewhere\n"
+        assert github.files["leek-quiche.md"] == "# Quiche\n"
+        print("✓ Concurrent commit kept and batch applied on top of it")
+
+
+def test_save_recipes_rejects_invalid_input():
+    """Malformed batches are refused before anything is written"""
+    print("Testing batch validation...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        for recipes in (
+            [],
+            [{"name": "No Content"}],
+            [{"content": "# No name or path\n"}],
+            [{"path": "a.md", "content": "1"}, {"path": "a.md", "content": "2"}],
+        ):
+            result = server.save_recipes(recipes)
+            assert not result["success"], recipes
+        assert github.commits == 0
+        print("✓ Empty, incomplete and duplicate batches rejected")
+
+
+if __name__ == "__main__":
+    try:
+        test_save_recipes_is_one_commit()
+        test_save_recipes_updates_indexes()
+        test_save_recipes_retries_when_branch_moves()
+        test_save_recipes_rejects_invalid_input()
+        print("\n✅ All batch write tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,85 @@
+"""
+Smoke test of the benchmark harness on a tiny cookbook.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark
+import server
+
+
+def test_generated_cookbook():
+    """Cookbooks are reproducible, nested and parse into structured fields"""
+    print("Testing cookbook generation...")
+    cookbook = benchmark.generate_cookbook(50, seed=7)
+    assert cookbook == benchmark.generate_cookbook(50, seed=7)
+    assert len(cookbook) == 50
+    assert all(path.count("/") == 2 for path in cookbook), list(cookbook)[:3]
+
+    path, content = next(iter(cookbook.items()))
+    parsed = server.parse_recipe(content)
+    assert parsed["total_time_minutes"] == (
+        parsed["prep_time_minutes"] + parsed["cook_time_minutes"]
+    ), parsed
+    assert parsed["cuisine"].lower() == path.split("/")[0], (path, parsed)
+    assert len(parsed["ingredients"]) >= 4 and len(parsed["steps"]) >= 3, parsed
+    print(f"✓ Generated {len(cookbook)} recipes, e.g. {path}")
+
+
+def run_main(output):
+    """Run the benchmark command line on a 30-recipe cookbook"""
+    return benchmark.main(
+        [
+            "--sizes",
+            "30",
+            "--latency",
+            "0",
+            "--iterations",
+            "10",
+            "--cold-iterations",
+            "1",
+            "--concurrency",
+            "2",
+            "--output",
+            output,
+        ]
+    )
+
+
+def test_benchmark_report():
+    """A small run times every tool cold and warm and writes a JSON report"""
+    print("Testing benchmark run...")
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "bench.json")
+        assert run_main(output) == 0
+        with open(output, encoding="utf-8") as f:
+            report = json.load(f)
+    assert report["version"] == benchmark.BENCHMARK_VERSION
+    (cookbook,) = report["cookbooks"]
+    assert cookbook["recipes"] == 30
+
+    rows = {(row["tool"], row["run"]): row for row in cookbook["results"]}
+    for tool in ["list_recipes", "search_recipes", "get_recipe", "filter_recipes"]:
+        assert (tool, "cold") in rows and (tool, "warm") in rows, sorted(rows)
+    assert ("create_recipe", "warm") in rows and ("update_recipe", "warm") in rows
+    assert all(row["errors"] == 0 for row in rows.values()), rows
+    assert all(row["p50_ms"] <= row["p99_ms"] for row in rows.values()), rows
+    assert rows[("index_sync", "cold")]["github_requests"] >= 30
+    assert rows[("search_recipes", "warm")]["github_requests"] == 0
+    print(f"✓ {len(rows)} result rows written")
+
+
+if __name__ == "__main__":
+    try:
+        test_generated_cookbook()
+        test_benchmark_report()
+        print("\n✅ All benchmark tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
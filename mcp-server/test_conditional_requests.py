@@ -0,0 +1,108 @@
+"""
+Test script for ETag revalidation of GitHub requests.
+Runs against a local stub of the GitHub contents API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+from server import ConditionalRequestCache, GitHubBackend
+
+
+def test_initialize_github_is_lazy():
+    """Initializing the client sends nothing; the first read revalidates later"""
+    print("Testing lazy GitHub initialization...")
+    original = (server.GITHUB_TOKEN, server.GITHUB_REPO, server.GITHUB_API_URL)
+    with FakeGitHub({"soup.md": "# Soup\n"}) as github:
+        server.GITHUB_TOKEN, server.GITHUB_REPO = "test-token", github.full_name
+        server.GITHUB_API_URL = github.url
+        try:
+            server.initialize_github()
+            assert sum(github.requests.values()) == 0, github.requests
+            assert server.repo.full_name == github.full_name
+            print("✓ No request sent at initialization")
+
+            backend = GitHubBackend(
+                server.repo, conditional_cache=ConditionalRequestCache(max_entries=16)
+            )
+            tree_sha = backend.get_head_tree_sha()
+            assert backend.get_head_tree_sha() == tree_sha and github.not_modified == 1
+            assert github.requests["repo"] == 0, github.requests
+            print("✓ Branch head read through the lazy repository and revalidated")
+        finally:
+            server.GITHUB_TOKEN, server.GITHUB_REPO, server.GITHUB_API_URL = original
+            server.github_client = server.repo = None
+
+
+def test_contents_revalidate_with_etag():
+    """Unchanged files and branch heads cost a 304, changed ones a full fetch"""
+    print("Testing conditional contents and branch reads...")
+    with FakeGitHub({"soup.md": "# Soup\n"}) as github:
+        cache = ConditionalRequestCache(max_entries=16)
+        backend = GitHubBackend(github.repo(), conditional_cache=cache)
+
+        first = backend.get_file("soup.md")
+        second = backend.get_file("soup.md")
+        assert first == second and github.not_modified == 1
+        print(f"✓ Repeat read revalidated: {cache.stats()}")
+
+        tree_sha = backend.get_head_tree_sha()
+        assert backend.get_head_tree_sha() == tree_sha and github.not_modified == 2
+        print("✓ Unchanged branch head revalidated")
+
+        github.files["soup.md"] = "# Better Soup\n"
+        sha, content = backend.get_file("soup.md")
+        assert content == "# Better Soup\n" and sha != first[0]
+        assert github.not_modified == 2, "changed file must not be a 304"
+        assert backend.get_head_tree_sha() != tree_sha
+        print("✓ Changed file and branch head fetched in full")
+
+        try:
+            backend.get_file("missing.md")
+            assert False, "missing files must raise"
+        except server.GithubException as e:
+            assert e.status == 404
+            print("✓ Errors are raised as GithubException")
+
+
+def test_stored_responses_are_bounded_by_bytes():
+    """Large file payloads are evicted to stay within the byte budget"""
+    print("Testing conditional cache byte budget...")
+    files = {f"recipe-{i}.md": f"# Recipe {i}\n" + "x" * 3000 for i in range(5)}
+    with FakeGitHub(files) as github:
+        cache = ConditionalRequestCache(max_entries=16, max_bytes=12000)
+        backend = GitHubBackend(github.repo(), conditional_cache=cache)
+        for path in files:
+            backend.get_file(path)
+        stats = cache.stats()
+        assert stats["bytes"] <= 12000, stats
+        assert 0 < stats["entries"] < len(files) and stats["evictions"] > 0, stats
+        print(
+            f"✓ {stats['entries']} of {len(files)} responses kept in {stats['bytes']} bytes"
+        )
+
+        backend.get_file("recipe-4.md")
+        assert github.not_modified == 1, "the latest response is still revalidated"
+        backend.get_file("recipe-0.md")
+        assert github.not_modified == 1, "evicted responses are fetched in full"
+        print("✓ Recent responses revalidated, evicted ones fetched in full")
+
+        cache = ConditionalRequestCache(max_entries=16, max_bytes=1000)
+        GitHubBackend(github.repo(), conditional_cache=cache).get_file("recipe-0.md")
+        assert cache.stats()["entries"] == 0, "oversized responses are not stored"
+        print("✓ A response larger than the budget is not stored")
+
+
+if __name__ == "__main__":
+    try:
+        test_initialize_github_is_lazy()
+        test_contents_revalidate_with_etag()
+        test_stored_responses_are_bounded_by_bytes()
+        print("\n✅ All conditional request tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,80 @@
+"""
+Test script for the SHA-keyed content cache used by get_file_content.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+from server import ContentCache
+
+
+def test_lru_eviction_respects_byte_budget():
+    """Oldest blobs are evicted once the byte budget is exceeded"""
+    print("Testing byte budget and LRU eviction...")
+    cache = ContentCache(max_bytes=10, path_ttl=60)
+    cache.put("a.md", "sha-a", "aaaa")
+    cache.put("b.md", "sha-b", "bbbb")
+    assert cache.get_by_path("a.md") == "aaaa"  # a becomes most recently used
+    cache.put("c.md", "sha-c", "cccc")
+
+    assert cache.get_blob("sha-b") is None, "least recently used blob should be evicted"
+    assert cache.get_blob("sha-a") == "aaaa"
+    assert cache.get_blob("sha-c") == "cccc"
+    stats = cache.stats()
+    assert stats["bytes"] == 8 and stats["evictions"] == 1, stats
+    print(f"✓ Eviction works: {stats}")
+
+
+def test_oversized_content_is_not_cached():
+    """Content larger than the whole budget is never stored"""
+    cache = ContentCache(max_bytes=4, path_ttl=60)
+    cache.put("big.md", "sha-big", "too large")
+    assert cache.get_blob("sha-big") is None
+    assert cache.stats()["bytes"] == 0
+    print("✓ Oversized content skipped")
+
+
+def test_path_ttl_expiry():
+    """Path mappings older than the TTL are treated as misses"""
+    cache = ContentCache(max_bytes=1024, path_ttl=0)
+    cache.put("a.md", "sha-a", "aaaa")
+    cache._paths["a.md"] = ("sha-a", cache._paths["a.md"][1] - 1)
+    assert cache.get_by_path("a.md") is None
+    assert cache.get_blob("sha-a") == "aaaa", "blob survives path expiry"
+    print("✓ Path TTL expiry works")
+
+
+def test_get_file_content_uses_cache():
+    """Repeat reads are served without another GitHub request"""
+    print("Testing get_file_content caching...")
+    original_storage, original_cache = server.storage, server.content_cache
+    with FakeGitHub({"cookies.md": "# Cookies\n"}) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server.content_cache = ContentCache(max_bytes=1024, path_ttl=60)
+        try:
+            assert server.get_file_content("cookies.md") == "# Cookies\n"
+            assert server.get_file_content("cookies.md") == "# Cookies\n"
+            calls = github.requests["contents"]
+            assert calls == 1, f"expected 1 GitHub call, got {calls}"
+            stats = server.content_cache.stats()
+            assert stats["hits"] == 1 and stats["misses"] == 1, stats
+            print(f"✓ Second read served from cache: {stats}")
+        finally:
+            server.storage, server.content_cache = original_storage, original_cache
+
+
+if __name__ == "__main__":
+    try:
+        test_lru_eviction_respects_byte_budget()
+        test_oversized_content_is_not_cached()
+        test_path_ttl_expiry()
+        test_get_file_content_uses_cache()
+        print("\n✅ All content cache tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
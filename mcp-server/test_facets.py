@@ -0,0 +1,112 @@
+"""
+Test script for the faceted recipe filter.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from test_indexes import use_fake_github
+
+
+def recipe(title, total, difficulty, ingredients, servings=4, cuisine=None):
+    info = [
+        f"- **Total Time**: {total} minutes",
+        f"- **Servings**: {servings}",
+        f"- **Difficulty**: {difficulty}",
+    ]
+    if cuisine:
+        info.append(f"- **Cuisine**: {cuisine}")
+    lines = [f"# {title}", "", "## Information", *info, "", "## Ingredients"]
+    lines += [f"- {ingredient}" for ingredient in ingredients]
+    lines += ["", "## Instructions", "1. Cook."]
+    return "\n".join(lines) + "\n"
+
+
+FILES = {
+    "brownies.md": recipe("Brownies", 45, "Easy", ["200g dark chocolate", "2 eggs"]),
+    "cookies.md": recipe(
+        "Cookies",
+        27,
+        "Easy",
+        ["2 cups chocolate chips", "1 cup chopped nuts (walnuts or pecans)"],
+    ),
+    "truffles.md": recipe("Truffles", 20, "Easy", ["100g milk chocolate", "cream"]),
+    "mousse.md": recipe("Mousse", 25, "Hard", ["150g chocolate", "3 eggs"], 6),
+    "carbonara.md": recipe(
+        "Carbonara", 25, "Medium", ["1 lb spaghetti", "4 eggs"], cuisine="Italian"
+    ),
+    "pierogi.md": "# Pierogi\n\nNo information block.\n",
+}
+
+
+def paths(result):
+    return [r["path"] for r in result["recipes"]]
+
+
+def test_filter_intersects_facets():
+    """Time, difficulty and ingredient filters combine into one intersection"""
+    print("Testing faceted filter...")
+    with use_fake_github(FILES) as github:
+        result = server.filter_recipes(
+            max_total_minutes=30,
+            difficulty=["easy"],
+            include_ingredients=["chocolate"],
+            exclude_ingredients=["nuts"],
+        )
+        assert paths(result) == ["truffles.md"], result
+        assert result["recipes"][0]["recipe_name"] == "Truffles"
+        assert result["recipes"][0]["total_time_minutes"] == 20
+        print("✓ ≤30 min, easy, chocolate, no nuts -> truffles")
+
+        result = server.filter_recipes(include_ingredients=["chocolate"])
+        assert paths(result) == [
+            "brownies.md",
+            "cookies.md",
+            "mousse.md",
+            "truffles.md",
+        ], result
+        assert result["facets"]["difficulty"] == {"easy": 3, "hard": 1}, result
+        print("✓ Facet counts cover the matching recipes")
+
+        result = server.filter_recipes(min_servings=5)
+        assert paths(result) == ["mousse.md"], result
+        result = server.filter_recipes(cuisine=["Italian"], max_total_minutes=25)
+        assert paths(result) == ["carbonara.md"], result
+        result = server.filter_recipes(limit=2)
+        assert result["total"] == 6 and len(result["recipes"]) == 2, result
+        print("✓ Servings, cuisine and limit filters applied")
+
+        blobs = github.requests["blob"]
+        server.filter_recipes(max_total_minutes=60)
+        assert github.requests["blob"] == blobs, "filters must not fetch files"
+
+
+def test_filter_follows_repository_changes():
+    """Changed and removed recipes move between facets on the next sync"""
+    print("Testing facet updates...")
+    with use_fake_github(FILES) as github:
+        assert paths(server.filter_recipes(difficulty=["Hard"])) == ["mousse.md"]
+
+        github.files["mousse.md"] = FILES["mousse.md"].replace("Hard", "Easy")
+        del github.files["truffles.md"]
+        server.invalidate_tree_listing()
+
+        assert paths(server.filter_recipes(difficulty=["Hard"])) == []
+        result = server.filter_recipes(difficulty=["Easy"], max_total_minutes=30)
+        assert paths(result) == ["cookies.md", "mousse.md"], result
+        assert len(server.facet_index) == 5
+        print("✓ Edited recipe re-faceted and removed recipe dropped")
+
+
+if __name__ == "__main__":
+    try:
+        test_filter_intersects_facets()
+        test_filter_follows_repository_changes()
+        print("\n✅ All facet tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
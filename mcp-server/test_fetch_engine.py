@@ -0,0 +1,114 @@
+"""
+Test script for the bounded-concurrency fetch engine used by bulk reads.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+from server import FetchEngine
+
+
+def test_concurrency_cap_and_errors():
+    """No more than max_in_flight fetches run at once; errors are collected per key"""
+    print("Testing concurrency cap...")
+    engine = FetchEngine(max_in_flight=3, timeout=5)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def fetch(key):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+        if key == 7:
+            raise ValueError("broken recipe")
+        return key * 2
+
+    results, errors = engine.fetch_many(range(10), fetch)
+    assert running["peak"] == 3, running
+    assert results == {k: k * 2 for k in range(10) if k != 7}, results
+    assert isinstance(errors[7], ValueError)
+    print(f"✓ Peak concurrency {running['peak']}, {len(errors)} error collected")
+
+
+def test_slow_fetches_time_out():
+    """A fetch running past the timeout is reported instead of blocking the batch"""
+    print("Testing per-request timeout...")
+    engine = FetchEngine(max_in_flight=2, timeout=0.1)
+    release = threading.Event()
+
+    def fetch(key):
+        if key == "slow":
+            release.wait(2)
+        return key
+
+    started = time.monotonic()
+    results, errors = engine.fetch_many(["fast", "slow"], fetch)
+    release.set()
+    assert results == {"fast": "fast"}, results
+    assert isinstance(errors["slow"], TimeoutError)
+    assert time.monotonic() - started < 1, "batch should not wait for the slow fetch"
+    assert engine.stats()["timed_out"] == 1
+    print("✓ Slow fetch timed out")
+
+
+def test_cold_index_sync_fetches_concurrently():
+    """A cold index sync overlaps GitHub round trips instead of paying them serially"""
+    print("Testing concurrent cold sync...")
+    files = {f"recipes/r{i:02}.md": f"# Recipe {i}\n" for i in range(20)}
+    original_engine = server.fetch_engine
+    with FakeGitHub(files, latency=0.05) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server.fetch_engine = FetchEngine(max_in_flight=10, timeout=5)
+        server.content_cache.clear()
+        server._tree_listing = None
+        server.reset_recipe_indexes()
+        try:
+            started = time.monotonic()
+            results = server.search_recipes("recipe")
+            elapsed = time.monotonic() - started
+            assert len(results) == 20 and github.requests["blob"] == 20
+            assert elapsed < 20 * 0.05, f"sync took {elapsed:.2f}s"
+            print(f"✓ Synced 20 recipes in {elapsed:.2f}s (serial would be ≥ 1.00s)")
+        finally:
+            server.storage = None
+            server.fetch_engine = original_engine
+
+
+def test_get_recipes_batch():
+    """get_recipes serves cached paths directly and fetches the rest in one batch"""
+    print("Testing get_recipes batch tool...")
+    files = {"soup.md": "# Soup\n", "pie.md": "# Pie\n", "stew.md": "# Stew\n"}
+    with FakeGitHub(files) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server.content_cache.clear()
+        try:
+            server.get_recipe("soup.md")
+            result = server.get_recipes(["pie.md", "soup.md", "missing.md", "stew.md"])
+            assert [r["name"] for r in result["recipes"]] == ["Pie", "Soup", "Stew"]
+            assert list(result["errors"]) == ["missing.md"], result["errors"]
+            assert github.requests["contents"] == 4, github.requests
+            print("✓ One cached recipe, two fetched, one per-path error")
+        finally:
+            server.storage = None
+
+
+if __name__ == "__main__":
+    try:
+        test_concurrency_cap_and_errors()
+        test_slow_fetches_time_out()
+        test_cold_index_sync_fetches_concurrently()
+        test_get_recipes_batch()
+        print("\n✅ All fetch engine tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,205 @@
+"""
+Test script for the in-memory recipe indexes and their incremental sync.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+
+SAMPLE_FILES = {
+    "desserts/cookies.md": "# Classic Chocolate Chip Cookies\n\n## Ingredients\n- flour\n",
+    "pasta/carbonara.md": "# Classic Spaghetti Carbonara\n\n## Ingredients\n- eggs\n",
+    "notes.md": "No header here\n",
+}
+
+
+@contextmanager
+def use_fake_github(files):
+    """Point the server at a stub GitHub repository with empty caches and indexes"""
+    with FakeGitHub(files) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server.content_cache.clear()
+        server._tree_listing = None
+        server.reset_recipe_indexes()
+        try:
+            yield github
+        finally:
+            server.storage = None
+
+
+def test_search_uses_name_index():
+    """Searches are answered from the index without re-downloading files"""
+    print("Testing name index search...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        results = server.search_recipes("classic")
+        assert [r["recipe_name"] for r in results] == [
+            "Classic Chocolate Chip Cookies",
+            "Classic Spaghetti Carbonara",
+        ], results
+        assert github.requests["blob"] == 3, github.requests
+        print(f"✓ Initial sync fetched {github.requests['blob']} blobs")
+
+        results = server.search_recipes("CARBONARA")
+        assert [r["path"] for r in results] == ["pasta/carbonara.md"]
+        assert github.requests["blob"] == 3, "repeat search must not fetch blobs"
+        print("✓ Repeat search served from memory")
+
+
+def test_sync_fetches_only_changed_blobs():
+    """Only added or modified recipes are fetched when the tree changes"""
+    print("Testing incremental index sync...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        server.search_recipes("classic")
+        calls_before = github.requests["blob"]
+
+        github.files["desserts/brownies.md"] = "# Fudgy Brownies\n"
+        del github.files["pasta/carbonara.md"]
+        server.invalidate_tree_listing()
+
+        assert [r["path"] for r in server.search_recipes("brownies")] == [
+            "desserts/brownies.md"
+        ]
+        assert server.search_recipes("carbonara") == []
+        assert github.requests["blob"] == calls_before + 1, github.requests
+        print("✓ Only the new blob was fetched and the removed recipe was dropped")
+
+
+def test_fulltext_search_ranks_by_bm25():
+    """Body text is searchable and the best match is ranked first"""
+    print("Testing full-text BM25 search...")
+    blobs = {
+        "sha-1": "# Leek Soup\n\n- 3 leeks\n- leek greens\n",
+        "sha-2": "# Quiche\n\n- 1 leek\n- eggs\n- cream\n",
+        "sha-3": "# Cookies\n\n- flour\n- sugar\n",
+        "sha-4": "# Quiche\n\n- eggs\n- cream\n",
+    }
+    index = server.FullTextIndex(load_content=lambda path, sha: blobs[sha])
+    index.upsert("leek-soup.md", "sha-1", blobs["sha-1"])
+    index.upsert("quiche.md", "sha-2", blobs["sha-2"])
+    index.upsert("cookies.md", "sha-3", blobs["sha-3"])
+
+    results = index.search("leek")
+    assert [r["path"] for r in results] == ["leek-soup.md", "quiche.md"], results
+    assert results[1]["snippet"] == "- 1 leek", results[1]
+    print(f"✓ Ranked results: {[(r['path'], r['score']) for r in results]}")
+
+    index.upsert("quiche.md", "sha-4", blobs["sha-4"])
+    index.remove("leek-soup.md")
+    assert index.search("leek") == []
+    assert [r["path"] for r in index.search("cream")] == ["quiche.md"]
+    print("✓ Incremental updates and removals are reflected")
+
+
+def test_search_recipe_text_tool():
+    """The MCP tool syncs the index and returns names with results"""
+    with use_fake_github(SAMPLE_FILES) as github:
+        results = server.search_recipe_text("eggs")
+        assert [r["recipe_name"] for r in results] == ["Classic Spaghetti Carbonara"]
+        assert results[0]["snippet"] == "- eggs", results
+        print("✓ search_recipe_text found the carbonara by ingredient")
+
+        # The index holds no recipe text; evicted snippets are fetched by SHA
+        server.content_cache.clear()
+        blobs_before = github.requests["blob"]
+        results = server.search_recipe_text("eggs")
+        assert results[0]["snippet"] == "- eggs", results
+        assert github.requests["blob"] == blobs_before + 1, github.requests
+        assert not hasattr(server.fulltext_index, "_documents")
+        print("✓ Snippet of an evicted recipe re-read by blob SHA")
+
+
+def test_unparseable_recipe_is_skipped():
+    """A recipe the indexes choke on is left out without breaking the others"""
+    print("Testing index isolation of a broken recipe...")
+    parse_recipe = server.parse_recipe
+
+    def parse_or_fail(content):
+        if "BROKEN" in content:
+            raise ZeroDivisionError("division by zero")
+        return parse_recipe(content)
+
+    files = dict(SAMPLE_FILES, **{"soups/broken.md": "# Broken Soup\nBROKEN\n"})
+    server.parse_recipe = parse_or_fail
+    try:
+        with use_fake_github(files) as github:
+            assert [r["path"] for r in server.search_recipes("classic")] == [
+                "desserts/cookies.md",
+                "pasta/carbonara.md",
+            ]
+            assert server.search_recipes("broken") == []
+            assert server.search_recipe_text("eggs")[0]["path"] == "pasta/carbonara.md"
+            filtered = [r["path"] for r in server.filter_recipes()["recipes"]]
+            assert "soups/broken.md" not in filtered and len(filtered) == 3, filtered
+            print("✓ Searches and filters skip the broken recipe")
+
+            blobs_before = github.requests["blob"]
+            server.invalidate_tree_listing()
+            server.search_recipes("classic")
+            assert (
+                github.requests["blob"] == blobs_before
+            ), "not retried until it changes"
+            print("✓ Broken recipe not re-fetched on every sync")
+
+            result = server.create_recipe("Broken Stew", "# Broken Stew\nBROKEN\n")
+            assert result["success"], result
+            assert "broken-stew.md" in github.files, "the write itself succeeded"
+            print("✓ Indexing failure after a write still reports success")
+    finally:
+        server.parse_recipe = parse_recipe
+
+
+def test_trigram_search_folds_diacritics_and_typos():
+    """Unaccented and misspelled queries find Polish recipe names"""
+    print("Testing trigram name search...")
+    assert server.fold_text("Żurek Śląski z Łososiem") == "zurek slaski z lososiem"
+
+    files = {
+        "zupy/zurek.md": "# Żurek śląski\n",
+        "pierogi.md": "# Pierogi ruskie\n",
+        "pasta/carbonara.md": "# Spaghetti Carbonara\n",
+        "pasta/carbonara-light.md": "# Carbonara light\n",
+    }
+    with use_fake_github(files):
+        assert [r["path"] for r in server.search_recipes("zurek")] == ["zupy/zurek.md"]
+        assert [r["path"] for r in server.search_recipes("ŻUREK")] == ["zupy/zurek.md"]
+        print("✓ Diacritics and case folded")
+
+        results = server.search_recipes("pirogi")
+        assert [r["recipe_name"] for r in results] == ["Pierogi ruskie"], results
+        assert 0.5 <= results[0]["score"] < 1.0
+        results = server.search_recipes("spagetti carbonra")
+        assert results[0]["path"] == "pasta/carbonara.md", results
+        print("✓ Typos matched by trigram similarity")
+
+        results = server.search_recipes("carbonara")
+        assert [r["score"] for r in results] == [1.0, 1.0], results
+        assert server.search_recipes("sernik") == []
+        print("✓ Exact matches score 1.0 and unrelated names are left out")
+
+    index = server.TrigramNameIndex()
+    index.upsert("a.md", "sha-1", "# Bigos\n")
+    index.upsert("a.md", "sha-2", "# Gulasz\n")
+    assert index.search("bigos") == {}
+    index.remove("a.md")
+    assert index.search("gulasz") == {} and not index._postings
+    print("✓ Re-indexed and removed names leave no stale trigrams")
+
+
+if __name__ == "__main__":
+    try:
+        test_search_uses_name_index()
+        test_sync_fetches_only_changed_blobs()
+        test_fulltext_search_ranks_by_bm25()
+        test_search_recipe_text_tool()
+        test_trigram_search_folds_diacritics_and_typos()
+        test_unparseable_recipe_is_skipped()
+        print("\n✅ All index tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
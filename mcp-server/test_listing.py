@@ -0,0 +1,123 @@
+"""
+Test script for the recursive Git tree recipe listing.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+
+FILES = {
+    "desserts/cookies.md": "# Cookies\n",
+    "desserts/cakes/cheesecake.md": "# Cheesecake\n",
+    "pasta/carbonara.md": "# Carbonara\n",
+    "README.txt": "Not a recipe\n",
+}
+
+
+def test_listing_from_recursive_tree():
+    """All nested recipes come back from one tree fetch, filtered by path"""
+    print("Testing recursive tree listing...")
+    original_storage = server.storage
+    with FakeGitHub(FILES) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server._tree_listing = None
+        try:
+            paths = [r["path"] for r in server.list_recipes_in_path("")]
+            assert paths == [
+                "desserts/cakes/cheesecake.md",
+                "desserts/cookies.md",
+                "pasta/carbonara.md",
+            ], paths
+            print(f"✓ Listed {len(paths)} recipes")
+
+            desserts = [r["path"] for r in server.list_recipes_in_path("desserts")]
+            assert desserts == ["desserts/cakes/cheesecake.md", "desserts/cookies.md"]
+            assert github.requests["tree"] == 1, "unchanged tree should be reused"
+            assert github.requests["contents"] == 0, "no per-directory requests"
+            print("✓ Listing memoized while the root tree SHA is unchanged")
+
+            github.files["pasta/lasagne.md"] = "# Lasagne\n"
+            server.list_recipes_in_path("")
+            assert (
+                github.requests["tree"] == 1
+            ), "head is only re-checked after the interval"
+            server.invalidate_tree_listing()
+            paths = [r["path"] for r in server.list_recipes_in_path("pasta")]
+            assert paths == ["pasta/carbonara.md", "pasta/lasagne.md"], paths
+            assert (
+                github.requests["tree"] == 2
+            ), "moved branch head should refetch the tree"
+            print("✓ Listing refetched after the branch head moved")
+        finally:
+            server.storage = original_storage
+            server._tree_listing = None
+
+
+def test_paginated_listing():
+    """Pages walk the listing in path order and survive concurrent inserts"""
+    print("Testing paginated listing...")
+    original_storage = server.storage
+    files = {f"recipes/{i:03d}.md": f"# Recipe {i}\n" for i in range(25)}
+    files["desserts/cookies.md"] = "# Cookies\n"
+    with FakeGitHub(files) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server._tree_listing = None
+        try:
+            page = server.list_recipes(limit=10)
+            assert page["total"] == 26, page["total"]
+            assert [r["path"] for r in page["recipes"]][:2] == [
+                "desserts/cookies.md",
+                "recipes/000.md",
+            ]
+
+            seen = [r["path"] for r in page["recipes"]]
+            while page["next_cursor"]:
+                page = server.list_recipes(limit=10, cursor=page["next_cursor"])
+                seen.extend(r["path"] for r in page["recipes"])
+            assert seen == sorted(files), seen
+            print("✓ Three pages cover every recipe once, in path order")
+
+            page = server.list_recipes(limit=5, prefix="recipes/")
+            assert page["total"] == 25
+            # A recipe added before the cursor does not shift the next page
+            github.files["recipes/000a.md"] = "# Inserted\n"
+            server.invalidate_tree_listing()
+            page = server.list_recipes(
+                limit=5, cursor=page["next_cursor"], prefix="recipes/"
+            )
+            assert page["recipes"][0]["path"] == "recipes/005.md", page["recipes"][0]
+            assert page["total"] == 26
+            print("✓ Prefix filter and cursor are stable across inserts")
+
+            text = server.get_recipe_list()
+            assert text.startswith("# Available Recipes (27 total)"), text[:40]
+            assert "More recipes" not in text
+            original_page_size = server.LIST_RESOURCE_PAGE_SIZE
+            server.LIST_RESOURCE_PAGE_SIZE = 20
+            try:
+                first = server.get_recipe_list()
+                cursor = first.rsplit("recipe://list/", 1)[1].strip()
+                second = server.get_recipe_list_page(cursor)
+                assert first.count("\n- ") + second.count("\n- ") == 27
+                assert "More recipes" not in second
+            finally:
+                server.LIST_RESOURCE_PAGE_SIZE = original_page_size
+            print("✓ recipe://list is served in bounded pages")
+        finally:
+            server.storage = original_storage
+            server._tree_listing = None
+
+
+if __name__ == "__main__":
+    try:
+        test_listing_from_recursive_tree()
+        test_paginated_listing()
+        print("\n✅ All listing tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
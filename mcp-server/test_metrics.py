@@ -0,0 +1,131 @@
+"""
+Test script for the Prometheus metrics endpoint.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.requests import Request
+
+import server
+from fake_github import FakeGitHub
+from server import GitHubScheduler, Metrics, github_endpoint
+
+FILES = {"soup.md": "# Tomato Soup\n", "pie.md": "# Leek Pie\n"}
+
+
+def scrape():
+    """Call the metrics route like Starlette would and return its text"""
+    scope = {"type": "http", "method": "GET", "path": "/metrics", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    response = asyncio.run(server.prometheus_metrics(Request(scope, receive)))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.body.decode("utf-8")
+
+
+def sample(text, line_start):
+    """Return the value of the sample line starting with line_start"""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample {line_start} in:\n{text}")
+
+
+def test_histogram_rendering():
+    """Histograms render cumulative buckets, sum and count"""
+    print("Testing Prometheus rendering...")
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.declare("demo_seconds", "histogram", "Demo latency")
+    metrics.declare("demo_total", "counter", "Demo calls")
+    for seconds in (0.05, 0.5, 0.7, 3.0):
+        metrics.observe("demo_seconds", seconds, {"tool": "a"})
+    metrics.inc("demo_total", {"tool": 'say "hi"'}, 2)
+
+    text = metrics.render([("demo_gauge", "gauge", "Demo gauge", [({}, 7)])])
+    assert "# TYPE demo_seconds histogram" in text
+    assert sample(text, 'demo_seconds_bucket{tool="a",le="0.1"}') == 1
+    assert sample(text, 'demo_seconds_bucket{tool="a",le="1"}') == 3
+    assert sample(text, 'demo_seconds_bucket{tool="a",le="+Inf"}') == 4
+    assert sample(text, 'demo_seconds_count{tool="a"}') == 4
+    assert abs(sample(text, 'demo_seconds_sum{tool="a"}') - 4.25) < 1e-9
+    assert sample(text, 'demo_total{tool="say \\"hi\\""}') == 2
+    assert sample(text, "demo_gauge") == 7
+    print("✓ Buckets are cumulative and label values are escaped")
+
+    assert github_endpoint("/repos/o/r/contents/soup.md") == "contents"
+    assert github_endpoint("https://api.github.com/repos/o/r/git/trees/abc") == (
+        "git/trees"
+    )
+    assert github_endpoint("/repos/o/r") == "repo"
+    assert github_endpoint("/rate_limit") == "rate_limit"
+    print("✓ GitHub URLs are reduced to endpoint names")
+
+
+def test_tool_and_github_metrics():
+    """Tool calls and the GitHub requests they make show up on /metrics"""
+    print("Testing tool and GitHub metrics...")
+    original_storage = server.storage
+    with FakeGitHub(FILES) as github:
+        repo = github.repo()
+        GitHubScheduler(100, 10, 0, 0, 5).install(repo.requester)
+        server.storage = server.GitHubBackend(repo)
+        server.content_cache.clear()
+        server._tree_listing = None
+        try:
+            before = scrape()
+            calls = 'recipe_mcp_tool_calls_total{tool="get_recipe"}'
+            errors = 'recipe_mcp_tool_errors_total{tool="update_recipe"}'
+            contents = (
+                'recipe_mcp_github_requests_total{endpoint="contents",'
+                'method="GET",status="200"}'
+            )
+            calls_before = sample(before, calls) if calls in before else 0
+            errors_before = sample(before, errors) if errors in before else 0
+
+            server.get_recipe("soup.md")
+            server.get_recipe("soup.md")
+            result = server.update_recipe("missing.md", "# Nothing\n")
+            assert result["success"] is False, result
+
+            text = scrape()
+            assert sample(text, calls) == calls_before + 2
+            assert sample(text, errors) == errors_before + 1
+            assert sample(text, contents) >= 1
+            assert (
+                sample(
+                    text,
+                    "recipe_mcp_github_request_duration_seconds_count"
+                    '{endpoint="contents"}',
+                )
+                >= 1
+            )
+            assert sample(text, 'recipe_mcp_tools_in_flight{tool="get_recipe"}') == 0
+            assert sample(text, "recipe_mcp_github_in_flight") == 0
+            print("✓ Tool calls, errors and GitHub requests are counted")
+
+            ratio = sample(text, 'recipe_mcp_cache_hit_ratio{cache="content"}')
+            assert 0 < ratio <= 1, ratio
+            assert "recipe_mcp_fetch_in_flight 0" in text
+            assert "recipe_mcp_single_flight_in_flight 0" in text
+            print(f"✓ Content cache hit ratio reported: {ratio:.2f}")
+        finally:
+            server.storage = original_storage
+            server._tree_listing = None
+
+
+if __name__ == "__main__":
+    try:
+        test_histogram_rendering()
+        test_tool_and_github_metrics()
+        print("\n✅ All metrics tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,123 @@
+"""
+Test script for optimistic-concurrency recipe updates.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import blob_sha
+from github import GithubException
+from test_indexes import SAMPLE_FILES, use_fake_github
+
+PATH = "pasta/carbonara.md"
+
+
+def test_update_uses_known_sha():
+    """An update of a recipe that was already read takes a single request"""
+    print("Testing single round-trip updates...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        recipe = server.get_recipe(PATH)
+        assert recipe["sha"] == blob_sha(SAMPLE_FILES[PATH]), recipe
+        reads = github.requests["contents"]
+
+        result = server.update_recipe(PATH, "# Carbonara\n\nv2\n")
+        assert result["success"], result
+        assert result["blob_sha"] == blob_sha("# Carbonara\n\nv2\n"), result
+        assert github.requests["contents"] == reads, github.requests
+        assert github.requests["contents_put"] == 1, github.requests
+        print("✓ Update sent one PUT and no read")
+
+        result = server.update_recipe(PATH, "# Carbonara\n\nv3\n")
+        assert result["success"] and github.requests["contents"] == reads
+        assert github.files[PATH] == "# Carbonara\n\nv3\n"
+        print("✓ Chained update used the SHA of the previous write")
+
+
+def test_stale_cache_is_retried():
+    """Without a caller SHA, a stale cached SHA is refreshed and retried once"""
+    print("Testing retry after a stale cached SHA...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        server.get_recipe(PATH)
+        github.files[PATH] = "# Carbonara\n\nchanged on GitHub\n"
+        github.commits += 1
+
+        result = server.update_recipe(PATH, "# Carbonara\n\nmine\n")
+        assert result["success"], result
+        assert github.requests["contents_put"] == 2, github.requests
+        assert github.files[PATH] == "# Carbonara\n\nmine\n"
+        print("✓ Conflict on the cached SHA was re-read and retried")
+
+
+def test_caller_sha_conflict():
+    """A caller-supplied SHA that is no longer current returns a conflict"""
+    print("Testing conflicts on a caller SHA...")
+    with use_fake_github(SAMPLE_FILES) as github:
+        base = server.get_recipe(PATH)["sha"]
+        theirs = "# Carbonara\n\nedited elsewhere\n"
+        github.files[PATH] = theirs
+        github.commits += 1
+
+        result = server.update_recipe(PATH, "# Carbonara\n\nmine\n", sha=base)
+        assert result["success"] is False and result["conflict"] is True, result
+        assert result["expected_sha"] == base
+        assert result["current_sha"] == blob_sha(theirs)
+        assert result["current_content"] == theirs
+        assert github.files[PATH] == theirs, "a conflicting update must not land"
+        print("✓ Conflict returned with the current content, nothing written")
+
+        result = server.update_recipe(
+            PATH, "# Carbonara\n\nmerged\n", sha=result["current_sha"]
+        )
+        assert result["success"], result
+        assert github.files[PATH] == "# Carbonara\n\nmerged\n"
+        print("✓ Retry with current_sha succeeded")
+
+
+def test_only_sha_mismatches_are_conflicts():
+    """GitHub validation errors are not mistaken for concurrent edits"""
+    print("Testing conflict detection...")
+
+    class Repo:
+        def __init__(self, error):
+            self.error = error
+
+        def update_file(self, **kwargs):
+            raise self.error
+
+    def update_with(status, message):
+        error = GithubException(status, {"message": message}, None)
+        server.GitHubBackend(Repo(error)).update_file(PATH, "x", "m", "abc")
+
+    for status, message in [
+        (409, "pasta/carbonara.md is at def but expected abc"),
+        (422, "pasta/carbonara.md does not match abc"),
+    ]:
+        try:
+            update_with(status, message)
+            raise AssertionError(f"{status} must be a conflict")
+        except server.WriteConflictError:
+            pass
+    try:
+        update_with(
+            422, "Invalid request.\n\nFor 'properties/content', nil is not a string."
+        )
+        raise AssertionError("validation errors must be raised as they are")
+    except GithubException as e:
+        assert e.status == 422
+    print("✓ 409 and SHA mismatches are conflicts, other 422s are not")
+
+
+if __name__ == "__main__":
+    try:
+        test_update_uses_known_sha()
+        test_stale_cache_is_retried()
+        test_caller_sha_conflict()
+        test_only_sha_mismatches_are_conflicts()
+        print("\n✅ All optimistic update tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,185 @@
+"""
+Test script for the structured recipe parser and get_recipe_structured.
+Parses the sample recipes and a Polish recipe, and serves them from a local
+stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from test_indexes import use_fake_github
+
+SAMPLE_RECIPES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample-recipes"
+)
+
+POLISH_RECIPE = """# Pierogi ruskie
+
+Tradycyjne pierogi z ziemniakami i twarogiem.
+
+## Informacje
+- **Czas przygotowania**: 1 godz 15 minut
+- **Czas gotowania**: 5 minut
+- **Porcje**: 6-8
+- **Poziom trudności**: Średni
+
+## Składniki
+
+### Ciasto
+- 3 szklanki mąki
+- ½ łyżeczki soli
+- 250 ml ciepłej wody
+
+### Farsz
+- 0,5 kg ziemniaków
+- Pieprz do smaku
+
+## Sposób przygotowania
+
+1. Zagnieć ciasto
+   i odstaw na 30 minut.
+2. Przygotuj farsz.
+"""
+
+
+def read_sample(name):
+    with open(os.path.join(SAMPLE_RECIPES_PATH, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_sample_recipes():
+    """The sample recipes parse into times, servings, ingredients and steps"""
+    print("Testing parser on sample recipes...")
+    cookies = server.parse_recipe(read_sample("chocolate-chip-cookies.md"))
+    assert cookies["title"] == "Classic Chocolate Chip Cookies"
+    assert cookies["prep_time_minutes"] == 15
+    assert cookies["cook_time_minutes"] == 12, "ranges count as their upper bound"
+    assert cookies["total_time_minutes"] == 27
+    assert cookies["servings"] == 48
+    assert cookies["difficulty"] == "Easy"
+    flour = cookies["ingredients"][0]
+    assert flour["section"] == "Dry Ingredients"
+    assert (flour["quantity"], flour["unit"], flour["item"]) == (
+        2.25,
+        "cup",
+        "all-purpose flour",
+    ), flour
+    assert len(cookies["ingredients"]) == 10
+    assert len(cookies["steps"]) == 9
+    assert cookies["steps"][0] == "Preheat oven to 375°F (190°C)."
+    print("✓ Chocolate chip cookies parsed")
+
+    carbonara = server.parse_recipe(read_sample("spaghetti-carbonara.md"))
+    assert carbonara["servings"] == 4
+    assert carbonara["cuisine"] == "Italian"
+    assert carbonara["description"].startswith("An authentic Italian pasta dish")
+    pepper = [i for i in carbonara["ingredients"] if "pepper" in i["item"]][0]
+    assert pepper["quantity"] is None and pepper["unit"] is None
+    assert len(carbonara["steps"]) == 8
+    print("✓ Spaghetti carbonara parsed")
+
+
+def test_parse_polish_recipe():
+    """Polish headings, labels, units and decimal commas are understood"""
+    print("Testing parser on a Polish recipe...")
+    recipe = server.parse_recipe(POLISH_RECIPE)
+    assert recipe["prep_time_minutes"] == 75
+    assert recipe["cook_time_minutes"] == 5
+    assert recipe["total_time_minutes"] is None
+    assert recipe["servings"] == 6
+    assert recipe["difficulty"] == "Średni"
+    units = [(i["quantity"], i["unit"]) for i in recipe["ingredients"]]
+    assert units == [
+        (3, "szklanka"),
+        (0.5, "łyżeczka"),
+        (250, "ml"),
+        (0.5, "kg"),
+        (None, None),
+    ], units
+    assert recipe["ingredients"][3]["section"] == "Farsz"
+    assert recipe["steps"] == [
+        "Zagnieć ciasto i odstaw na 30 minut.",
+        "Przygotuj farsz.",
+    ]
+    print("✓ Pierogi ruskie parsed")
+
+
+def test_zero_denominator_is_not_a_quantity():
+    """A fraction over zero leaves the quantity unparsed instead of raising"""
+    print("Testing zero denominators...")
+    for line in ("1/0 cup sugar", "2 3/0 cups flour"):
+        ingredient = server.parse_ingredient(line)
+        assert ingredient["quantity"] is None, ingredient
+        assert ingredient["item"] == line, ingredient
+    recipe = server.parse_recipe(
+        "# Broken\n\n## Ingredients\n- 1/0 cup sugar\n- 2 eggs\n"
+    )
+    assert [i["quantity"] for i in recipe["ingredients"]] == [None, 2], recipe
+    print("✓ Zero denominators give quantity None")
+
+
+def test_get_recipe_structured_memoizes_by_sha():
+    """Parsing happens once per blob and callers can ask for a subset of fields"""
+    print("Testing get_recipe_structured...")
+    files = {
+        "cookies.md": read_sample("chocolate-chip-cookies.md"),
+        "copy-of-cookies.md": read_sample("chocolate-chip-cookies.md"),
+    }
+    with use_fake_github(files):
+        server.parsed_recipes.clear()
+        misses = server.parsed_recipes.misses
+        result = server.get_recipe_structured("cookies.md", ["servings", "steps"])
+        assert set(result) == {"path", "servings", "steps"}, result
+        assert result["servings"] == 48
+
+        full = server.get_recipe_structured("copy-of-cookies.md")
+        assert set(full) == {"path", *server.STRUCTURED_FIELDS}
+        assert server.parsed_recipes.misses - misses == 1, "same blob parsed twice"
+        print("✓ Identical blobs parsed once, fields filtered")
+
+        try:
+            server.get_recipe_structured("cookies.md", ["calories"])
+            raise AssertionError("unknown fields must be rejected")
+        except ValueError:
+            print("✓ Unknown fields rejected")
+
+
+def test_get_recipe_structured_keys_parse_by_content_read():
+    """A path moving to a newer blob mid-call does not file the old parse under it"""
+    print("Testing get_recipe_structured during a concurrent update...")
+    old, new = "# Old Soup\n", "# New Soup\n"
+    new_sha = server.git_blob_sha(new.encode("utf-8"))
+    with use_fake_github({"soup.md": old}):
+        server.parsed_recipes.clear()
+        read = server.get_file_content
+
+        def read_then_update(path):
+            content = read(path)
+            # A webhook or listing refresh lands between the read and the parse
+            server.content_cache.put(path, new_sha, new)
+            return content
+
+        server.get_file_content = read_then_update
+        try:
+            result = server.get_recipe_structured("soup.md", ["title"])
+        finally:
+            server.get_file_content = read
+        assert result["title"] == "Old Soup", result
+        assert server.parsed_recipes.get(new_sha, new)["title"] == "New Soup"
+        print("✓ Parse memoized under the SHA of the content actually read")
+
+
+if __name__ == "__main__":
+    try:
+        test_parse_sample_recipes()
+        test_parse_polish_recipe()
+        test_zero_denominator_is_not_a_quantity()
+        test_get_recipe_structured_memoizes_by_sha()
+        test_get_recipe_structured_keys_parse_by_content_read()
+        print("\n✅ All recipe parser tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,169 @@
+"""
+Test script for the rate-limit-aware GitHub request scheduler.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from github import RateLimitExceededException
+
+import server
+from fake_github import FakeGitHub
+from server import BACKGROUND, INTERACTIVE, GitHubScheduler, background_priority
+
+FILES = {"soup.md": "# Tomato Soup\n", "pie.md": "# Leek Pie\n"}
+
+
+def scheduled_backend(github, **options):
+    """A GitHub backend whose requests all pass through a fresh scheduler"""
+    settings = dict(
+        requests_per_second=100,
+        burst=10,
+        background_reserve=0,
+        max_retries=3,
+        max_wait=5,
+    )
+    settings.update(options)
+    scheduler = GitHubScheduler(**settings)
+    repo = github.repo()
+    scheduler.install(repo.requester)
+    return server.GitHubBackend(repo), scheduler
+
+
+def test_budget_tracked_from_headers():
+    """The remaining budget follows the X-RateLimit headers of each response"""
+    print("Testing budget tracking...")
+    with FakeGitHub(FILES, rate_limit=100) as github:
+        backend, scheduler = scheduled_backend(github)
+        assert scheduler.stats()["remaining"] is None
+        backend.get_file("soup.md")
+        backend.get_file("pie.md")
+        stats = scheduler.stats()
+        assert stats["limit"] == 100, stats
+        assert stats["remaining"] == github.rate_remaining, stats
+        assert stats["requests"] == 2, stats
+        assert 3500 < stats["resets_in"] <= 3600, stats
+        print(f"✓ Budget reported: {stats['remaining']}/{stats['limit']}")
+
+
+def test_retry_after_and_server_errors_are_retried():
+    """Secondary limits wait for Retry-After and 5xx reads back off and retry"""
+    print("Testing retries...")
+    with FakeGitHub(FILES) as github:
+        backend, scheduler = scheduled_backend(github)
+        github.failures.append(
+            (403, {"Retry-After": "0.3"}, {"message": "secondary rate limit"})
+        )
+        started = time.monotonic()
+        assert backend.get_file("soup.md")[1] == "# Tomato Soup\n"
+        assert time.monotonic() - started >= 0.3
+        assert scheduler.rate_limited == 1 and scheduler.retries == 1
+        print("✓ Retry-After honoured before retrying")
+
+        github.failures.append((502, {}, {"message": "Bad Gateway"}))
+        github.failures.append((503, {}, {"message": "Unavailable"}))
+        assert backend.get_file("pie.md")[1] == "# Leek Pie\n"
+        assert scheduler.retries == 3, scheduler.stats()
+        print("✓ Transient server errors retried with backoff")
+
+
+def test_exhausted_budget_fails_fast():
+    """Once the hourly budget is gone tool calls fail fast instead of hanging"""
+    print("Testing exhausted budget...")
+    with FakeGitHub(FILES, rate_limit=3) as github:
+        backend, scheduler = scheduled_backend(github)
+        backend.get_file("soup.md")
+        backend.get_file("pie.md")
+        try:
+            backend.get_file("soup.md")
+            raise AssertionError("the exhausted budget must raise")
+        except RateLimitExceededException:
+            pass
+        assert scheduler.stats()["remaining"] == 0
+        assert scheduler.stats()["blocked_for"] > 3000
+
+        sent = sum(github.requests.values())
+        started = time.monotonic()
+        try:
+            backend.get_file("pie.md")
+            raise AssertionError("blocked requests must raise")
+        except RateLimitExceededException as e:
+            assert "resume in" in str(e), e
+        assert sum(github.requests.values()) == sent, "nothing may reach GitHub"
+        assert time.monotonic() - started < 1
+        print("✓ Requests refused locally until the limit resets")
+
+
+def test_background_yields_to_interactive():
+    """Background requests wait for interactive ones and for budget above the reserve"""
+    print("Testing priorities...")
+    scheduler = GitHubScheduler(20, 1, 100, 0, 5)
+    order = []
+
+    def request(name, priority):
+        def send():
+            order.append(name)
+            return 200, {}, ""
+
+        if priority == BACKGROUND:
+            with background_priority():
+                scheduler.call("GET", send)
+        else:
+            scheduler.call("GET", send)
+
+    request("warm-up", INTERACTIVE)
+    background = threading.Thread(target=request, args=("background", BACKGROUND))
+    background.start()
+    time.sleep(0.01)
+    request("interactive", INTERACTIVE)
+    background.join(timeout=5)
+    assert order == ["warm-up", "interactive", "background"], order
+    print("✓ Interactive request overtook a waiting background request")
+
+    reset = str(time.time() + 3600)
+    scheduler._observe(
+        "GET", 200, {"x-ratelimit-remaining": "50", "x-ratelimit-reset": reset}, "", 1
+    )
+    background = threading.Thread(target=request, args=("late", BACKGROUND))
+    background.start()
+    background.join(timeout=0.5)
+    assert background.is_alive(), "background work must pause below the reserve"
+    request("tool", INTERACTIVE)
+    scheduler._observe(
+        "GET", 200, {"x-ratelimit-remaining": "4000", "x-ratelimit-reset": reset}, "", 1
+    )
+    background.join(timeout=5)
+    assert order[-2:] == ["tool", "late"], order
+    print("✓ Background work paused while the budget was below the reserve")
+
+
+def test_priority_reaches_fetch_workers():
+    """Bulk fetches run with the priority of the code that started them"""
+    with background_priority():
+        results, _ = server.fetch_engine.fetch_many(
+            range(4), lambda key: server._github_priority.get()
+        )
+    assert set(results.values()) == {BACKGROUND}, results
+    results, _ = server.fetch_engine.fetch_many(
+        range(4), lambda key: server._github_priority.get()
+    )
+    assert set(results.values()) == {INTERACTIVE}, results
+    print("✓ Fetch workers inherit the caller's priority")
+
+
+if __name__ == "__main__":
+    try:
+        test_budget_tracked_from_headers()
+        test_retry_after_and_server_errors_are_retried()
+        test_exhausted_budget_fails_fast()
+        test_background_yields_to_interactive()
+        test_priority_reaches_fetch_workers()
+        print("\n✅ All scheduler tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -1,12 +1,14 @@
 """
 Simple test script to verify MCP server functionality
 """
+
 import sys
 import os
 
 # Test 1: Import FastMCP
 try:
     from fastmcp import FastMCP
+
     print("✓ FastMCP module imported successfully")
 except ImportError as e:
     print(f"✗ Failed to import FastMCP: {e}")
@@ -15,6 +17,7 @@ except ImportError as e:
 # Test 2: Import PyGithub
 try:
     from github import Github
+
     print("✓ PyGithub module imported successfully")
 except ImportError as e:
     print(f"✗ Failed to import PyGithub: {e}")
@@ -23,13 +26,14 @@ except ImportError as e:
 # Test 3: Verify server module structure
 try:
     import importlib.util
+
     spec = importlib.util.spec_from_file_location("server", "server.py")
     server_module = importlib.util.module_from_spec(spec)
-    
+
     # Mock the environment to avoid errors during module execution
     os.environ.setdefault("GITHUB_TOKEN", "test_token")
     os.environ.setdefault("GITHUB_REPO", "test/repo")
-    
+
     # Execute the module to catch any syntax or import errors
     spec.loader.exec_module(server_module)
     print("✓ Server module structure is valid and all imports work")
@@ -55,7 +59,17 @@ for var in required_vars:
         print(f"  ⚠ {var}: Not set (required for server to run)")
 
 # Test 5: Optional environment variables
-optional_vars = ["RECIPES_PATH", "MCP_HOST", "MCP_PORT", "MCP_PATH"]
+optional_vars = [
+    "RECIPES_PATH",
+    "GITHUB_BRANCH",
+    "STORAGE_BACKEND",
+    "LOCAL_REPO_PATH",
+    "GITHUB_WEBHOOK_SECRET",
+    "SNAPSHOT_PATH",
+    "MCP_HOST",
+    "MCP_PORT",
+    "MCP_PATH",
+]
 print("\nOptional environment variables:")
 for var in optional_vars:
     value = os.getenv(var)
@@ -64,9 +78,9 @@ for var in optional_vars:
     else:
         print(f"  - {var}: Using default")
 
-print("\n" + "="*60)
+print("\n" + "=" * 60)
 print("All basic tests passed!")
-print("="*60)
+print("=" * 60)
 print("\nTo run the server, ensure GITHUB_TOKEN is set and run:")
 print("  python server.py")
 print("\nOr use Docker:")
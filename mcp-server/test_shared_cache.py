@@ -0,0 +1,165 @@
+"""
+Test script for the cache tier shared by several server processes.
+Workers are separate Python processes reading recipes from a local stub of
+the GitHub API, so no GitHub access is required.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_github import FakeGitHub
+from server import ContentCache, ParsedRecipeCache, SharedCache
+from test_indexes import SAMPLE_FILES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+WORKER = """
+import json, sys
+import server
+from github import Auth, Github
+
+server.initialize_shared_cache()
+client = Github(auth=Auth.Token("test-token"), base_url=sys.argv[1], retry=None)
+server.storage = server.GitHubBackend(client.get_repo(sys.argv[2]))
+server.sync_recipe_indexes()
+recipe = server.get_recipe("pasta/carbonara.md")
+print(json.dumps({"indexed": len(server._indexed_blobs), "name": recipe["name"]}))
+"""
+
+
+def run_worker(github, cache_path):
+    """Start a fresh server process that indexes the stub repository"""
+    env = dict(os.environ, SHARED_CACHE_PATH=cache_path, GITHUB_REPO=github.full_name)
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER, github.url, github.full_name],
+        cwd=HERE,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_workers_share_fetches():
+    """A second worker builds its indexes without fetching anything again"""
+    print("Testing cache sharing between worker processes...")
+    with tempfile.TemporaryDirectory() as directory, FakeGitHub(SAMPLE_FILES) as github:
+        cache_path = os.path.join(directory, "cache.db")
+        first = run_worker(github, cache_path)
+        assert first == {"indexed": 3, "name": "Classic Spaghetti Carbonara"}, first
+        fetched = dict(github.requests)
+        assert fetched["blob"] == 3 and fetched["tree"] == 1, fetched
+        print(f"✓ First worker fetched: {fetched}")
+
+        second = run_worker(github, cache_path)
+        assert second == first, second
+        for endpoint in ("blob", "tree", "branch", "contents"):
+            assert github.requests[endpoint] == fetched.get(endpoint, 0), (
+                endpoint,
+                github.requests,
+            )
+        print("✓ Second worker reused the head, listing and blobs")
+
+
+def test_invalidations_reach_other_processes():
+    """Writes and invalidations in one cache are seen by another on the same file"""
+    print("Testing shared invalidation...")
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "cache.db")
+        worker_a, worker_b = ContentCache(1 << 20, 60), ContentCache(1 << 20, 60)
+        worker_a.attach_shared(SharedCache(cache_path, "test"))
+        worker_b.attach_shared(SharedCache(cache_path, "test"))
+
+        worker_a.put("soup.md", "sha1", "# Soup\n")
+        assert worker_b.get_by_path("soup.md") == "# Soup\n"
+        assert worker_b.stats()["shared_hits"] == 1
+        print("✓ Content written by one worker is read by the other")
+
+        worker_a.invalidate_path("soup.md")
+        assert worker_b.get_by_path("soup.md") is None
+        assert worker_b.get_blob("sha1") == "# Soup\n", "blobs stay valid"
+        print("✓ Path invalidation replayed in the other worker")
+
+        worker_b.set_path_sha("soup.md", "sha1")
+        worker_b.set_path_sha("pie.md", "sha1")
+        assert worker_a.get_path_sha("pie.md") == "sha1"
+        worker_b.invalidate_all_paths()
+        assert worker_a.get_path_sha("pie.md") is None
+        assert worker_a.get_path_sha("soup.md") is None
+        print("✓ Full invalidation replayed in the other worker")
+
+        other_repo = ContentCache(1 << 20, 60)
+        other_repo.attach_shared(SharedCache(cache_path, "other"))
+        worker_a.set_path_sha("soup.md", "sha1")
+        assert other_repo.get_path_sha("soup.md") is None
+        assert other_repo.get_blob("sha1") == "# Soup\n"
+        print("✓ Paths are scoped per repository, blobs are not")
+
+
+def test_shared_entries_keep_their_age():
+    """Path mappings from the shared tier expire on the original TTL"""
+    print("Testing shared TTLs and parsed recipes...")
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "cache.db")
+        worker_a, worker_b = ContentCache(1 << 20, 0.3), ContentCache(1 << 20, 0.3)
+        worker_a.attach_shared(SharedCache(cache_path, "test"))
+        worker_b.attach_shared(SharedCache(cache_path, "test"))
+        worker_a.put("soup.md", "sha1", "# Soup\n")
+        time.sleep(0.4)
+        assert worker_b.get_path_sha("soup.md") is None
+        print("✓ Expired mapping not served by the other worker")
+
+        parsed_a, parsed_b = ParsedRecipeCache(10), ParsedRecipeCache(10)
+        parsed_a.shared = parsed_b.shared = SharedCache(cache_path, "test")
+        recipe = parsed_a.get("sha1", "# Soup\n\n## Ingredients\n- 1 leek\n")
+        assert parsed_b.get("sha1", "not parsed again") == recipe
+        print("✓ Parsed recipes shared by blob SHA")
+
+
+def test_shared_file_is_bounded():
+    """Least recently used blobs are pruned to the budget and old listings dropped"""
+    print("Testing shared cache bounds...")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SharedCache(os.path.join(directory, "cache.db"), "test", max_bytes=5000)
+        cache.PRUNE_EVERY = 1
+        cache.TOUCH_INTERVAL = 0.0
+        for i in range(5):
+            cache.put_blob(f"sha{i}", str(i) * 1000)
+        assert cache.size() <= 5000
+        assert cache.get_blob("sha0") is not None, "under budget, nothing pruned"
+
+        # Reading sha0 makes sha1 the least recently used entry
+        cache.put_blob("sha5", "5" * 1000)
+        assert cache.size() <= 5000 * 0.9, cache.size()
+        assert cache.get_blob("sha1") is None and cache.get_blob("sha0") is not None
+        assert cache.get_blob("sha5") is not None
+        assert cache.stats()["evictions"] >= 2, cache.stats()
+        print(f"✓ Pruned to {cache.size()} bytes, least recently used first")
+
+        for i in range(SharedCache.LISTING_RETENTION + 3):
+            cache.put_listing(f"tree{i}", [{"path": f"{i}.md"}])
+        assert cache.get_listing("tree0") is None
+        assert cache.get_listing(f"tree{SharedCache.LISTING_RETENTION + 2}")
+        count = cache._db().execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+        assert count == SharedCache.LISTING_RETENTION, count
+        print(f"✓ Only the latest {count} listings kept")
+
+
+if __name__ == "__main__":
+    try:
+        test_workers_share_fetches()
+        test_invalidations_reach_other_processes()
+        test_shared_entries_keep_their_age()
+        test_shared_file_is_bounded()
+        print("\n✅ All shared cache tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,162 @@
+"""
+Test script for near-duplicate detection with MinHash signatures.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from test_indexes import use_fake_github
+
+CARBONARA = """# Spaghetti Carbonara
+
+## Ingredients
+- 400 g spaghetti
+- 150 g guanciale, cut into strips
+- 4 egg yolks and 1 whole egg
+- 80 g grated pecorino romano
+- freshly ground black pepper
+
+## Instructions
+1. Boil the spaghetti in well salted water until al dente.
+2. Fry the guanciale in a dry pan until the fat renders and it turns crisp.
+3. Whisk the yolks, the egg, the pecorino and plenty of pepper together.
+4. Toss the drained pasta with the guanciale, then off the heat stir in the egg
+   mixture with a splash of pasta water until creamy.
+"""
+
+# The same recipe with a different title and a couple of small edits
+CARBONARA_COPY = CARBONARA.replace("# Spaghetti Carbonara", "# Carbonara").replace(
+    "plenty of pepper", "lots of pepper"
+)
+
+BROWNIES = """# Fudgy Brownies
+
+## Ingredients
+- 200 g dark chocolate
+- 175 g butter
+- 3 eggs
+- 250 g caster sugar
+- 100 g plain flour
+
+## Instructions
+1. Melt the chocolate with the butter over a pan of simmering water.
+2. Whisk the eggs with the sugar until pale and thick, then fold in the chocolate.
+3. Sift in the flour, pour into a lined tin and bake for 25 minutes at 180C.
+"""
+
+FILES = {
+    "pasta/carbonara.md": CARBONARA,
+    "desserts/brownies.md": BROWNIES,
+}
+
+
+def test_index_finds_near_duplicates():
+    """Edited copies score high, unrelated recipes are not returned"""
+    print("Testing MinHash similarity index...")
+    index = server.SimilarityIndex()
+    index.upsert("carbonara.md", "sha-1", CARBONARA)
+    index.upsert("carbonara-copy.md", "sha-2", CARBONARA_COPY)
+    index.upsert("brownies.md", "sha-3", BROWNIES)
+
+    results = index.similar(index.signature(CARBONARA), min_similarity=0.5)
+    assert [r["path"] for r in results] == [
+        "carbonara.md",
+        "carbonara-copy.md",
+    ], results
+    assert results[0]["similarity"] == 1.0
+    assert 0.6 < results[1]["similarity"] < 1.0, results
+    print(f"✓ Edited copy scored {results[1]['similarity']}, brownies left out")
+
+    results = index.similar(index.signature_for("carbonara.md"), exclude="carbonara.md")
+    assert [r["path"] for r in results] == ["carbonara-copy.md"], results
+    print("✓ Excluded path is not reported as its own duplicate")
+
+    index.remove("carbonara-copy.md")
+    results = index.similar(index.signature(CARBONARA_COPY), min_similarity=0.5)
+    assert [r["path"] for r in results] == ["carbonara.md"], results
+    assert len(index) == 2
+    print("✓ Removed recipes drop out of their buckets")
+
+
+def test_signatures_are_computed_once_per_blob():
+    """Re-indexing an unchanged blob, or the same blob at another path, reuses its signature"""
+    print("Testing signature reuse per blob SHA...")
+    index = server.SimilarityIndex()
+    computed = []
+    original = index.signature
+
+    def counting_signature(content):
+        computed.append(content)
+        return original(content)
+
+    index.signature = counting_signature
+    index.upsert("carbonara.md", "sha-1", CARBONARA)
+    index.upsert("carbonara.md", "sha-1", CARBONARA)
+    index.upsert("copies/carbonara.md", "sha-1", CARBONARA)
+    assert len(computed) == 1, computed
+    print("✓ One signature for one blob")
+
+    index.upsert("carbonara.md", "sha-2", CARBONARA_COPY)
+    assert len(computed) == 2
+    index.remove("copies/carbonara.md")
+    assert index.signature_for("copies/carbonara.md") is None
+    assert index._signatures.keys() == {"sha-2"}, index._signatures.keys()
+    print("✓ Changed blobs are hashed again and unused signatures are dropped")
+
+
+def test_find_similar_recipes_tool():
+    """The tool compares either given content or an existing recipe"""
+    print("Testing find_similar_recipes...")
+    files = dict(FILES, **{"pasta/carbonara-2.md": CARBONARA_COPY})
+    with use_fake_github(files):
+        results = server.find_similar_recipes(content=CARBONARA_COPY)
+        assert [r["path"] for r in results] == [
+            "pasta/carbonara-2.md",
+            "pasta/carbonara.md",
+        ], results
+        assert results[1]["recipe_name"] == "Spaghetti Carbonara"
+        print("✓ Content lookup found both carbonaras")
+
+        results = server.find_similar_recipes(path="pasta/carbonara.md")
+        assert [r["path"] for r in results] == ["pasta/carbonara-2.md"], results
+        assert server.find_similar_recipes(path="desserts/brownies.md") == []
+        print("✓ Path lookup excludes the recipe itself")
+
+
+def test_create_recipe_checks_duplicates():
+    """With check_duplicates, a near-identical recipe is reported instead of written"""
+    print("Testing duplicate check on create_recipe...")
+    with use_fake_github(FILES) as github:
+        result = server.create_recipe(
+            "Carbonara", CARBONARA_COPY, check_duplicates=True
+        )
+        assert result["success"] is False, result
+        assert [d["path"] for d in result["duplicates"]] == ["pasta/carbonara.md"]
+        assert github.requests["contents_put"] == 0, github.requests
+        print("✓ Duplicate reported and nothing written")
+
+        result = server.create_recipe("Carbonara", CARBONARA_COPY)
+        assert result["success"], result
+        assert github.requests["contents_put"] == 1, github.requests
+        print("✓ Creating without the check still writes")
+
+        lasagne = "# Lasagne\n\n- pasta sheets\n- ragu\n- bechamel\n- parmesan\n"
+        result = server.create_recipe("Lasagne", lasagne, check_duplicates=True)
+        assert result["success"] and "duplicates" not in result, result
+        print("✓ Distinct recipes are created with the check on")
+
+
+if __name__ == "__main__":
+    try:
+        test_index_finds_near_duplicates()
+        test_signatures_are_computed_once_per_blob()
+        test_find_similar_recipes_tool()
+        test_create_recipe_checks_duplicates()
+        print("\n✅ All similar recipe tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+"""
+Test script for coalescing concurrent identical fetches.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from fake_github import FakeGitHub
+from server import SingleFlight
+
+FILES = {"soup.md": "# Tomato Soup\n", "pie.md": "# Leek Pie\n"}
+
+
+def run_concurrently(count, target):
+    """Call target() from count threads at once and return their results"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_run():
+    """Callers arriving while a key is in flight share its result or error"""
+    print("Testing single-flight coalescing...")
+    flight = SingleFlight()
+    release, calls = threading.Event(), []
+
+    def slow(value):
+        calls.append(value)
+        release.wait(5)
+        return value
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results = run_concurrently(6, lambda: flight.do(("path", "a.md"), lambda: slow(1)))
+    assert results == [1] * 6 and calls == [1], (results, calls)
+    assert flight.stats() == {"calls": 1, "in_flight": 0, "coalesced": {"path": 5}}
+    print("✓ Six concurrent calls ran the function once")
+
+    release.clear()
+    threading.Timer(0.2, release.set).start()
+
+    def failing():
+        release.wait(5)
+        raise ValueError("boom")
+
+    results = run_concurrently(4, lambda: flight.do(("blob", "abc"), failing))
+    assert all(isinstance(r, ValueError) for r in results), results
+    assert flight.do(("blob", "abc"), lambda: "retried") == "retried"
+    print("✓ Errors are shared and the next call runs afresh")
+
+
+def test_tools_coalesce_github_requests():
+    """Concurrent reads of one recipe or the listing hit GitHub once"""
+    print("Testing coalesced tool calls...")
+    original_storage = server.storage
+    with FakeGitHub(FILES, latency=0.2) as github:
+        server.storage = server.GitHubBackend(github.repo())
+        server.content_cache.clear()
+        server._tree_listing = None
+        try:
+            coalesced = server.single_flight.stats()["coalesced"].get("path", 0)
+            results = run_concurrently(8, lambda: server.get_recipe("soup.md"))
+            assert all(r["name"] == "Tomato Soup" for r in results), results
+            assert github.requests["contents"] == 1, github.requests
+            stats = server.single_flight.stats()
+            assert stats["coalesced"]["path"] - coalesced == 7, stats
+            print("✓ Eight get_recipe calls made one contents request")
+
+            results = run_concurrently(8, lambda: server.list_recipes()["total"])
+            assert results == [2] * 8, results
+            assert github.requests["branch"] == 1, github.requests
+            assert github.requests["tree"] == 1, github.requests
+            print("✓ Eight list_recipes calls made one branch and one tree request")
+        finally:
+            server.storage = original_storage
+            server._tree_listing = None
+
+
+if __name__ == "__main__":
+    try:
+        test_concurrent_calls_share_one_run()
+        test_tools_coalesce_github_requests()
+        print("\n✅ All single-flight tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,135 @@
+"""
+Test script for the on-disk index snapshot used for warm restarts.
+Runs against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import server
+from test_indexes import SAMPLE_FILES, use_fake_github
+
+
+def restart():
+    """Forget everything held in memory, as a new process would"""
+    server.content_cache.clear()
+    server.parsed_recipes.clear()
+    server._tree_listing = None
+    server.reset_recipe_indexes()
+
+
+def test_restart_from_snapshot_is_warm():
+    """A restart from a current snapshot fetches no trees or blobs"""
+    print("Testing warm restart from snapshot...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.json.gz")
+        with use_fake_github(SAMPLE_FILES) as github:
+            server.search_recipes("classic")
+            assert server.save_snapshot(path)
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            assert snapshot["tree_sha"] == github.tree_sha()
+            assert set(snapshot["recipes"]) == set(SAMPLE_FILES)
+            print(f"✓ Snapshot written ({os.path.getsize(path)} bytes)")
+
+            restart()
+            github.requests.clear()
+            assert server.load_snapshot(path)
+            results = server.search_recipes("carbonara")
+            assert [r["path"] for r in results] == ["pasta/carbonara.md"]
+            assert server.search_recipe_text("eggs")[0]["path"] == "pasta/carbonara.md"
+            assert server.filter_recipes()["total"] == 3
+            assert github.requests["tree"] == 0, github.requests
+            assert github.requests["blob"] == 0, github.requests
+            print("✓ Indexes restored with only a branch head check")
+
+
+def test_restart_applies_only_the_diff():
+    """Changes made after the snapshot are fetched, nothing else"""
+    print("Testing snapshot diff on restart...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.json.gz")
+        with use_fake_github(SAMPLE_FILES) as github:
+            server.search_recipes("classic")
+            server.save_snapshot(path)
+
+            github.files["desserts/brownies.md"] = "# Fudgy Brownies\n"
+            del github.files["pasta/carbonara.md"]
+            restart()
+            github.requests.clear()
+            assert server.load_snapshot(path)
+
+            names = [r["recipe_name"] for r in server.search_recipes("brownies")]
+            assert names == ["Fudgy Brownies"], names
+            assert server.search_recipes("carbonara") == []
+            assert github.requests["blob"] == 1, github.requests
+            print("✓ One new blob fetched and the removed recipe dropped")
+
+
+def test_unusable_snapshots_are_ignored():
+    """Missing, corrupt or foreign snapshots leave the server cold but working"""
+    print("Testing unusable snapshots...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.json.gz")
+        assert not server.load_snapshot(path)
+
+        with open(path, "wb") as f:
+            f.write(b"not gzip")
+        assert not server.load_snapshot(path)
+
+        with use_fake_github(SAMPLE_FILES):
+            server.search_recipes("classic")
+            server.save_snapshot(path)
+            original_repo = server.GITHUB_REPO
+            server.GITHUB_REPO = "someone/else"
+            try:
+                assert not server.load_snapshot(path)
+            finally:
+                server.GITHUB_REPO = original_repo
+        print("✓ Missing, corrupt and foreign snapshots ignored")
+
+
+def test_snapshot_of_partly_evicted_cache():
+    """Recipes evicted before the snapshot was taken are indexed again after a restart"""
+    print("Testing snapshot with a cache smaller than the cookbook...")
+    files = {
+        f"recipes/dish-{i}.md": f"# Dish {i}\n\n" + f"- ingredient {i}\n" * 40
+        for i in range(5)
+    }
+    max_bytes = server.content_cache.max_bytes
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.json.gz")
+        with use_fake_github(files) as github:
+            server.content_cache.max_bytes = 1500
+            try:
+                assert len(server.search_recipes("dish")) == 5
+                assert server.save_snapshot(path)
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    saved = len(json.load(f)["recipes"])
+                assert saved < 5, "the budget must have evicted some recipes"
+
+                restart()
+                github.requests.clear()
+                assert server.load_snapshot(path)
+                assert len(server.search_recipes("dish")) == 5
+                assert github.requests["blob"] == 5 - saved, github.requests
+                print(f"✓ {saved} recipes restored, {5 - saved} evicted ones fetched")
+            finally:
+                server.content_cache.max_bytes = max_bytes
+
+
+if __name__ == "__main__":
+    try:
+        test_restart_from_snapshot_is_warm()
+        test_restart_applies_only_the_diff()
+        test_unusable_snapshots_are_ignored()
+        test_snapshot_of_partly_evicted_cache()
+        print("\n✅ All snapshot tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
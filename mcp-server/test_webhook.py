@@ -0,0 +1,241 @@
+"""
+Test script for the GitHub push webhook.
+Posts recorded push payloads to the webhook handler while the server runs
+against a local stub of the GitHub API, so no GitHub access is required.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.requests import Request
+
+import server
+from test_indexes import SAMPLE_FILES, use_fake_github
+
+SECRET = "test-webhook-secret"
+
+# Trimmed from a real push delivery; only the fields the server reads are kept
+PUSH_PAYLOAD = {
+    "ref": "refs/heads/main",
+    "before": "6113728f27ae82c7b1a177c8d03f9e96e0adf246",
+    "after": "0d1a26e67d8f5eaf1f6ba5c57fc3c7d91ac0fd1c",
+    "forced": False,
+    "deleted": False,
+    "commits": [
+        {
+            "id": "0d1a26e67d8f5eaf1f6ba5c57fc3c7d91ac0fd1c",
+            "message": "Rework carbonara, drop notes",
+            "added": ["soups/leek.md"],
+            "removed": ["notes.md"],
+            "modified": ["pasta/carbonara.md"],
+        }
+    ],
+}
+
+
+def post_webhook(payload, event="push", signature=None):
+    """Call the webhook route like Starlette would and return (status, JSON body)"""
+    body = json.dumps(payload).encode("utf-8")
+    if signature is None:
+        digest = hmac.new(SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        signature = f"sha256={digest}"
+    headers = [
+        (b"x-github-event", event.encode("ascii")),
+        (b"x-hub-signature-256", signature.encode("ascii")),
+    ]
+    scope = {"type": "http", "method": "POST", "path": "/webhook", "headers": headers}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response = asyncio.run(server.github_webhook(Request(scope, receive)))
+    return response.status_code, json.loads(response.body)
+
+
+def push(github):
+    """Apply the recorded push to the stub repository"""
+    github.files["pasta/carbonara.md"] = "# Creamy Carbonara\n\n- cream\n"
+    github.files["soups/leek.md"] = "# Leek and Potato Soup\n\n- 2 leeks\n"
+    del github.files["notes.md"]
+    github.commits += 1
+
+
+def test_signature_verification():
+    """Only bodies signed with the shared secret are accepted"""
+    print("Testing webhook signatures...")
+    body = b'{"zen": "Keep it logically awesome."}'
+    good = "sha256=" + hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+    assert server.verify_webhook_signature("secret", body, good)
+    assert not server.verify_webhook_signature("secret", body + b" ", good)
+    assert not server.verify_webhook_signature("other", body, good)
+    assert not server.verify_webhook_signature("secret", body, None)
+    assert not server.verify_webhook_signature("", body, good)
+    print("✓ HMAC-SHA256 signatures verified")
+
+    server.GITHUB_WEBHOOK_SECRET = SECRET
+    try:
+        status, _ = post_webhook(PUSH_PAYLOAD, signature="sha256=" + "0" * 64)
+        assert status == 401, status
+        status, body = post_webhook({"zen": "hi"}, event="ping")
+        assert status == 200 and body == {"ok": True}, body
+        status, body = post_webhook(PUSH_PAYLOAD, event="issues")
+        assert status == 200 and not body["applied"], body
+        print("✓ Bad signatures rejected, ping and other events acknowledged")
+    finally:
+        server.GITHUB_WEBHOOK_SECRET = ""
+
+    status, _ = post_webhook(PUSH_PAYLOAD)
+    assert status == 403, "webhooks must be refused without a configured secret"
+    print("✓ Webhook refused when no secret is configured")
+
+
+def test_push_refreshes_only_affected_entries():
+    """A push invalidates the files it touched and re-indexes just those"""
+    print("Testing push-driven refresh...")
+    server.GITHUB_WEBHOOK_SECRET = SECRET
+    try:
+        with use_fake_github(SAMPLE_FILES) as github:
+            server.search_recipes("classic")
+            assert server.get_recipe("pasta/carbonara.md")["name"] == (
+                "Classic Spaghetti Carbonara"
+            )
+            push(github)
+
+            # Without the webhook the cached listing and path mapping still win
+            assert server.get_recipe("pasta/carbonara.md")["name"] == (
+                "Classic Spaghetti Carbonara"
+            )
+
+            refresh, scheduled = server.refresh_after_push, []
+            server.refresh_after_push = lambda: scheduled.append(True)
+            try:
+                status, body = post_webhook(PUSH_PAYLOAD)
+            finally:
+                server.refresh_after_push = refresh
+            assert status == 202, body
+            assert scheduled, "the refresh must be scheduled in the background"
+            assert body["changed"] == ["pasta/carbonara.md", "soups/leek.md"], body
+            assert body["removed"] == ["notes.md"], body
+            assert "notes.md" not in server._indexed_blobs
+            print("✓ Push invalidated changed paths and dropped removed recipes")
+
+            blobs_before = github.requests["blob"]
+            server.refresh_after_push()
+            assert github.requests["blob"] - blobs_before == 2, github.requests
+            names = [r["recipe_name"] for r in server.search_recipes("leek")]
+            assert names == ["Leek and Potato Soup"], names
+            assert server.get_recipe("pasta/carbonara.md")["name"] == (
+                "Creamy Carbonara"
+            )
+            print("✓ Only the two changed blobs were fetched on refresh")
+    finally:
+        server.GITHUB_WEBHOOK_SECRET = ""
+
+
+def test_push_to_other_branch_or_forced():
+    """Pushes elsewhere are ignored and force pushes drop every path mapping"""
+    print("Testing ignored and forced pushes...")
+    with use_fake_github(SAMPLE_FILES):
+        server.list_recipes()
+        assert server.content_cache.get_path_sha("notes.md")
+
+        result = server.apply_push_event(dict(PUSH_PAYLOAD, ref="refs/heads/feature"))
+        assert not result["applied"], result
+        assert server.content_cache.get_path_sha("notes.md")
+
+        result = server.apply_push_event(dict(PUSH_PAYLOAD, commits=[], forced=True))
+        assert result["applied"] and result["full_refresh"], result
+        assert server.content_cache.get_path_sha("desserts/cookies.md") is None
+        print("✓ Other branches ignored, force push invalidated all paths")
+
+
+def test_push_does_not_wait_for_index_fetches():
+    """A push arriving during a slow index sync is answered without waiting for it"""
+    print("Testing webhook during a sync...")
+    server.GITHUB_WEBHOOK_SECRET = SECRET
+    refresh = server.refresh_after_push
+    server.refresh_after_push = lambda: None
+    try:
+        with use_fake_github(SAMPLE_FILES) as github:
+            server.list_recipes()
+            github.latency = 0.5
+            sync = threading.Thread(target=server.sync_recipe_indexes)
+            sync.start()
+            time.sleep(0.1)
+
+            started = time.perf_counter()
+            status, body = post_webhook(PUSH_PAYLOAD)
+            elapsed = time.perf_counter() - started
+            sync.join()
+            github.latency = 0.0
+
+            assert status == 202, body
+            assert elapsed < 0.3, f"webhook waited {elapsed:.2f}s for the sync"
+            print(f"✓ Webhook answered in {elapsed * 1000:.0f} ms during blob fetches")
+    finally:
+        server.refresh_after_push = refresh
+        server.GITHUB_WEBHOOK_SECRET = ""
+
+
+def default_ttls(**env):
+    """Import the server in a fresh process and return its default TTLs"""
+    environment = {
+        key: value
+        for key, value in os.environ.items()
+        if key
+        not in (
+            "GITHUB_WEBHOOK_SECRET",
+            "SHARED_CACHE_PATH",
+            "CONTENT_CACHE_PATH_TTL",
+            "TREE_REFRESH_INTERVAL",
+        )
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import server; "
+            "print(server.CONTENT_CACHE_PATH_TTL, server.TREE_REFRESH_INTERVAL)",
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(environment, **env),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return tuple(float(v) for v in result.stdout.strip().splitlines()[-1].split())
+
+
+def test_longer_ttls_need_the_shared_cache():
+    """A webhook secret alone keeps the default TTLs; other workers miss its pushes"""
+    print("Testing webhook TTL defaults...")
+    assert default_ttls() == (300, 30)
+    assert default_ttls(GITHUB_WEBHOOK_SECRET=SECRET) == (300, 30)
+    print("✓ Webhook without a shared cache keeps 300s / 30s")
+    assert default_ttls(
+        GITHUB_WEBHOOK_SECRET=SECRET, SHARED_CACHE_PATH="/tmp/recipes-cache.db"
+    ) == (3000, 300)
+    print("✓ Webhook with a shared cache raises them to 3000s / 300s")
+
+
+if __name__ == "__main__":
+    try:
+        test_signature_verification()
+        test_push_refreshes_only_affected_entries()
+        test_push_to_other_branch_or_forced()
+        test_push_does_not_wait_for_index_fetches()
+        test_longer_ttls_need_the_shared_cache()
+        print("\n✅ All webhook tests passed!")
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)